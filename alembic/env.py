@@ -5,7 +5,9 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 from app.models.api_key import ApiKey  # noqa: F401
 from app.models.base import Base
+from app.models.biome import Biome  # noqa: F401
 from app.models.infraction import Infraction  # noqa: F401
+from app.models.ingestion_checkpoint import IngestionCheckpoint  # noqa: F401
 from app.models.user import User  # noqa: F401
 
 # this is the Alembic Config object, which provides
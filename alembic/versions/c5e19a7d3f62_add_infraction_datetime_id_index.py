@@ -0,0 +1,42 @@
+"""add_infraction_datetime_id_index
+
+Revision ID: c5e19a7d3f62
+Revises: 8b2d7c41e5a3
+Create Date: 2026-10-17 16:20:41.503118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e19a7d3f62"
+down_revision: Union[str, Sequence[str], None] = "8b2d7c41e5a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # O índice composto cobre a ordenação (infraction_datetime, id) da
+    # paginação por cursor e substitui o índice simples, que é prefixo dele.
+    op.create_index(
+        "ix_infractions_infraction_datetime_id",
+        "infractions",
+        ["infraction_datetime", "id"],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_infractions_infraction_datetime"), table_name="infractions")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        op.f("ix_infractions_infraction_datetime"),
+        "infractions",
+        ["infraction_datetime"],
+        unique=False,
+    )
+    op.drop_index("ix_infractions_infraction_datetime_id", table_name="infractions")
@@ -0,0 +1,67 @@
+"""add_search_columns_to_infractions
+
+Revision ID: e8f4b2c6a917
+Revises: c5e19a7d3f62
+Create Date: 2026-10-17 17:42:09.118304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8f4b2c6a917"
+down_revision: Union[str, Sequence[str], None] = "c5e19a7d3f62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = {
+    "offender_name": "offender_name_search",
+    "municipality": "municipality_search",
+    "affected_biomes": "affected_biomes_search",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "infractions", sa.Column("offender_name_search", sa.TEXT(), nullable=True)
+    )
+    op.add_column(
+        "infractions",
+        sa.Column("municipality_search", sa.String(length=255), nullable=True),
+    )
+    op.add_column(
+        "infractions", sa.Column("affected_biomes_search", sa.TEXT(), nullable=True)
+    )
+
+    # As colunas de origem já foram gravadas sem acentos (unidecode na
+    # ingestão); falta apenas passar para minúsculas.
+    assignments = ", ".join(
+        f"{search} = LOWER({source})" for source, search in SEARCH_COLUMNS.items()
+    )
+    op.execute(f"UPDATE infractions SET {assignments}")
+
+    # Com o parser ngram, a lista de stopwords padrão descartaria todo n-grama
+    # que contém uma delas (ex.: "a"), o que esvazia boa parte do índice.
+    op.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+    # O InnoDB cria um índice FULLTEXT por ALTER TABLE.
+    for search in SEARCH_COLUMNS.values():
+        op.create_index(
+            f"ix_infractions_{search}",
+            "infractions",
+            [search],
+            unique=False,
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for search in SEARCH_COLUMNS.values():
+        op.drop_index(f"ix_infractions_{search}", table_name="infractions")
+        op.drop_column("infractions", search)
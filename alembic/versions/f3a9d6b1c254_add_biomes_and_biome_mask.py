@@ -0,0 +1,73 @@
+"""add_biomes_and_biome_mask
+
+Revision ID: f3a9d6b1c254
+Revises: e8f4b2c6a917
+Create Date: 2026-10-17 18:31:55.640287
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9d6b1c254"
+down_revision: Union[str, Sequence[str], None] = "e8f4b2c6a917"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mesma ordem de app.services.biome_mask.BIOMES: a posição é o bit.
+BIOMES = [
+    ("amazonia", "Amazônia", "amazonia"),
+    ("caatinga", "Caatinga", "caatinga"),
+    ("cerrado", "Cerrado", "cerrado"),
+    ("mata_atlantica", "Mata Atlântica", "mata[[:space:]_-]*atlantica"),
+    ("pampa", "Pampa", "pampa"),
+    ("pantanal", "Pantanal", "pantanal"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    biomes = op.create_table(
+        "biomes",
+        sa.Column("id", sa.SmallInteger(), autoincrement=False, nullable=False),
+        sa.Column("slug", sa.String(length=50), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("bit", sa.SmallInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("slug"),
+    )
+    op.bulk_insert(
+        biomes,
+        [
+            {"id": position, "slug": slug, "name": name, "bit": 1 << position}
+            for position, (slug, name, _) in enumerate(BIOMES)
+        ],
+    )
+
+    op.add_column(
+        "infractions",
+        sa.Column("biome_mask", sa.SmallInteger(), server_default="0", nullable=False),
+    )
+    # affected_biomes já foi gravado sem acentos (unidecode na ingestão).
+    terms = " | ".join(
+        f"((LOWER(affected_biomes) REGEXP '{pattern}') << {position})"
+        for position, (_, _, pattern) in enumerate(BIOMES)
+    )
+    op.execute(
+        f"UPDATE infractions SET biome_mask = COALESCE({terms}, 0) "
+        "WHERE affected_biomes IS NOT NULL"
+    )
+    op.create_index(
+        op.f("ix_infractions_biome_mask"), "infractions", ["biome_mask"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_infractions_biome_mask"), table_name="infractions")
+    op.drop_column("infractions", "biome_mask")
+    op.drop_table("biomes")
@@ -1,20 +1,28 @@
 from fastapi import (
     APIRouter,
     status,
-    BackgroundTasks,
     Depends,
     UploadFile,
     File,
     HTTPException,
     Query,
+    Response,
 )
 from app.api import deps
-from app.services.ingestion_service import IngestionService
+from app.services import ingestion_job_service, ingestion_queue, response_cache
 from app.models.user import User  # noqa: F401
 import logging
-import tempfile
+import uuid
 import aiofiles
-from app.schemas.infraction import InfractionPublic, Page
+import aiofiles.os
+from redis.exceptions import RedisError
+from app.schemas.infraction import (
+    InfractionPublic,
+    Page,
+    ResponseCacheStats,
+    TotalMode,
+)
+from app.schemas.ingestion_job import IngestionJobPublic
 from datetime import date
 from decimal import Decimal
 from app.services import infraction_service
@@ -32,7 +40,6 @@ router = APIRouter(prefix="/infractions", tags=["Infractions"])
     summary="Envia um arquivo CSV para ingestão assíncrona de infrações.",
 )
 async def upload_infractions_csv(
-    background_tasks: BackgroundTasks,
     current_active_admin: User = Depends(deps.get_current_active_admin_user),
     file: UploadFile = File(
         ..., description="Arquivo CSV contendo os dados das infrações."
@@ -50,11 +57,11 @@ async def upload_infractions_csv(
             detail=f"Tipo de arquivo inválido: {file.content_type}. Apenas arquivos CSV são aceitos.",
         )
 
-    temp_file_path = ""
+    # O arquivo fica no diretório de uploads compartilhado com os workers.
+    temp_file_path = os.path.join(
+        ingestion_queue.get_upload_dir(), f"{uuid.uuid4().hex}.csv"
+    )
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as temp_file:
-            temp_file_path = temp_file.name
-
         async with aiofiles.open(temp_file_path, "wb") as out_file:
             while content := await file.read(
                 1024 * 1024
@@ -62,7 +69,7 @@ async def upload_infractions_csv(
                 await out_file.write(content)
     except Exception as e:
         if os.path.exists(temp_file_path):
-            aiofiles.os.remove(temp_file_path)
+            await aiofiles.os.remove(temp_file_path)
 
         logger.error(f"Erro ao salvar o arquivo temporário: {e}")
         raise HTTPException(
@@ -77,15 +84,57 @@ async def upload_infractions_csv(
         f"enviou o arquivo '{file.filename}' para processamento."
     )
 
-    service = IngestionService()
-    background_tasks.add_task(service.process_csv, temp_file_path)
+    # A API apenas enfileira o job; a ingestão roda nos workers (cli.py worker).
+    try:
+        job = await ingestion_queue.enqueue_file(temp_file_path, file.filename)
+    except Exception as e:
+        await aiofiles.os.remove(temp_file_path)
+        logger.error(f"Erro ao enfileirar o arquivo para ingestão: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Fila de ingestão indisponível. Tente novamente mais tarde.",
+        )
 
     return {
         "message": "Arquivo recebido. O processamento será feito em segundo plano.",
         "filename": file.filename,
+        "job_id": job.job_id,
     }
 
 
+@router.get(
+    "/jobs",
+    status_code=status.HTTP_200_OK,
+    response_model=list[IngestionJobPublic],
+    summary="Lista os jobs de ingestão mais recentes e o seu progresso.",
+)
+async def list_ingestion_jobs(
+    current_active_admin: User = Depends(deps.get_current_active_admin_user),
+    limit: int = Query(50, ge=1, le=200, description="Quantidade de jobs."),
+    offset: int = Query(0, ge=0, description="Jobs a pular (mais recentes primeiro)."),
+):
+    return await ingestion_job_service.list_jobs(limit=limit, offset=offset)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=IngestionJobPublic,
+    summary="Consulta a situação e o progresso de um job de ingestão.",
+)
+async def get_ingestion_job(
+    job_id: str,
+    current_active_admin: User = Depends(deps.get_current_active_admin_user),
+):
+    job = await ingestion_job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job de ingestão não encontrado.",
+        )
+    return job
+
+
 @router.get(
     "",
     status_code=status.HTTP_200_OK,
@@ -124,29 +173,127 @@ async def get_infractions(
     state: str | None = Query(
         None, min_length=2, max_length=2, description="Busca por UF."
     ),
-    affected_biomes: str | None = Query(None, description="Busca por biomas afetados."),
+    affected_biomes: str | None = Query(
+        None,
+        description=(
+            "Biomas afetados, separados por vírgula (ex.: Amazônia,Cerrado): "
+            "infrações que atingem todos eles. Outros textos são buscados como "
+            "parte da descrição dos biomas."
+        ),
+    ),
+    cursor: str | None = Query(
+        None,
+        description=(
+            "Cursor devolvido em next_cursor pela página anterior. Quando "
+            "informado, o parâmetro page é ignorado."
+        ),
+    ),
+    total: TotalMode = Query(
+        TotalMode.EXACT,
+        description=(
+            "Cálculo do total: exact (contagem exata, em cache até a próxima "
+            "ingestão), estimate (contagem em cache ou estimativa do EXPLAIN) "
+            "ou none (não calcula)."
+        ),
+    ),
 ):
     skip = (page - 1) * size
 
-    total, infractions_data = await infraction_service.get_infractions(
+    try:
+        decoded_cursor = infraction_service.decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido.",
+        )
+
+    filters = {
+        "source_id": source_id,
+        "infraction_number": infraction_number,
+        "offender_name": offender_name,
+        "offender_document": offender_document,
+        "start_date": start_date,
+        "end_date": end_date,
+        "min_fine_value": min_fine_value,
+        "municipality": municipality,
+        "state": state,
+        "affected_biomes": affected_biomes,
+    }
+    # Respostas idênticas (mesmos filtros, página e versão do dataset) saem
+    # prontas do Redis, sem consultar o banco nem serializar de novo.
+    cache_slot = await response_cache.lookup(
+        filters,
+        {
+            "page": None if cursor else page,
+            "size": size,
+            "cursor": cursor,
+            "total": total.value,
+        },
+    )
+    if cache_slot is not None and cache_slot.payload is not None:
+        return Response(
+            content=cache_slot.payload,
+            media_type="application/json",
+            headers={"X-Cache": "HIT"},
+        )
+
+    (
+        total_count,
+        total_estimated,
+        infractions_data,
+    ) = await infraction_service.get_infractions(
         db,
         skip=skip,
         limit=size,
-        source_id=source_id,
-        infraction_number=infraction_number,
-        offender_name=offender_name,
-        offender_document=offender_document,
-        start_date=start_date,
-        end_date=end_date,
-        min_fine_value=min_fine_value,
-        municipality=municipality,
-        state=state,
-        affected_biomes=affected_biomes,
+        cursor=decoded_cursor,
+        total_mode=total,
+        **filters,
     )
 
-    return {
-        "total": total,
-        "page": page,
-        "size": len(infractions_data),
-        "items": infractions_data,
-    }
+    # Uma página cheia pode ter continuação; a última (incompleta) não tem cursor.
+    next_cursor = (
+        infraction_service.encode_cursor(infractions_data[-1])
+        if len(infractions_data) == size
+        else None
+    )
+
+    payload = (
+        Page[InfractionPublic]
+        .model_validate(
+            {
+                "total": total_count,
+                "total_estimated": total_estimated,
+                "page": None if cursor else page,
+                "size": len(infractions_data),
+                "items": infractions_data,
+                "next_cursor": next_cursor,
+            },
+            from_attributes=True,
+        )
+        .model_dump_json()
+    )
+    if cache_slot is not None:
+        await response_cache.store(cache_slot, payload)
+
+    return Response(
+        content=payload, media_type="application/json", headers={"X-Cache": "MISS"}
+    )
+
+
+@router.get(
+    "/cache-stats",
+    status_code=status.HTTP_200_OK,
+    response_model=ResponseCacheStats,
+    summary="Métricas do cache de respostas da listagem de infrações.",
+)
+async def get_response_cache_stats(
+    current_active_admin: User = Depends(deps.get_current_active_admin_user),
+):
+    try:
+        return await response_cache.get_stats()
+    except RedisError as e:
+        logger.error(f"Erro ao consultar as métricas do cache: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Cache de respostas indisponível.",
+        )
@@ -6,3 +6,13 @@ engine = create_async_engine(settings.DATABASE_URL, pool_pre_ping=True)
 AsyncSessionLocal = async_sessionmaker(
     bind=engine, autocommit=False, autoflush=False, class_=AsyncSession
 )
+
+# Engine usado apenas pela ingestão em massa (LOAD DATA LOCAL INFILE), que
+# precisa da opção local_infile habilitada na conexão.
+bulk_engine = create_async_engine(
+    settings.DATABASE_URL, pool_pre_ping=True, connect_args={"local_infile": True}
+)
+
+BulkSessionLocal = async_sessionmaker(
+    bind=bulk_engine, autocommit=False, autoflush=False, class_=AsyncSession
+)
@@ -0,0 +1,14 @@
+from sqlalchemy import SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class Biome(Base):
+    __tablename__ = "biomes"
+
+    # Posição do bit em Infraction.biome_mask (ver biome_mask.BIOMES).
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True, autoincrement=False)
+    slug: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    bit: Mapped[int] = mapped_column(SmallInteger, nullable=False)  # 1 << id
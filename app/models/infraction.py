@@ -1,6 +1,16 @@
 from app.models.base import Base, bigintpk
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import BigInteger, String, DECIMAL, DateTime, Date, TEXT, Index
+from sqlalchemy import (
+    BigInteger,
+    String,
+    DECIMAL,
+    DateTime,
+    Date,
+    TEXT,
+    Index,
+    SmallInteger,
+)
+from sqlalchemy.dialects.mysql import BIGINT
 from decimal import Decimal
 from datetime import datetime, date
 
@@ -35,7 +45,7 @@ class Infraction(Base):
     )  # Mapeado de: VAL_AUTO_INFRACAO
 
     infraction_datetime: Mapped[datetime] = mapped_column(
-        DateTime, index=True, nullable=False
+        DateTime, nullable=False
     )  # Mapeado de: DAT_HORA_AUTO_INFRACAO
     fact_date: Mapped[date] = mapped_column(
         Date, nullable=True
@@ -77,7 +87,39 @@ class Infraction(Base):
     affected_biomes: Mapped[str] = mapped_column(
         TEXT, nullable=True
     )  # Mapeado de: DS_BIOMAS_ATINGIDOS
+    biome_mask: Mapped[int] = mapped_column(
+        SmallInteger, index=True, nullable=False, default=0, server_default="0"
+    )  # Um bit por bioma de DS_BIOMAS_ATINGIDOS (ver Biome)
+
+    row_hash: Mapped[int] = mapped_column(
+        BIGINT(unsigned=True), nullable=True
+    )  # Hash do conteúdo da linha, usado pela ingestão delta
+
+    # Colunas de busca: o texto sem acentos e em minúsculas (ver text_search).
+    offender_name_search: Mapped[str] = mapped_column(TEXT, nullable=True)
+    municipality_search: Mapped[str] = mapped_column(String(255), nullable=True)
+    affected_biomes_search: Mapped[str] = mapped_column(TEXT, nullable=True)
 
     __table_args__ = (
         Index("ix_infractions_latitude_longitude", "latitude", "longitude"),
+        # Ordenação da listagem e chave da paginação por cursor.
+        Index("ix_infractions_infraction_datetime_id", "infraction_datetime", "id"),
+        Index(
+            "ix_infractions_offender_name_search",
+            "offender_name_search",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ),
+        Index(
+            "ix_infractions_municipality_search",
+            "municipality_search",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ),
+        Index(
+            "ix_infractions_affected_biomes_search",
+            "affected_biomes_search",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ),
     )
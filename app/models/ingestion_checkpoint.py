@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, bigintpk
+
+
+class IngestionCheckpoint(Base):
+    __tablename__ = "ingestion_checkpoints"
+
+    id: Mapped[bigintpk]
+
+    file_hash: Mapped[str] = mapped_column(
+        String(64), unique=True, nullable=False
+    )  # SHA-256 do conteúdo do arquivo
+    file_name: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    chunk_index: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )  # Chunks já confirmados (commit)
+    row_offset: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0
+    )  # Linhas de dados do CSV já consumidas
+    rows_affected: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -1,11 +1,18 @@
+import enum
 from typing import TypeVar, Generic, Sequence
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from decimal import Decimal
 from datetime import datetime, date
 
 T = TypeVar("T")
 
 
+class TotalMode(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
 class InfractionPublic(BaseModel):
     id: int
     source_id: int
@@ -34,7 +41,21 @@ class InfractionPublic(BaseModel):
 
 
 class Page(BaseModel, Generic[T]):
-    total: int
-    page: int
+    total: int | None
+    total_estimated: bool = False
+    page: int | None
     size: int
     items: Sequence[T]
+    next_cursor: str | None = None
+
+
+class ResponseCacheStats(BaseModel):
+    dataset_version: int = Field(..., description="Versão atual do dataset")
+    hits: int = Field(..., description="Respostas servidas pelo cache")
+    misses: int = Field(..., description="Consultas que foram ao banco")
+    rejected: int = Field(..., description="Respostas não guardadas pelo teto")
+    hit_ratio: float = Field(..., description="hits / (hits + misses)")
+    entries: int = Field(..., description="Respostas em cache na versão atual")
+    bytes: int = Field(..., description="Bytes em cache na versão atual")
+    max_bytes: int = Field(..., description="Teto de bytes por versão")
+    ttl_seconds: int = Field(..., description="Segundos até o cache da versão expirar")
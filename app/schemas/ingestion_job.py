@@ -0,0 +1,55 @@
+import enum
+from datetime import datetime
+
+from pydantic import BaseModel, Field, Json
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class IngestionJobPublic(BaseModel):
+    job_id: str = Field(..., description="Identificador do job de ingestão")
+    file_name: str = Field(..., description="Nome do arquivo enviado")
+    status: JobStatus = Field(..., description="Situação atual do job")
+    attempts: int = Field(0, description="Tentativas de processamento já iniciadas")
+    worker_id: str | None = Field(None, description="Worker que processa o job")
+    enqueued_at: datetime = Field(..., description="Momento em que o job foi criado")
+    started_at: datetime | None = Field(
+        None, description="Início da tentativa mais recente"
+    )
+    finished_at: datetime | None = Field(None, description="Momento da conclusão")
+    chunks_processed: int = Field(0, description="Chunks gravados no banco")
+    rows_read: int = Field(0, description="Linhas do arquivo lidas nesta tentativa")
+    rows_inserted: int = Field(
+        0,
+        description="Linhas inseridas (sem o modo delta, inclui as reenviadas sem alteração)",
+    )
+    rows_updated: int = Field(0, description="Linhas atualizadas")
+    rows_unchanged: int = Field(
+        0, description="Linhas ignoradas por não terem mudado (modo delta)"
+    )
+    rows_rejected: int = Field(0, description="Linhas descartadas na validação")
+    rows_superseded: int = Field(
+        0, description="Linhas ignoradas por haver versão posterior do auto no arquivo"
+    )
+    rejects: Json[dict[str, int]] = Field(
+        default_factory=dict,
+        description="Linhas descartadas por regra, no formato motivo:coluna",
+    )
+    rejects_path: str | None = Field(
+        None, description="Arquivo CSV.gz com as linhas descartadas e o motivo"
+    )
+    bytes_read: int = Field(0, description="Bytes do arquivo lidos")
+    bytes_total: int | None = Field(None, description="Tamanho do arquivo em bytes")
+    elapsed_seconds: float = Field(0.0, description="Tempo de processamento")
+    rows_per_second: float = Field(0.0, description="Vazão em linhas por segundo")
+    mb_per_second: float = Field(0.0, description="Vazão em MB por segundo")
+    eta_seconds: float | None = Field(
+        None, description="Estimativa de tempo restante (jobs em andamento)"
+    )
+    error: str | None = Field(None, description="Último erro registrado")
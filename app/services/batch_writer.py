@@ -0,0 +1,132 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+from sqlalchemy import Table
+
+from app.core.config import settings
+from app.db.session import AsyncSession
+from app.models.infraction import Infraction
+
+logger = logging.getLogger(__name__)
+
+# Bytes estimados para valores não textuais (números, datas) já escapados.
+FIXED_VALUE_SIZE = 24
+# Aspas e vírgula que acompanham cada valor textual no SQL.
+TEXT_VALUE_OVERHEAD = 3
+# Usado quando não é possível consultar o max_allowed_packet do servidor.
+DEFAULT_MAX_ALLOWED_PACKET = 4 * 1024 * 1024
+
+
+@dataclass
+class RowBatch:
+    # Linhas já convertidas para tipos nativos, na ordem de UpsertWriter.columns.
+    rows: list[tuple]
+    # Tamanho estimado de cada linha no texto do INSERT, em bytes.
+    row_sizes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+def column_values(series: pd.Series) -> list:
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def estimate_row_sizes(chunk_df: pd.DataFrame) -> np.ndarray:
+    sizes = np.zeros(len(chunk_df), dtype=np.int64)
+    for col in chunk_df.columns:
+        series = chunk_df[col]
+        if (
+            is_object_dtype(series)
+            or is_string_dtype(series)
+            or series.dtype == "category"
+        ):
+            lengths = (
+                series.astype("string").str.len().fillna(0).to_numpy(dtype=np.int64)
+            )
+            sizes += lengths + TEXT_VALUE_OVERHEAD
+        else:
+            sizes += FIXED_VALUE_SIZE
+    return sizes
+
+
+class UpsertWriter:
+    def __init__(self, table: Table | None = None):
+        self.table = table if table is not None else Infraction.__table__
+        self.columns = [col.name for col in self.table.columns if col.name != "id"]
+
+        # Prefixo, placeholder de linha e cláusula de update são montados uma
+        # única vez; cada lote só repete o placeholder N vezes.
+        column_list = ", ".join(f"`{col}`" for col in self.columns)
+        update_list = ", ".join(
+            f"`{col}` = new.`{col}`"
+            for col in self.columns
+            if col != "infraction_number"
+        )
+        self._insert_prefix = f"INSERT INTO `{self.table.name}` ({column_list}) VALUES "
+        self._row_placeholder = "(" + ", ".join(["%s"] * len(self.columns)) + ")"
+        self._upsert_suffix = f" AS new ON DUPLICATE KEY UPDATE {update_list}"
+        self._max_statement_bytes: int | None = None
+
+    def frame_to_batch(self, chunk_df: pd.DataFrame) -> RowBatch:
+        # Converte coluna a coluna (uma lista por coluna) e monta as tuplas com
+        # zip, sem criar um dicionário por linha.
+        frame = chunk_df.reindex(columns=self.columns)
+        values = [column_values(frame[col]) for col in self.columns]
+        return RowBatch(rows=list(zip(*values)), row_sizes=estimate_row_sizes(frame))
+
+    async def _statement_budget(self, db: AsyncSession) -> int:
+        if self._max_statement_bytes is None:
+            connection = await db.connection()
+            result = await connection.exec_driver_sql("SELECT @@max_allowed_packet")
+            max_packet = result.scalar() or DEFAULT_MAX_ALLOWED_PACKET
+            # A estimativa de tamanho das linhas é aproximada; a margem evita
+            # que um lote no limite ultrapasse o pacote aceito pelo servidor.
+            self._max_statement_bytes = (
+                int(int(max_packet) * settings.INGESTION_PACKET_FILL_RATIO)
+                - len(self._insert_prefix)
+                - len(self._upsert_suffix)
+            )
+            logger.info(
+                f"max_allowed_packet do servidor: {max_packet} bytes; "
+                f"lotes de até {self._max_statement_bytes} bytes por INSERT."
+            )
+        return self._max_statement_bytes
+
+    def _split(self, row_sizes: np.ndarray, budget: int) -> list[tuple[int, int]]:
+        bounds = []
+        start = 0
+        total = len(row_sizes)
+        cumulative = np.cumsum(row_sizes)
+        while start < total:
+            offset = cumulative[start - 1] if start else 0
+            # Pelo menos uma linha por lote, mesmo que ela sozinha exceda o limite.
+            end = max(
+                int(np.searchsorted(cumulative, offset + budget, side="right")),
+                start + 1,
+            )
+            bounds.append((start, end))
+            start = end
+        return bounds
+
+    async def write(self, db: AsyncSession, batch: RowBatch) -> int:
+        if not batch.rows:
+            return 0
+
+        budget = await self._statement_budget(db)
+        connection = await db.connection()
+        rows_affected = 0
+        for start, end in self._split(batch.row_sizes, budget):
+            rows = batch.rows[start:end]
+            sql = (
+                self._insert_prefix
+                + ", ".join([self._row_placeholder] * len(rows))
+                + self._upsert_suffix
+            )
+            params = tuple(value for row in rows for value in row)
+            result = await connection.exec_driver_sql(sql, params)
+            rows_affected += result.rowcount
+        return rows_affected
@@ -0,0 +1,69 @@
+import re
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+# Biomas brasileiros, na ordem dos bits de Infraction.biome_mask (o primeiro é
+# o bit 0). A tabela biomes guarda a mesma lista; a ordem não pode mudar sem
+# uma migração que recalcule as máscaras.
+BIOMES = [
+    ("amazonia", "Amazônia"),
+    ("caatinga", "Caatinga"),
+    ("cerrado", "Cerrado"),
+    ("mata_atlantica", "Mata Atlântica"),
+    ("pampa", "Pampa"),
+    ("pantanal", "Pantanal"),
+]
+
+BIOME_BITS = {slug: 1 << position for position, (slug, _) in enumerate(BIOMES)}
+
+ALL_BIOMES_MASK = (1 << len(BIOMES)) - 1
+
+# Reconhece cada bioma no texto já sem acentos e em minúsculas, com ou sem
+# separadores entre as palavras ("mata atlantica", "mata_atlantica"). A
+# migração que criou biome_mask aplica as mesmas expressões com REGEXP.
+_BIOME_PATTERNS = {
+    slug: re.compile(r"[\s_-]*".join(slug.split("_"))) for slug, _ in BIOMES
+}
+
+
+def text_mask(text: str) -> int:
+    normalized = unidecode(text, errors="ignore").lower()
+    mask = 0
+    for slug, pattern in _BIOME_PATTERNS.items():
+        if pattern.search(normalized):
+            mask |= BIOME_BITS[slug]
+    return mask
+
+
+def series_mask(series: pd.Series) -> np.ndarray:
+    # DS_BIOMAS_ATINGIDOS tem poucas combinações distintas: cada valor único é
+    # analisado uma vez e o resultado é espalhado pelos códigos do factorize.
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    unique_masks = np.zeros(len(uniques) + 1, dtype=np.int16)
+    for i, value in enumerate(uniques):
+        unique_masks[i] = text_mask(str(value))
+    # O código -1 (nulo) seleciona a última posição, que vale 0.
+    return unique_masks[codes]
+
+
+def parse_biome_filter(value: str) -> int | None:
+    # Filtro da API: nomes de biomas separados por vírgula. Devolve None se
+    # algum item não for um bioma conhecido.
+    mask = 0
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        item_mask = text_mask(item)
+        if item_mask == 0:
+            return None
+        mask |= item_mask
+    return mask or None
+
+
+def masks_containing(required: int) -> list[int]:
+    # Todas as máscaras possíveis que contêm os bits pedidos. Com seis biomas
+    # são no máximo 32 valores: um IN sobre o índice de biome_mask resolve o
+    # filtro com buscas pontuais, sem varrer a tabela.
+    return [mask for mask in range(ALL_BIOMES_MASK + 1) if mask & required == required]
@@ -0,0 +1,133 @@
+import csv
+import logging
+import os
+import tempfile
+
+import pandas as pd
+from sqlalchemy import Column, Integer, MetaData, Table
+from sqlalchemy.schema import CreateTable, DropTable
+
+from app.db.session import AsyncSession
+from app.models.infraction import Infraction
+
+logger = logging.getLogger(__name__)
+
+# Colunas gravadas no TSV, na mesma ordem declarada no LOAD DATA.
+LOAD_COLUMNS = [
+    column.name for column in Infraction.__table__.columns if column.name != "id"
+]
+
+NULL_MARKER = "\\N"
+
+
+def _escape_text(series: pd.Series) -> pd.Series:
+    # Sequências de escape reconhecidas pelo LOAD DATA com ESCAPED BY '\\'.
+    return (
+        series.str.replace("\\", "\\\\", regex=False)
+        .str.replace("\t", "\\t", regex=False)
+        .str.replace("\n", "\\n", regex=False)
+        .str.replace("\r", "\\r", regex=False)
+    )
+
+
+def write_tsv(chunk_df: pd.DataFrame) -> str | None:
+    if chunk_df.empty:
+        return None
+
+    tsv_df = chunk_df.reindex(columns=LOAD_COLUMNS)
+    for col in tsv_df.columns:
+        if tsv_df[col].dtype == object or tsv_df[col].dtype == "category":
+            tsv_df[col] = _escape_text(tsv_df[col].astype("string")).astype(object)
+
+    with tempfile.NamedTemporaryFile(
+        suffix=".tsv", delete=False, mode="w", encoding="utf-8", newline=""
+    ) as tsv_file:
+        tsv_df.to_csv(
+            tsv_file,
+            sep="\t",
+            header=False,
+            index=False,
+            na_rep=NULL_MARKER,
+            quoting=csv.QUOTE_NONE,
+            escapechar=None,
+            lineterminator="\n",
+            date_format="%Y-%m-%d %H:%M:%S",
+        )
+        return tsv_file.name
+
+
+class StagingTable:
+    def __init__(self, file_hash: str, target_table: Table | None = None):
+        self.target_table = (
+            target_table if target_table is not None else Infraction.__table__
+        )
+        # Nome fixo por arquivo: se a execução morrer sem passar pelo drop
+        # (SIGKILL, OOM), a nova tentativa do mesmo arquivo reaproveita o nome
+        # e remove a tabela deixada para trás em create().
+        self.name = f"{self.target_table.name}_staging_{file_hash[:12]}"
+        # Linhas carregadas desde o último truncate (ainda não levadas pelo merge).
+        self.pending_rows = 0
+
+        # Sem chave primária nem índices: o LOAD DATA só anexa linhas. A coluna
+        # load_order preserva a ordem dos chunks para que, no merge, a última
+        # versão de cada infraction_number prevaleça.
+        self.table = Table(
+            self.name,
+            MetaData(),
+            *[
+                Column(column.name, column.type, nullable=True)
+                for column in self.target_table.columns
+                if column.name in LOAD_COLUMNS
+            ],
+            Column("load_order", Integer, nullable=False),
+        )
+
+        column_list = ", ".join(f"`{col}`" for col in LOAD_COLUMNS)
+        update_list = ", ".join(
+            f"`{col}` = s.`{col}`" for col in LOAD_COLUMNS if col != "infraction_number"
+        )
+        self._merge_sql = (
+            f"INSERT INTO `{self.target_table.name}` ({column_list}) "
+            f"SELECT {', '.join(f's.`{col}`' for col in LOAD_COLUMNS)} "
+            f"FROM `{self.name}` AS s ORDER BY s.load_order "
+            f"ON DUPLICATE KEY UPDATE {update_list}"
+        )
+
+    async def create(self, db: AsyncSession) -> None:
+        await db.execute(DropTable(self.table, if_exists=True))
+        await db.execute(CreateTable(self.table))
+        logger.info(f"Tabela de staging '{self.name}' criada.")
+
+    async def load(self, db: AsyncSession, tsv_path: str, load_order: int) -> int:
+        escaped_path = tsv_path.replace("\\", "\\\\").replace("'", "\\'")
+        column_list = ", ".join(f"`{col}`" for col in LOAD_COLUMNS)
+        sql = (
+            f"LOAD DATA LOCAL INFILE '{escaped_path}' INTO TABLE `{self.name}` "
+            "CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            "LINES TERMINATED BY '\\n' "
+            f"({column_list}) SET load_order = {int(load_order)}"
+        )
+        connection = await db.connection()
+        result = await connection.exec_driver_sql(sql)
+        self.pending_rows += result.rowcount
+        return result.rowcount
+
+    async def merge(self, db: AsyncSession) -> int:
+        connection = await db.connection()
+        result = await connection.exec_driver_sql(self._merge_sql)
+        return result.rowcount
+
+    async def truncate(self, db: AsyncSession) -> None:
+        connection = await db.connection()
+        await connection.exec_driver_sql(f"TRUNCATE TABLE `{self.name}`")
+        self.pending_rows = 0
+
+    async def drop(self, db: AsyncSession) -> None:
+        await db.execute(DropTable(self.table, if_exists=True))
+        logger.info(f"Tabela de staging '{self.name}' removida.")
+
+
+def remove_tsv(tsv_path: str | None) -> None:
+    if tsv_path and os.path.exists(tsv_path):
+        os.remove(tsv_path)
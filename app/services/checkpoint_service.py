@@ -0,0 +1,62 @@
+import hashlib
+import zipfile
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert
+
+from app.db.session import AsyncSession
+from app.models.ingestion_checkpoint import IngestionCheckpoint
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def compute_file_hash(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def compute_zip_member_hash(member: zipfile.ZipInfo) -> str:
+    # Membros lidos em streaming não podem ser relidos para o SHA-256; o CRC-32
+    # e o tamanho gravados no diretório do ZIP identificam o conteúdo.
+    identity = f"{member.filename}:{member.CRC:08x}:{member.file_size}"
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+async def get_checkpoint(
+    db: AsyncSession, file_hash: str
+) -> IngestionCheckpoint | None:
+    stmt = select(IngestionCheckpoint).where(IngestionCheckpoint.file_hash == file_hash)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def save_checkpoint(
+    db: AsyncSession,
+    *,
+    file_hash: str,
+    file_name: str,
+    chunk_index: int,
+    row_offset: int,
+    rows_affected: int,
+    is_completed: bool = False,
+) -> None:
+    # Não faz commit: o checkpoint deve ser confirmado na mesma transação dos
+    # dados que ele representa.
+    values = {
+        "file_hash": file_hash,
+        "file_name": file_name[:255],
+        "chunk_index": chunk_index,
+        "row_offset": row_offset,
+        "rows_affected": rows_affected,
+        "is_completed": is_completed,
+        "updated_at": datetime.utcnow(),
+    }
+    stmt = insert(IngestionCheckpoint).values(**values)
+    stmt = stmt.on_duplicate_key_update(
+        {key: value for key, value in values.items() if key != "file_hash"}
+    )
+    await db.execute(stmt)
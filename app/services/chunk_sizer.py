@@ -0,0 +1,95 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Peso da medição mais recente nas médias móveis exponenciais.
+SMOOTHING = 0.3
+# Maior variação do tamanho em uma única decisão (dobra ou corta pela metade).
+MAX_STEP = 2.0
+# Variações menores que esta fração do tamanho atual são ignoradas.
+DEADBAND = 0.1
+
+
+class ChunkSizer:
+    # Ajusta o tamanho dos chunks durante a ingestão de um arquivo. O estágio
+    # de escrita informa quanto cada chunk levou para ser gravado e o de
+    # leitura informa quanta memória ele ocupa; o próximo chunk lido usa o
+    # maior tamanho que respeita os dois alvos, dentro de [min_size, max_size]:
+    # - latência: target_seconds por lote gravado no banco;
+    # - memória: memory_ceiling_bytes para todos os chunks em trânsito no
+    #   pipeline ao mesmo tempo (in_flight).
+    def __init__(
+        self,
+        initial_size: int,
+        min_size: int,
+        max_size: int,
+        target_seconds: float,
+        memory_ceiling_bytes: int,
+        in_flight: int,
+        adaptive: bool = True,
+    ):
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.size = self._clamp(initial_size)
+        self.target_seconds = target_seconds
+        self.memory_ceiling_bytes = memory_ceiling_bytes
+        self.in_flight = max(in_flight, 1)
+        self.adaptive = adaptive
+        self.seconds_per_row: float | None = None
+        self.bytes_per_row: float | None = None
+
+    def _clamp(self, size: float) -> int:
+        return int(min(max(size, self.min_size), self.max_size))
+
+    @staticmethod
+    def _smooth(current: float | None, measured: float) -> float:
+        if current is None:
+            return measured
+        return SMOOTHING * measured + (1 - SMOOTHING) * current
+
+    def record_memory(self, rows: int, memory_bytes: int) -> None:
+        if not self.adaptive or rows <= 0:
+            return
+        self.bytes_per_row = self._smooth(self.bytes_per_row, memory_bytes / rows)
+
+    def record_write(self, rows: int, seconds: float) -> None:
+        if not self.adaptive or rows <= 0:
+            return
+        self.seconds_per_row = self._smooth(self.seconds_per_row, seconds / rows)
+        self._decide(rows, seconds)
+
+    def _decide(self, rows: int, seconds: float) -> None:
+        limits = {}
+        if self.seconds_per_row:
+            limits["latência"] = self.target_seconds / self.seconds_per_row
+        if self.bytes_per_row:
+            limits["memória"] = self.memory_ceiling_bytes / (
+                self.bytes_per_row * self.in_flight
+            )
+        if not limits:
+            return
+
+        reason = min(limits, key=limits.get)
+        wanted = min(max(limits[reason], self.size / MAX_STEP), self.size * MAX_STEP)
+        new_size = self._clamp(wanted)
+        kept = abs(new_size - self.size) < self.size * DEADBAND
+        if kept:
+            new_size = self.size
+        memory_mb = (self.bytes_per_row or 0) * new_size * self.in_flight / 2**20
+        if kept:
+            # Toda decisão é registrada no mesmo nível, inclusive a de manter.
+            logger.info(
+                f"Tamanho do chunk mantido em {self.size} linhas (limite por "
+                f"{reason}: {limits[reason]:.0f}; último lote de {rows} linhas "
+                f"gravado em {seconds:.2f}s, alvo {self.target_seconds:.2f}s; "
+                f"~{memory_mb:.0f} MB em trânsito)."
+            )
+            return
+
+        logger.info(
+            f"Tamanho do chunk: {self.size} -> {new_size} linhas (limitado por "
+            f"{reason}; último lote de {rows} linhas gravado em {seconds:.2f}s, "
+            f"alvo {self.target_seconds:.2f}s; ~{memory_mb:.0f} MB em trânsito, "
+            f"teto {self.memory_ceiling_bytes / 2**20:.0f} MB)."
+        )
+        self.size = new_size
@@ -1,23 +1,120 @@
 import httpx
+import json
 import logging
 import zipfile
 import tempfile
 import os
 import shutil
-from typing import Optional, List
+from dataclasses import asdict, dataclass
+from typing import IO, AsyncIterator, Optional, List, Tuple
 import asyncio
 import aiofiles
 import aiofiles.os as aio_os
 
+from app.core.config import settings
+from app.services.checkpoint_service import compute_file_hash
+
 
 DATA_URL = "https://dadosabertos.ibama.gov.br/dados/SIFISC/auto_infracao/auto_infracao/auto_infracao_csv.zip"
 
 logger = logging.getLogger(__name__)
 
+# Espera antes da primeira nova tentativa de um segmento; dobra a cada falha.
+SEGMENT_RETRY_DELAY = 0.5
+
+
+class SnapshotChangedError(RuntimeError):
+    pass
+
+
+def preallocate_file(path: str, size: int) -> None:
+    with open(path, "wb") as part_file:
+        if hasattr(os, "posix_fallocate") and size:
+            os.posix_fallocate(part_file.fileno(), 0, size)
+        else:
+            part_file.truncate(size)
+
+
+@dataclass
+class SnapshotState:
+    # Identidade de um snapshot do ZIP publicado pelo IBAMA: os validadores
+    # HTTP devolvidos pelo servidor e o SHA-256 do conteúdo baixado.
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_length: Optional[int] = None
+    sha256: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "SnapshotState":
+        content_length = response.headers.get("content-length")
+        return cls(
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            content_length=int(content_length) if content_length else None,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["SnapshotState"]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as state_file:
+                return cls(**json.load(state_file))
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Estado de download inválido em '{path}' ignorado: {e}")
+            return None
+
+    @property
+    def range_validator(self) -> Optional[str]:
+        # O If-Range exige um validador forte (RFC 9110): com um ETag fraco
+        # (W/"...") o servidor responde 200 a todo pedido de trecho. Nesse caso
+        # vale o Last-Modified.
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+    def save(self, path: str) -> None:
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as state_file:
+            json.dump(asdict(self), state_file)
+        os.replace(temp_path, path)
+
 
 class CrawlerService:
-    def __init__(self, client: httpx.AsyncClient):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        url: str = DATA_URL,
+        download_dir: Optional[str] = None,
+        conditional: bool = True,
+        segments: Optional[int] = None,
+        segment_retries: Optional[int] = None,
+    ):
         self.client = client
+        self.url = url
+        # Com conditional=False (recarga completa), o ZIP é sempre baixado e
+        # entregue, mesmo que seja igual ao último snapshot ingerido.
+        self.conditional = conditional
+        self.download_dir = download_dir or settings.CRAWLER_DOWNLOAD_DIR
+        base_name = os.path.basename(httpx.URL(url).path) or "snapshot.zip"
+        self.zip_path = os.path.join(self.download_dir, base_name)
+        self.part_path = f"{self.zip_path}.part"
+        self.state_path = f"{self.zip_path}.json"
+        self.part_state_path = f"{self.part_path}.json"
+        self.segments_path = f"{self.part_path}.segments"
+        # Conexões simultâneas no download; 1 desliga o download em segmentos.
+        self.segments = max(segments or settings.CRAWLER_DOWNLOAD_SEGMENTS, 1)
+        self.segment_retries = (
+            settings.CRAWLER_SEGMENT_RETRIES
+            if segment_retries is None
+            else segment_retries
+        )
+        # True quando o servidor respondeu 304 ou o conteúdo baixado tem o
+        # mesmo SHA-256 do último snapshot ingerido.
+        self.snapshot_unchanged = False
+        # Snapshot baixado nesta execução, gravado por commit_snapshot() só
+        # depois de ingerido com sucesso.
+        self.pending_snapshot: Optional[SnapshotState] = None
 
     def extract_zip(self, zip_path: str) -> List[str]:
         # initialize here so exception handlers and finally blocks can safely
@@ -71,42 +168,271 @@ class CrawlerService:
                     os.remove(path)
             return []
 
-    async def fetch_and_extract_all_csvs(self) -> Optional[List[str]]:
-        # ensure this is defined before the try so finally can reference it
-        temp_zip_file_path: Optional[str] = None
+    def _discard_partial(self) -> None:
+        for path in (self.part_path, self.part_state_path, self.segments_path):
+            if os.path.exists(path):
+                os.remove(path)
 
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".zip", delete=True) as temp_file:
-                temp_zip_file_path = temp_file.name
+    def _request_headers(self, previous: Optional[SnapshotState]) -> dict:
+        part_state = SnapshotState.load(self.part_state_path)
+        if part_state is not None and os.path.exists(self.part_path):
+            offset = os.path.getsize(self.part_path)
+            # If-Range: se o arquivo mudou no servidor, a resposta é um 200
+            # com o conteúdo inteiro em vez do trecho que falta.
+            validator = part_state.range_validator
+            if offset and validator:
+                return {"Range": f"bytes={offset}-", "If-Range": validator}
 
-            logger.info(f"Iniciando pipeline de crawler para: {DATA_URL}")
+        self._discard_partial()
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        return headers
 
-            async with aiofiles.open(temp_zip_file_path, "wb") as temp_zip_file:
-                logger.info(f"Criado arquivo temporário para ZIP: {temp_zip_file_path}")
+    def _can_split(self, response: httpx.Response, snapshot: SnapshotState) -> bool:
+        if self.segments <= 1 or not snapshot.content_length:
+            return False
+        if response.headers.get("accept-ranges", "").lower() != "bytes":
+            logger.info(
+                "Servidor não anuncia Accept-Ranges; baixando o ZIP em uma conexão."
+            )
+            return False
+        if not snapshot.range_validator:
+            # Sem validador forte não há If-Range: um segmento poderia vir de
+            # outra versão do arquivo.
+            logger.info(
+                "Servidor sem ETag forte nem Last-Modified; baixando em uma conexão."
+            )
+            return False
+        return True
+
+    async def _download_stream(self, previous: Optional[SnapshotState]) -> bool:
+        # Download em uma conexão (ou retomada de um .part sequencial). Devolve
+        # False quando o servidor respondeu 304.
+        for _ in range(2):
+            headers = self._request_headers(previous)
+            async with self.client.stream(
+                "GET", self.url, headers=headers, follow_redirects=True, timeout=400.0
+            ) as response:
+                if response.status_code == 304:
+                    logger.info("ZIP do IBAMA não mudou desde o último snapshot (304).")
+                    return False
+                if response.status_code == 416:
+                    # O trecho já baixado não corresponde ao arquivo atual.
+                    logger.warning("Download parcial inválido; reiniciando do zero.")
+                    self._discard_partial()
+                    continue
+                response.raise_for_status()
+
+                if response.status_code == 206:
+                    mode = "ab"
+                    logger.info(
+                        f"Retomando o download do ZIP a partir do byte "
+                        f"{os.path.getsize(self.part_path)}."
+                    )
+                else:
+                    snapshot = SnapshotState.from_response(response)
+                    snapshot.save(self.part_state_path)
+                    if self._can_split(response, snapshot):
+                        # O corpo desta resposta é descartado ao sair do bloco;
+                        # os segmentos são pedidos em novas conexões.
+                        break
+                    mode = "wb"
+                    logger.info(f"Baixando o ZIP para: {self.part_path}")
+
+                async with aiofiles.open(self.part_path, mode) as part_file:
+                    async for chunk in response.aiter_bytes():
+                        await part_file.write(chunk)
+                return True
+        else:
+            raise RuntimeError("Não foi possível retomar o download do ZIP.")
+
+        await self._download_segments(snapshot)
+        return True
+
+    def _segment_ranges(self, content_length: int) -> List[Tuple[int, int]]:
+        segment_size = -(-content_length // self.segments)
+        return [
+            (start, min(start + segment_size, content_length) - 1)
+            for start in range(0, content_length, segment_size)
+        ]
+
+    def _save_segments(self, done: set) -> None:
+        temp_path = f"{self.segments_path}.tmp"
+        with open(temp_path, "w") as segments_file:
+            json.dump(sorted(done), segments_file)
+        os.replace(temp_path, self.segments_path)
+
+    async def _download_segments(
+        self, snapshot: SnapshotState, done: Optional[set] = None
+    ) -> None:
+        # Download em paralelo: o arquivo .part é pré-alocado com o tamanho
+        # final e cada segmento (um Range) é gravado no seu offset por uma
+        # conexão própria do cliente compartilhado. Os segmentos concluídos
+        # ficam registrados em .part.segments para uma retomada posterior.
+        ranges = self._segment_ranges(snapshot.content_length)
+        if done is None:
+            done = set()
+            await asyncio.to_thread(
+                preallocate_file, self.part_path, snapshot.content_length
+            )
+            self._save_segments(done)
+        pending = [index for index in range(len(ranges)) if index not in done]
+        logger.info(
+            f"Baixando o ZIP em {len(pending)} de {len(ranges)} segmentos paralelos "
+            f"({snapshot.content_length} bytes) para: {self.part_path}"
+        )
+
+        async def fetch(index: int) -> None:
+            await self._fetch_segment(snapshot, *ranges[index])
+            done.add(index)
+            self._save_segments(done)
 
+        tasks = [asyncio.create_task(fetch(index)) for index in pending]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Um segmento esgotou as tentativas: interrompe os demais. Os já
+            # concluídos continuam registrados para a próxima execução.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        os.remove(self.segments_path)
+
+    async def _fetch_segment(
+        self, snapshot: SnapshotState, start: int, end: int
+    ) -> None:
+        validator = snapshot.range_validator
+        position = start
+        for attempt in range(1, self.segment_retries + 2):
+            try:
+                headers = {"Range": f"bytes={position}-{end}", "If-Range": validator}
                 async with self.client.stream(
-                    "GET", DATA_URL, follow_redirects=True, timeout=400.0
+                    "GET",
+                    self.url,
+                    headers=headers,
+                    follow_redirects=True,
+                    timeout=400.0,
                 ) as response:
+                    if response.status_code == 200:
+                        # If-Range falhou: o arquivo mudou no servidor.
+                        raise SnapshotChangedError(
+                            "O ZIP mudou no servidor durante o download."
+                        )
                     response.raise_for_status()
+                    content_range = response.headers.get("content-range", "")
+                    if not content_range.startswith(f"bytes {position}-"):
+                        raise SnapshotChangedError(
+                            f"Content-Range inesperado: '{content_range}'."
+                        )
+                    async with aiofiles.open(self.part_path, "r+b") as part_file:
+                        await part_file.seek(position)
+                        async for chunk in response.aiter_bytes():
+                            # Nunca grava além do fim do segmento.
+                            chunk = chunk[: end + 1 - position]
+                            await part_file.write(chunk)
+                            position += len(chunk)
+                if position <= end:
+                    raise httpx.RemoteProtocolError(
+                        f"Segmento {start}-{end} encerrado no byte {position}."
+                    )
+                return
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if attempt > self.segment_retries:
+                    raise
+                delay = SEGMENT_RETRY_DELAY * 2 ** (attempt - 1)
+                logger.warning(
+                    f"Falha no segmento {start}-{end} (tentativa {attempt}): {e}. "
+                    f"Retomando do byte {position} em {delay:.1f}s."
+                )
+                await asyncio.sleep(delay)
 
-                    async for chunk in response.aiter_bytes():
-                        await temp_zip_file.write(chunk)
+    async def _resume_segments(self) -> bool:
+        snapshot = SnapshotState.load(self.part_state_path)
+        try:
+            with open(self.segments_path) as segments_file:
+                done = set(json.load(segments_file))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Segmentos do download anterior ilegíveis: {e}")
+            done = None
+        if snapshot is None or done is None or not snapshot.content_length:
+            self._discard_partial()
+            return False
 
-                    await temp_zip_file.flush()
+        try:
+            await self._download_segments(snapshot, done)
+        except SnapshotChangedError as e:
+            logger.warning(f"{e} Reiniciando o download do zero.")
+            self._discard_partial()
+            return False
+        return True
 
-                logger.info(
-                    f"Download do ZIP concluído. Bytes: {os.path.getsize(temp_zip_file_path)}"
-                )
+    async def download_zip(self) -> Optional[str]:
+        # Devolve o caminho do ZIP baixado, ou None quando o snapshot não mudou.
+        # Uma queda de conexão deixa o arquivo .part em disco; a próxima
+        # execução pede apenas o restante com um Range (ou, no download em
+        # paralelo, apenas os segmentos que faltam).
+        await aio_os.makedirs(self.download_dir, exist_ok=True)
+        previous = SnapshotState.load(self.state_path) if self.conditional else None
 
-                extracted_paths = await asyncio.to_thread(
-                    self.extract_zip, temp_zip_file_path
-                )
+        resumed = os.path.exists(self.segments_path) and await self._resume_segments()
+        if not resumed and not await self._download_stream(previous):
+            self.snapshot_unchanged = True
+            return None
+
+        snapshot = SnapshotState.load(self.part_state_path) or SnapshotState()
+        size = os.path.getsize(self.part_path)
+        if snapshot.content_length is not None and size != snapshot.content_length:
+            raise RuntimeError(
+                f"Download incompleto: {size} de {snapshot.content_length} bytes."
+            )
+        snapshot.sha256 = await asyncio.to_thread(compute_file_hash, self.part_path)
+        logger.info(f"Download do ZIP concluído. Bytes: {size}")
+
+        if previous is not None and previous.sha256 == snapshot.sha256:
+            logger.info("ZIP do IBAMA idêntico ao último snapshot (mesmo SHA-256).")
+            self._discard_partial()
+            # Atualiza os validadores para que a próxima execução receba um 304.
+            snapshot.save(self.state_path)
+            self.snapshot_unchanged = True
+            return None
 
-                if not extracted_paths:
-                    logger.error("Nenhum CSV foi extraído do arquivo ZIP.")
-                    return None
+        os.replace(self.part_path, self.zip_path)
+        os.remove(self.part_state_path)
+        self.pending_snapshot = snapshot
+        return self.zip_path
 
-                return extracted_paths
+    def commit_snapshot(self) -> None:
+        # Chamado depois que todos os arquivos do snapshot foram ingeridos: a
+        # partir daí, as execuções seguintes o consideram já processado.
+        if self.pending_snapshot is not None:
+            self.pending_snapshot.save(self.state_path)
+            self.pending_snapshot = None
+
+    async def fetch_and_extract_all_csvs(self) -> Optional[List[str]]:
+        # ensure this is defined before the try so finally can reference it
+        temp_zip_file_path: Optional[str] = None
+
+        try:
+            logger.info(f"Iniciando pipeline de crawler para: {self.url}")
+
+            temp_zip_file_path = await self.download_zip()
+            if temp_zip_file_path is None:
+                return None
+
+            extracted_paths = await asyncio.to_thread(
+                self.extract_zip, temp_zip_file_path
+            )
+
+            if not extracted_paths:
+                logger.error("Nenhum CSV foi extraído do arquivo ZIP.")
+                return None
+
+            return extracted_paths
 
         except httpx.RequestError as e:
             logger.error(f"Erro de HTTP (rede/timeout) ao tentar baixar o arquivo: {e}")
@@ -118,3 +444,48 @@ class CrawlerService:
             if temp_zip_file_path and await aio_os.path.exists(temp_zip_file_path):
                 await aio_os.remove(temp_zip_file_path)
                 logger.info(f"Arquivo ZIP temporário removido: {temp_zip_file_path}")
+
+    async def fetch_csv_streams(
+        self,
+    ) -> AsyncIterator[Tuple[zipfile.ZipInfo, IO[bytes]]]:
+        # Variante sem extração: cada CSV é entregue como um stream lido direto do
+        # ZIP, um membro por vez, e fechado quando o consumidor pede o próximo.
+        # O único arquivo em disco é o próprio ZIP.
+        temp_zip_file_path: Optional[str] = None
+
+        try:
+            logger.info(f"Iniciando pipeline de crawler (streaming) para: {self.url}")
+
+            temp_zip_file_path = await self.download_zip()
+            if temp_zip_file_path is None:
+                return
+
+            with zipfile.ZipFile(temp_zip_file_path, "r") as zip_ref:
+                csv_members = [
+                    f
+                    for f in zip_ref.infolist()
+                    if not f.is_dir() and f.filename.lower().endswith(".csv")
+                ]
+
+                if not csv_members:
+                    logger.error("Nenhum arquivo CSV encontrado dentro do ZIP.")
+                    return
+
+                logger.info(
+                    f"Encontrados {len(csv_members)} arquivos CSV: "
+                    f"{[f.filename for f in csv_members]}"
+                )
+
+                for member in csv_members:
+                    logger.debug(f"Abrindo stream do arquivo: {member.filename}")
+                    with zip_ref.open(member) as csv_stream:
+                        yield member, csv_stream
+
+        except zipfile.BadZipFile:
+            logger.error("Erro: O arquivo ZIP está corrompido ou é inválido.")
+        except httpx.RequestError as e:
+            logger.error(f"Erro de HTTP (rede/timeout) ao tentar baixar o arquivo: {e}")
+        finally:
+            if temp_zip_file_path and await aio_os.path.exists(temp_zip_file_path):
+                await aio_os.remove(temp_zip_file_path)
+                logger.info(f"Arquivo ZIP temporário removido: {temp_zip_file_path}")
@@ -0,0 +1,167 @@
+import enum
+import io
+from typing import IO
+
+import pandas as pd
+from pandas.io.parsers.readers import TextFileReader
+
+from app.services.csv_schema import (
+    CATEGORICAL_COLUMNS,
+    COLUMN_MAPPING,
+    CSV_DECIMAL,
+    CSV_DELIMITER,
+    CSV_DTYPES,
+    CSV_ENCODING,
+)
+
+# Tamanho dos blocos lidos pelo PyArrow; cada bloco é decodificado em paralelo.
+ARROW_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+class CsvReaderEngine(str, enum.Enum):
+    PANDAS = "pandas"
+    PYARROW = "pyarrow"
+
+
+class CountingStream(io.RawIOBase):
+    # Conta os bytes entregues ao leitor de CSV, que não expõe a posição no
+    # arquivo; usado para medir a vazão em MB/s e estimar o tempo restante.
+    def __init__(self, raw: IO[bytes], owns_raw: bool = False):
+        self._raw = raw
+        self._owns_raw = owns_raw
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.bytes_read += size
+        return size
+
+    def close(self) -> None:
+        if self._owns_raw and not self.closed:
+            self._raw.close()
+        super().close()
+
+
+def open_counted(source: str | IO[bytes]) -> tuple[io.BufferedReader, CountingStream]:
+    if isinstance(source, str):
+        counter = CountingStream(open(source, "rb"), owns_raw=True)
+    else:
+        counter = CountingStream(source)
+    return io.BufferedReader(counter), counter
+
+
+def get_next_chunk(iterator, size: int | None = None) -> pd.DataFrame | None:
+    # Com size, lê um chunk desse tamanho em vez do chunk_size do leitor.
+    try:
+        if size is not None:
+            return iterator.get_chunk(size)
+        return next(iterator)
+    except StopIteration:
+        return None
+
+
+class ArrowChunkReader:
+    # Leitor em streaming do PyArrow com a mesma interface usada do
+    # TextFileReader (next/get_chunk/close). Os record batches, cujo tamanho
+    # depende do block_size em bytes, são reagrupados em chunks de N linhas.
+    def __init__(self, source: str | IO[bytes], chunk_size: int, rows_to_skip: int = 0):
+        try:
+            import pyarrow as pa
+            from pyarrow import csv as pa_csv
+        except ImportError as e:
+            raise RuntimeError(
+                "O leitor 'pyarrow' requer o pacote pyarrow (pip install pyarrow)."
+            ) from e
+
+        self._pa = pa
+        self.chunk_size = chunk_size
+
+        # Valores numéricos com vírgula decimal são lidos como texto e
+        # convertidos na transformação, com errors="coerce".
+        column_types = {
+            column: pa.dictionary(pa.int32(), pa.string())
+            if column in CATEGORICAL_COLUMNS
+            else pa.string()
+            for column in COLUMN_MAPPING
+        }
+        column_types["SEQ_AUTO_INFRACAO"] = pa.int64()
+
+        self._reader = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(
+                encoding=CSV_ENCODING,
+                use_threads=True,
+                block_size=ARROW_BLOCK_SIZE,
+                skip_rows_after_names=rows_to_skip,
+            ),
+            parse_options=pa_csv.ParseOptions(
+                delimiter=CSV_DELIMITER, newlines_in_values=True
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=list(COLUMN_MAPPING.keys()),
+                column_types=column_types,
+                strings_can_be_null=True,
+            ),
+        )
+        self._types_mapper = {pa.int64(): pd.Int64Dtype()}.get
+        self._pending: list = []
+        self._pending_rows = 0
+        self._exhausted = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> pd.DataFrame:
+        return self.get_chunk()
+
+    def get_chunk(self, size: int | None = None) -> pd.DataFrame:
+        size = size or self.chunk_size
+
+        while self._pending_rows < size and not self._exhausted:
+            try:
+                batch = self._reader.read_next_batch()
+            except StopIteration:
+                self._exhausted = True
+                break
+            self._pending.append(batch)
+            self._pending_rows += batch.num_rows
+
+        if self._pending_rows == 0:
+            raise StopIteration
+
+        table = self._pa.Table.from_batches(self._pending)
+        remainder = table.slice(size)
+        self._pending = remainder.to_batches()
+        self._pending_rows = remainder.num_rows
+
+        return table.slice(0, size).to_pandas(types_mapper=self._types_mapper)
+
+    def close(self) -> None:
+        self._reader.close()
+
+
+def open_csv_reader(
+    source: str | IO[bytes],
+    chunk_size: int,
+    engine: CsvReaderEngine = CsvReaderEngine.PANDAS,
+    rows_to_skip: int = 0,
+) -> TextFileReader | ArrowChunkReader:
+    if engine == CsvReaderEngine.PYARROW:
+        return ArrowChunkReader(source, chunk_size, rows_to_skip)
+
+    return pd.read_csv(
+        source,
+        chunksize=chunk_size,
+        usecols=list(COLUMN_MAPPING.keys()),
+        dtype=CSV_DTYPES,
+        decimal=CSV_DECIMAL,
+        delimiter=CSV_DELIMITER,
+        encoding=CSV_ENCODING,
+        # A linha 0 é o cabeçalho; as linhas de dados já confirmadas são puladas.
+        skiprows=(lambda i: 0 < i <= rows_to_skip) if rows_to_skip else None,
+    )
@@ -0,0 +1,60 @@
+COLUMN_MAPPING = {
+    "SEQ_AUTO_INFRACAO": "source_id",
+    "NUM_AUTO_INFRACAO": "infraction_number",
+    "NU_PROCESSO_FORMATADO": "process_number",
+    "DES_STATUS_FORMULARIO": "status",
+    "TIPO_AUTO": "sanction_type",
+    "GRAVIDADE_INFRACAO": "gravity",
+    "VAL_AUTO_INFRACAO": "fine_value",
+    "DAT_HORA_AUTO_INFRACAO": "infraction_datetime",
+    "DT_FATO_INFRACIONAL": "fact_date",
+    "DT_LANCAMENTO": "system_launch_date",
+    "DT_ULT_ALTERACAO": "last_updated_date",
+    "NOME_INFRATOR": "offender_name",
+    "CPF_CNPJ_INFRATOR": "offender_document",
+    "DES_AUTO_INFRACAO": "description",
+    "DES_INFRACAO": "infraction_type_description",
+    "MUNICIPIO": "municipality",
+    "UF": "state",
+    "DES_LOCAL_INFRACAO": "location_description",
+    "NUM_LONGITUDE_AUTO": "longitude",
+    "NUM_LATITUDE_AUTO": "latitude",
+    "DS_BIOMAS_ATINGIDOS": "affected_biomes",
+}
+
+CSV_DELIMITER = ";"
+CSV_ENCODING = "latin-1"
+CSV_DECIMAL = ","
+
+# Campos de baixa cardinalidade: lidos como category, cada valor distinto é
+# armazenado uma única vez por chunk.
+CATEGORICAL_COLUMNS = [
+    "DES_STATUS_FORMULARIO",
+    "TIPO_AUTO",
+    "GRAVIDADE_INFRACAO",
+    "UF",
+]
+
+# Valores com vírgula decimal. O dtype não é forçado na leitura: um valor
+# malformado faria o read_csv abortar o arquivo inteiro. Com decimal="," o
+# parser já entrega float64 quando o chunk está limpo, e a transformação
+# converte com errors="coerce" quando não está.
+NUMERIC_COLUMNS = [
+    "VAL_AUTO_INFRACAO",
+    "NUM_LONGITUDE_AUTO",
+    "NUM_LATITUDE_AUTO",
+]
+
+# Formato esperado de cada coluna de data nos arquivos do IBAMA.
+DATE_FORMATS = {
+    "DAT_HORA_AUTO_INFRACAO": "%Y-%m-%d %H:%M:%S",
+    "DT_FATO_INFRACIONAL": "%Y-%m-%d",
+    "DT_LANCAMENTO": "%Y-%m-%d",
+    "DT_ULT_ALTERACAO": "%Y-%m-%d %H:%M:%S",
+}
+
+CSV_DTYPES: dict[str, str] = {
+    column: "object" for column in COLUMN_MAPPING if column not in NUMERIC_COLUMNS
+}
+CSV_DTYPES.update({column: "category" for column in CATEGORICAL_COLUMNS})
+CSV_DTYPES["SEQ_AUTO_INFRACAO"] = "Int64"
@@ -0,0 +1,28 @@
+import logging
+
+from redis.exceptions import RedisError
+
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Contador incrementado a cada commit da ingestão na tabela infractions. Os
+# caches de consultas incluem a versão na chave: depois de um incremento, as
+# entradas antigas deixam de ser lidas e expiram pelo TTL.
+DATASET_VERSION_KEY = "infractions:dataset_version"
+
+
+async def get_dataset_version() -> int:
+    return int(await redis_client.get(DATASET_VERSION_KEY) or 0)
+
+
+async def bump_dataset_version() -> int | None:
+    try:
+        version = await redis_client.incr(DATASET_VERSION_KEY)
+    except RedisError as e:
+        # A ingestão não falha por causa do cache; as entradas antigas só
+        # deixam de valer quando o TTL expirar.
+        logger.warning(f"Não foi possível atualizar a versão do dataset: {e}")
+        return None
+    logger.debug(f"Versão do dataset atualizada para {version}.")
+    return version
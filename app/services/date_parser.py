@@ -0,0 +1,53 @@
+import pandas as pd
+
+# Formatos aceitos nas colunas de data, testados na detecção depois do
+# formato esperado da coluna (csv_schema.DATE_FORMATS).
+DATE_FORMAT_CANDIDATES = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+]
+
+# Valores distintos de cada coluna usados para escolher o formato.
+DETECTION_SAMPLE_SIZE = 1000
+
+
+def detect_date_format(series: pd.Series, expected_format: str) -> str:
+    sample = series.dropna().drop_duplicates().head(DETECTION_SAMPLE_SIZE)
+    if sample.empty:
+        return expected_format
+
+    sample = sample.astype(str)
+    best_format, best_parsed = expected_format, -1
+    candidates = [expected_format] + [
+        fmt for fmt in DATE_FORMAT_CANDIDATES if fmt != expected_format
+    ]
+    for date_format in candidates:
+        parsed = pd.to_datetime(sample, format=date_format, errors="coerce").notna()
+        if parsed.all():
+            return date_format
+        if parsed.sum() > best_parsed:
+            best_format, best_parsed = date_format, parsed.sum()
+    return best_format
+
+
+def detect_date_formats(
+    chunk_df: pd.DataFrame, expected_formats: dict[str, str]
+) -> dict[str, str]:
+    # Executada uma vez por arquivo, sobre o primeiro chunk.
+    return {
+        col: detect_date_format(chunk_df[col], expected_format)
+        for col, expected_format in expected_formats.items()
+        if col in chunk_df.columns
+    }
+
+
+def parse_dates(series: pd.Series, date_format: str) -> pd.Series:
+    # Formato explícito, sem inferência valor a valor. Com cache=True o pandas
+    # converte cada texto distinto do chunk uma única vez (datas se repetem
+    # muito entre autos do mesmo dia). Valores fora do formato viram NaT.
+    return pd.to_datetime(series, format=date_format, errors="coerce", cache=True)
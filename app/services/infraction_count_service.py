@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+from datetime import date
+from decimal import Decimal
+
+from redis.exceptions import RedisError
+from sqlalchemy import Dialect, Select, func, select
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.db.session import AsyncSession
+from app.schemas.infraction import TotalMode
+from app.services.dataset_version import get_dataset_version
+from app.services.text_search import SEARCH_COLUMNS, normalize_search_text
+
+logger = logging.getLogger(__name__)
+
+COUNT_KEY_PREFIX = "infractions:count:"
+
+# Filtros de busca textual (MATCH + LIKE nas colunas *_search): a comparação
+# ignora acentos e maiúsculas, então a chave do cache também.
+SEARCH_FILTERS = set(SEARCH_COLUMNS)
+
+
+def normalize_filters(filters: dict) -> dict:
+    # Mesma regra de get_infractions: valores vazios não filtram.
+    normalized = {}
+    for name, value in sorted(filters.items()):
+        if not value:
+            continue
+        if isinstance(value, Decimal):
+            value = format(value.normalize(), "f")
+        elif isinstance(value, date):
+            value = value.isoformat()
+        elif isinstance(value, str) and name in SEARCH_FILTERS:
+            value = normalize_search_text(value)
+        normalized[name] = value
+    return normalized
+
+
+def filters_digest(filters: dict) -> str:
+    payload = json.dumps(normalize_filters(filters), sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def count_key(version: int, filters: dict) -> str:
+    return f"{COUNT_KEY_PREFIX}{version}:{filters_digest(filters)}"
+
+
+def estimate_from_plan(plan: dict) -> int:
+    # EXPLAIN FORMAT=JSON de uma consulta em uma tabela: linhas lidas pelo
+    # acesso escolhido vezes a fração estimada que passa pelos filtros.
+    table = plan.get("query_block", {}).get("table")
+    if not table:
+        # Ex.: "Impossible WHERE", quando o otimizador já sabe que não há linhas.
+        return 0
+    rows = table.get("rows_examined_per_scan", 0)
+    filtered = float(table.get("filtered", 100))
+    return int(round(rows * filtered / 100))
+
+
+def explain_statement(stmt: Select, dialect: Dialect) -> tuple[str, tuple]:
+    # render_postcompile expande os IN com lista (ex.: o filtro de biomas) em
+    # um placeholder por valor; sem ele o SQL enviado ao driver ficaria com
+    # "__[POSTCOMPILE_...]" e o EXPLAIN falharia.
+    compiled = stmt.compile(
+        dialect=dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    return f"EXPLAIN FORMAT=JSON {compiled.string}", params
+
+
+async def explain_row_estimate(db: AsyncSession, stmt: Select) -> int:
+    connection = await db.connection()
+    sql, params = explain_statement(stmt, connection.dialect)
+    result = await connection.exec_driver_sql(sql, params)
+    return estimate_from_plan(json.loads(result.scalar()))
+
+
+async def count_infractions(
+    db: AsyncSession, stmt: Select, filters: dict, mode: TotalMode
+) -> tuple[int | None, bool]:
+    # Devolve (total, estimado). Totais exatos ficam no Redis por conjunto de
+    # filtros e versão do dataset; a versão é lida antes da contagem, então
+    # uma ingestão concorrente nunca deixa um total antigo na chave nova.
+    if mode is TotalMode.NONE:
+        return None, False
+
+    key = None
+    try:
+        key = count_key(await get_dataset_version(), filters)
+        cached = await redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Cache de contagens indisponível: {e}")
+        cached = None
+    if cached is not None:
+        return int(cached), False
+
+    if mode is TotalMode.ESTIMATE:
+        return await explain_row_estimate(db, stmt), True
+
+    count_stmt = select(func.count()).select_from(stmt.subquery())
+    total = (await db.execute(count_stmt)).scalar() or 0
+    if key is not None:
+        try:
+            await redis_client.set(
+                key, total, ex=settings.INFRACTIONS_COUNT_CACHE_TTL_SECONDS
+            )
+        except RedisError as e:
+            logger.warning(f"Não foi possível gravar a contagem no cache: {e}")
+    return total, False
@@ -1,8 +1,35 @@
 from app.models.infraction import Infraction
 from app.db.session import AsyncSession
-from datetime import date
+from app.schemas.infraction import TotalMode
+from app.services import infraction_count_service
+from app.services.biome_mask import masks_containing, parse_biome_filter
+from app.services.text_search import search_predicate
+from datetime import date, datetime
 from decimal import Decimal
-from sqlalchemy import select, func
+from sqlalchemy import and_, or_, select
+import base64
+import json
+
+
+# Cursor opaco da paginação por keyset: (infraction_datetime, id) da última
+# infração entregue, em JSON codificado em base64 url-safe.
+def encode_cursor(infraction: Infraction) -> str:
+    payload = json.dumps(
+        [infraction.infraction_datetime.isoformat(), infraction.id],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_datetime, infraction_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(infraction_id, int):
+            raise TypeError("id do cursor não é inteiro")
+        return datetime.fromisoformat(raw_datetime), infraction_id
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
 
 
 async def get_infractions(
@@ -20,8 +47,22 @@ async def get_infractions(
     municipality: str | None = None,
     state: str | None = None,
     affected_biomes: str | None = None,
-) -> tuple[int, list[Infraction]]:
+    cursor: tuple[datetime, int] | None = None,
+    total_mode: TotalMode = TotalMode.EXACT,
+) -> tuple[int | None, bool, list[Infraction]]:
     stmt = select(Infraction)
+    filters = {
+        "source_id": source_id,
+        "infraction_number": infraction_number,
+        "offender_name": offender_name,
+        "offender_document": offender_document,
+        "start_date": start_date,
+        "end_date": end_date,
+        "min_fine_value": min_fine_value,
+        "municipality": municipality,
+        "state": state,
+        "affected_biomes": affected_biomes,
+    }
 
     if source_id:
         stmt = stmt.where(Infraction.source_id == source_id)
@@ -30,7 +71,9 @@ async def get_infractions(
         stmt = stmt.where(Infraction.infraction_number == infraction_number)
 
     if offender_name:
-        stmt = stmt.where(Infraction.offender_name.ilike(f"%{offender_name}%"))
+        stmt = stmt.where(
+            search_predicate(Infraction.offender_name_search, offender_name)
+        )
 
     if offender_document:
         stmt = stmt.where(Infraction.offender_document == offender_document)
@@ -45,23 +88,51 @@ async def get_infractions(
         stmt = stmt.where(Infraction.fine_value >= min_fine_value)
 
     if municipality:
-        stmt = stmt.where(Infraction.municipality.ilike(f"%{municipality}%"))
+        stmt = stmt.where(
+            search_predicate(Infraction.municipality_search, municipality)
+        )
 
     if state:
         stmt = stmt.where(Infraction.state == state)
 
     if affected_biomes:
-        stmt = stmt.where(Infraction.affected_biomes.ilike(f"%{affected_biomes}%"))
-
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    result_stmt = (
-        stmt.order_by(Infraction.infraction_datetime.desc()).offset(skip).limit(limit)
+        # Uma lista de biomas conhecidos vira um IN sobre o índice de
+        # biome_mask; qualquer outro texto continua sendo uma busca textual.
+        biome_mask = parse_biome_filter(affected_biomes)
+        if biome_mask is not None:
+            stmt = stmt.where(Infraction.biome_mask.in_(masks_containing(biome_mask)))
+        else:
+            stmt = stmt.where(
+                search_predicate(Infraction.affected_biomes_search, affected_biomes)
+            )
+
+    total, total_estimated = await infraction_count_service.count_infractions(
+        db, stmt, filters, total_mode
     )
 
+    # O id desempata infrações com a mesma data, o que torna a ordem estável
+    # entre páginas; ambos vêm do índice ix_infractions_infraction_datetime_id.
+    result_stmt = stmt.order_by(
+        Infraction.infraction_datetime.desc(), Infraction.id.desc()
+    ).limit(limit)
+
+    if cursor:
+        # Keyset: continua logo após a última infração entregue, sem OFFSET.
+        # O "<=" isolado permite ao MySQL usar o índice como range.
+        cursor_datetime, cursor_id = cursor
+        result_stmt = result_stmt.where(
+            and_(
+                Infraction.infraction_datetime <= cursor_datetime,
+                or_(
+                    Infraction.infraction_datetime < cursor_datetime,
+                    Infraction.id < cursor_id,
+                ),
+            )
+        )
+    else:
+        result_stmt = result_stmt.offset(skip)
+
     infractions_result = await db.execute(result_stmt)
     infractions = list(infractions_result.scalars().all())
 
-    return total, list(infractions)
+    return total, total_estimated, list(infractions)
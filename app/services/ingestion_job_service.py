@@ -0,0 +1,150 @@
+import json
+import logging
+import time
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.schemas.ingestion_job import JobStatus
+from app.services.ingestion_service import IngestionProgress
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY_PREFIX = "ingestion:job:"
+# Sorted set com os ids dos jobs, pontuados pelo instante de criação.
+JOB_INDEX_KEY = "ingestion:jobs:index"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _job_key(job_id: str) -> str:
+    return f"{JOB_KEY_PREFIX}{job_id}"
+
+
+def progress_fields(progress: IngestionProgress) -> dict:
+    fields = {
+        "chunks_processed": progress.chunk_index,
+        "rows_read": progress.rows_read,
+        "rows_inserted": progress.rows_inserted,
+        "rows_updated": progress.rows_updated,
+        "rows_unchanged": progress.rows_unchanged,
+        "rows_rejected": progress.rows_rejected,
+        "rows_superseded": progress.rows_superseded,
+        "rejects": json.dumps(progress.rejects),
+        "bytes_read": progress.bytes_read,
+        "elapsed_seconds": round(progress.elapsed_seconds, 3),
+        "rows_per_second": round(progress.rows_per_second, 1),
+        "mb_per_second": round(progress.mb_per_second, 3),
+    }
+    if progress.bytes_total is not None:
+        fields["bytes_total"] = progress.bytes_total
+    if progress.rejects_path is not None:
+        fields["rejects_path"] = progress.rejects_path
+    if progress.eta_seconds is not None:
+        fields["eta_seconds"] = round(progress.eta_seconds, 1)
+    return fields
+
+
+async def create_job(job_id: str, file_name: str, enqueued_at: str) -> None:
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(
+            _job_key(job_id),
+            mapping={
+                "job_id": job_id,
+                "file_name": file_name,
+                "status": JobStatus.QUEUED.value,
+                "enqueued_at": enqueued_at,
+                "attempts": 0,
+            },
+        )
+        pipe.zadd(JOB_INDEX_KEY, {job_id: time.time()})
+        await pipe.execute()
+
+
+async def mark_queued(job_id: str) -> None:
+    await redis_client.hset(_job_key(job_id), "status", JobStatus.QUEUED.value)
+
+
+async def mark_running(job_id: str, worker_id: str, attempts: int) -> None:
+    await redis_client.hset(
+        _job_key(job_id),
+        mapping={
+            "status": JobStatus.RUNNING.value,
+            "worker_id": worker_id,
+            "attempts": attempts,
+            "started_at": _now(),
+        },
+    )
+
+
+async def mark_finished(
+    job_id: str,
+    status: JobStatus,
+    progress: IngestionProgress | None = None,
+    error: str | None = None,
+) -> None:
+    fields: dict = {"status": status.value}
+    if progress is not None:
+        fields.update(progress_fields(progress))
+    if error:
+        fields["error"] = error
+
+    key = _job_key(job_id)
+    is_final = status in (JobStatus.COMPLETED, JobStatus.FAILED)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        if is_final:
+            fields["finished_at"] = _now()
+            fields.pop("eta_seconds", None)
+            pipe.hdel(key, "eta_seconds")
+        pipe.hset(key, mapping=fields)
+        if is_final:
+            pipe.expire(key, settings.INGESTION_JOB_RETENTION_SECONDS)
+        await pipe.execute()
+
+
+async def get_job(job_id: str) -> dict | None:
+    job = await redis_client.hgetall(_job_key(job_id))
+    return job or None
+
+
+async def list_jobs(limit: int = 50, offset: int = 0) -> list[dict]:
+    # Remove do índice os jobs cujo hash já expirou.
+    await redis_client.zremrangebyscore(
+        JOB_INDEX_KEY, "-inf", time.time() - settings.INGESTION_JOB_RETENTION_SECONDS
+    )
+    job_ids = await redis_client.zrevrange(JOB_INDEX_KEY, offset, offset + limit - 1)
+    if not job_ids:
+        return []
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for job_id in job_ids:
+            pipe.hgetall(_job_key(job_id))
+        jobs = await pipe.execute()
+    return [job for job in jobs if job]
+
+
+class JobProgressReporter:
+    # Publica o progresso no hash do job apenas a cada N chunks: um HSET
+    # eventual não pesa no laço de ingestão.
+    def __init__(self, job_id: str, flush_every: int | None = None):
+        self.job_id = job_id
+        self.flush_every = flush_every or settings.INGESTION_PROGRESS_FLUSH_EVERY
+        self.error: str | None = None
+        self._chunks = 0
+
+    async def on_chunk(self, progress: IngestionProgress) -> None:
+        self._chunks += 1
+        if self._chunks % self.flush_every:
+            return
+        try:
+            await redis_client.hset(
+                _job_key(self.job_id), mapping=progress_fields(progress)
+            )
+        except Exception as e:
+            # Falhas ao publicar o progresso não interrompem a ingestão.
+            logger.warning(f"Job {self.job_id}: progresso não publicado: {e}")
+
+    def record_error(self, message: str) -> None:
+        self.error = message
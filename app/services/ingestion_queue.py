@@ -0,0 +1,264 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.services import ingestion_job_service
+from app.schemas.ingestion_job import JobStatus
+from app.services.ingestion_job_service import JobProgressReporter
+from app.services.ingestion_service import IngestionService
+
+logger = logging.getLogger(__name__)
+
+# Fila confiável: o worker move o job de PENDING para a sua própria lista de
+# processamento (BLMOVE, atômico) e só o remove de lá ao terminar. Um job de
+# um worker que morreu continua no Redis e volta para PENDING.
+PENDING_KEY = "ingestion:jobs:pending"
+FAILED_KEY = "ingestion:jobs:failed"
+PROCESSING_KEY_PREFIX = "ingestion:jobs:processing:"
+WORKER_KEY_PREFIX = "ingestion:workers:"
+
+# Tempo máximo de bloqueio do BLMOVE, para que o worker perceba o pedido de parada.
+POLL_TIMEOUT_SECONDS = 5
+# Espera antes de tentar de novo depois de uma falha do Redis.
+REDIS_RETRY_SECONDS = 5
+
+
+@dataclass
+class IngestionJob:
+    job_id: str
+    file_path: str
+    file_name: str
+    enqueued_at: str
+    attempts: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "IngestionJob":
+        return cls(**json.loads(raw))
+
+
+def get_upload_dir() -> str:
+    upload_dir = settings.INGESTION_UPLOAD_DIR
+    os.makedirs(upload_dir, exist_ok=True)
+    return upload_dir
+
+
+async def enqueue_file(file_path: str, file_name: str) -> IngestionJob:
+    job = IngestionJob(
+        job_id=uuid.uuid4().hex,
+        file_path=file_path,
+        file_name=file_name,
+        enqueued_at=datetime.now(timezone.utc).isoformat(),
+    )
+    # O hash de acompanhamento é criado antes de o job ficar visível na fila.
+    await ingestion_job_service.create_job(job.job_id, file_name, job.enqueued_at)
+    await redis_client.lpush(PENDING_KEY, job.to_json())
+    logger.info(f"Job {job.job_id} enfileirado para o arquivo '{file_name}'.")
+    return job
+
+
+class IngestionWorker:
+    def __init__(
+        self,
+        service: IngestionService | None = None,
+        worker_id: str | None = None,
+        concurrency: int = 1,
+    ):
+        self.service = service or IngestionService()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.processing_key = f"{PROCESSING_KEY_PREFIX}{self.worker_id}"
+        self.heartbeat_ttl = settings.INGESTION_WORKER_HEARTBEAT_TTL
+        self.max_attempts = settings.INGESTION_JOB_MAX_ATTEMPTS
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        logger.info(
+            f"Worker '{self.worker_id}' iniciado com {self.concurrency} job(s) simultâneo(s)."
+        )
+        await self._beat()
+        await self.requeue_orphans()
+
+        tasks = [
+            asyncio.create_task(self._consume(stop_event))
+            for _ in range(self.concurrency)
+        ]
+        tasks.append(asyncio.create_task(self._heartbeat(stop_event)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await redis_client.delete(f"{WORKER_KEY_PREFIX}{self.worker_id}")
+            logger.info(f"Worker '{self.worker_id}' encerrado.")
+
+    async def _beat(self) -> None:
+        await redis_client.set(
+            f"{WORKER_KEY_PREFIX}{self.worker_id}",
+            datetime.now(timezone.utc).isoformat(),
+            ex=self.heartbeat_ttl,
+        )
+
+    @staticmethod
+    async def _pause(stop_event: asyncio.Event, seconds: float) -> None:
+        # Espera o tempo indicado ou até o pedido de parada, o que vier antes.
+        try:
+            await asyncio.wait_for(stop_event.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _heartbeat(self, stop_event: asyncio.Event) -> None:
+        # Uma falha do Redis não encerra o worker: os jobs em andamento
+        # continuam e o heartbeat é retomado quando o Redis voltar.
+        while not stop_event.is_set():
+            await self._pause(stop_event, self.heartbeat_ttl / 3)
+            if stop_event.is_set():
+                break
+            try:
+                await self._beat()
+                await self.requeue_orphans()
+            except RedisError as e:
+                logger.warning(f"Heartbeat do worker '{self.worker_id}' falhou: {e}")
+
+    async def requeue_orphans(self) -> int:
+        # Devolve para a fila os jobs de workers cujo heartbeat expirou.
+        requeued = 0
+        async for key in redis_client.scan_iter(match=f"{PROCESSING_KEY_PREFIX}*"):
+            worker_id = key[len(PROCESSING_KEY_PREFIX) :]
+            if worker_id == self.worker_id:
+                continue
+            if await redis_client.exists(f"{WORKER_KEY_PREFIX}{worker_id}"):
+                continue
+            while raw := await redis_client.lmove(key, PENDING_KEY, "RIGHT", "RIGHT"):
+                await ingestion_job_service.mark_queued(
+                    IngestionJob.from_json(raw).job_id
+                )
+                requeued += 1
+        if requeued:
+            logger.warning(
+                f"{requeued} job(s) de workers inativos devolvido(s) à fila."
+            )
+        return requeued
+
+    async def _consume(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                raw = await redis_client.blmove(
+                    PENDING_KEY,
+                    self.processing_key,
+                    POLL_TIMEOUT_SECONDS,
+                    "RIGHT",
+                    "LEFT",
+                )
+                if raw is None:
+                    continue
+                await self._handle(raw)
+            except RedisError as e:
+                # Um job interrompido aqui continua na lista de processamento
+                # deste worker e volta para a fila quando o worker parar.
+                logger.error(
+                    f"Redis indisponível no worker '{self.worker_id}': {e}; "
+                    f"nova tentativa em {REDIS_RETRY_SECONDS}s."
+                )
+                await self._pause(stop_event, REDIS_RETRY_SECONDS)
+
+    async def _handle(self, raw: str) -> None:
+        job = IngestionJob.from_json(raw)
+        if job.attempts >= self.max_attempts:
+            # Só acontece com um job devolvido por requeue_orphans: a última
+            # tentativa derrubou o worker (OOM, SIGKILL) antes de terminar.
+            await ingestion_job_service.mark_finished(
+                job.job_id,
+                JobStatus.FAILED,
+                error="Worker interrompido durante a última tentativa.",
+            )
+            await self._finish(raw, job, requeue_to=FAILED_KEY)
+            logger.error(
+                f"Job {job.job_id} derrubou o worker em {self.max_attempts} "
+                f"tentativas; movido para '{FAILED_KEY}'."
+            )
+            if os.path.exists(job.file_path):
+                os.remove(job.file_path)
+            return
+
+        job.attempts += 1
+        raw = await self._record_attempt(raw, job)
+        logger.info(
+            f"Job {job.job_id}: processando '{job.file_name}' "
+            f"(tentativa {job.attempts}/{self.max_attempts})."
+        )
+
+        await ingestion_job_service.mark_running(
+            job.job_id, self.worker_id, job.attempts
+        )
+
+        reporter = JobProgressReporter(job.job_id)
+        progress = None
+        try:
+            # O arquivo só é removido quando o job termina de vez, para que uma
+            # nova tentativa retome do checkpoint.
+            progress = await self.service.process_csv(
+                job.file_path, remove_source=False, reporter=reporter
+            )
+        except Exception as e:
+            logger.error(f"Job {job.job_id}: erro inesperado: {e}", exc_info=True)
+            reporter.record_error(str(e))
+
+        if progress is None and job.attempts < self.max_attempts:
+            await ingestion_job_service.mark_finished(
+                job.job_id, JobStatus.RETRYING, error=reporter.error
+            )
+            await self._finish(raw, job, requeue_to=PENDING_KEY)
+            logger.warning(f"Job {job.job_id} falhou; devolvido à fila.")
+            return
+
+        if progress is not None:
+            await ingestion_job_service.mark_finished(
+                job.job_id, JobStatus.COMPLETED, progress
+            )
+            await self._finish(raw, job)
+            logger.info(f"Job {job.job_id} concluído.")
+        else:
+            await ingestion_job_service.mark_finished(
+                job.job_id, JobStatus.FAILED, error=reporter.error
+            )
+            await self._finish(raw, job, requeue_to=FAILED_KEY)
+            logger.error(
+                f"Job {job.job_id} falhou após {job.attempts} tentativas; "
+                f"movido para '{FAILED_KEY}'."
+            )
+        if os.path.exists(job.file_path):
+            os.remove(job.file_path)
+
+    async def _record_attempt(self, raw: str, job: IngestionJob) -> str:
+        # Grava a tentativa na lista de processamento antes de executar o job:
+        # se o worker morrer, requeue_orphans devolve o job já com o contador
+        # atualizado e ele acaba em FAILED_KEY após max_attempts quedas.
+        updated = job.to_json()
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            pipe.lpush(self.processing_key, updated)
+            await pipe.execute()
+        return updated
+
+    async def _finish(
+        self, raw: str, job: IngestionJob, requeue_to: str | None = None
+    ) -> None:
+        # Remover da lista de processamento e reenfileirar na mesma transação
+        # evita perder o job (ou duplicá-lo) se o worker cair entre os dois.
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            if requeue_to is not None:
+                pipe.lpush(requeue_to, job.to_json())
+            await pipe.execute()
@@ -1,191 +1,1067 @@
 import logging
-from app.db.session import AsyncSessionLocal
+import enum
+from app.db.session import AsyncSessionLocal, BulkSessionLocal
 import pandas as pd
-from sqlalchemy.dialects.mysql import insert
+from sqlalchemy import Table, select
 from app.models.infraction import Infraction
 import os
 import numpy as np
 import asyncio
+import time
 import aiofiles.os as aio_os
-from unidecode import unidecode
 from pandas.io.parsers.readers import TextFileReader
+from pandas.api.types import is_numeric_dtype
+from app.core.config import settings
+from app.services.text_normalizer import TextNormalizer
+from app.services.text_search import SEARCH_COLUMNS
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing as mp
+from app.db.session import AsyncSession
+from app.services import bulk_load_service, checkpoint_service, key_dedup
+from app.services.dataset_version import bump_dataset_version
+from app.services.batch_writer import RowBatch, UpsertWriter
+from app.services.biome_mask import series_mask
+from app.services.bulk_load_service import StagingTable
+from app.services.chunk_sizer import ChunkSizer
+from app.services.csv_reader import (
+    ArrowChunkReader,
+    CountingStream,
+    CsvReaderEngine,
+    get_next_chunk,
+    open_counted,
+    open_csv_reader,
+)
+from app.services.csv_schema import COLUMN_MAPPING, DATE_FORMATS
+from app.services.date_parser import detect_date_formats, parse_dates
+from app.services.reject_sink import REASON_COLUMN, RejectSink
+from dataclasses import dataclass, field
+from typing import IO, Any, Protocol
 
 
 logger = logging.getLogger(__name__)
 
+# Colunas que compõem o row_hash, usado pelo modo delta para detectar linhas
+# que não mudaram desde a última ingestão.
+HASHED_COLUMNS = list(COLUMN_MAPPING.values())
 
-def get_next_chunk(iterator: TextFileReader) -> pd.DataFrame | None:
-    try:
-        return next(iterator)
-    except StopIteration:
-        return None
+# Sentinela que sinaliza o fim do fluxo entre os estágios do pipeline.
+_END_OF_STREAM = object()
+
+
+class IngestionEngine(str, enum.Enum):
+    UPSERT = "upsert"
+    LOAD_DATA = "load-data"
+
+
+@dataclass
+class ChunkBatch:
+    index: int
+    # Linhas de dados da fonte consumidas até o fim deste chunk (inclusive).
+    row_offset: int
+    # DataFrame lido no estágio de leitura; future do PreparedChunk após a
+    # transformação.
+    data: Any
+    # Bytes da fonte lidos pelo parser até este chunk (inclui o read-ahead).
+    byte_offset: int = 0
+    # Linhas da fonte neste chunk (antes de qualquer descarte).
+    rows: int = 0
+
+
+@dataclass
+class ChunkStats:
+    # Linhas descartadas na validação (campos obrigatórios ausentes, datas
+    # inválidas ou números de auto repetidos no chunk).
+    rows_rejected: int = 0
+    # Contagem por regra, no formato "motivo:coluna". Uma linha que viola
+    # várias regras conta em todas, mas é gravada com o primeiro motivo.
+    rejects: dict[str, int] = field(default_factory=dict)
+    # Valores não obrigatórios que não puderam ser convertidos e viraram nulos.
+    coerced: dict[str, int] = field(default_factory=dict)
+    # Linhas descartadas, como vieram da fonte, com o motivo do descarte.
+    rejected_rows: pd.DataFrame | None = None
+
+
+@dataclass
+class PreparedChunk:
+    # Chunk no formato do engine de escrita (ou o DataFrame, no modo delta).
+    data: Any
+    stats: ChunkStats
+
+
+@dataclass
+class IngestionProgress:
+    file_hash: str
+    file_name: str
+    chunk_index: int = 0
+    row_offset: int = 0
+    rows_affected: int = 0
+    # Sem o modo delta, linhas reenviadas sem alteração contam como inseridas
+    # e rows_unchanged fica zerado (ver _count_written).
+    rows_inserted: int = 0
+    rows_updated: int = 0
+    rows_unchanged: int = 0
+    rows_rejected: int = 0
+    # Linhas ignoradas por haver uma versão posterior da mesma chave no arquivo.
+    rows_superseded: int = 0
+    rejects: dict[str, int] = field(default_factory=dict)
+    coerced: dict[str, int] = field(default_factory=dict)
+    rejects_path: str | None = None
+    # Medidas desta execução (um arquivo retomado conta só o trecho restante).
+    # bytes_read é a posição no arquivo, usada no ETA.
+    rows_read: int = 0
+    bytes_read: int = 0
+    bytes_total: int | None = None
+    elapsed_seconds: float = 0.0
+    started_at: float = 0.0
+    resumed_row_offset: int = 0
+    # Ponto a partir do qual a vazão é medida. Ao retomar um arquivo, o leitor
+    # percorre o trecho já gravado antes de entregar o primeiro chunk, e esses
+    # bytes (e esse tempo) inflariam o MB/s; a base passa a ser o fim do
+    # primeiro chunk lido. None indica uma base ainda por definir.
+    rate_base_bytes: int | None = 0
+    rate_base_rows: int = 0
+
+    def resume_from(self, row_offset: int) -> None:
+        self.row_offset = row_offset
+        self.resumed_row_offset = row_offset
+        self.rate_base_bytes = None
+
+    def update_metrics(self, byte_offset: int) -> None:
+        now = time.perf_counter()
+        if self.rate_base_bytes is None:
+            self.rate_base_bytes = byte_offset
+            self.rate_base_rows = self.row_offset
+            self.started_at = now
+        self.rows_read = self.row_offset - self.resumed_row_offset
+        self.bytes_read = byte_offset
+        self.elapsed_seconds = now - self.started_at
+
+    @property
+    def measured_rows(self) -> int:
+        return self.row_offset - self.rate_base_rows
+
+    @property
+    def measured_bytes(self) -> int:
+        if self.rate_base_bytes is None:
+            return 0
+        return self.bytes_read - self.rate_base_bytes
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.measured_rows / self.elapsed_seconds
+
+    @property
+    def mb_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.measured_bytes / (1024 * 1024) / self.elapsed_seconds
+
+    @property
+    def eta_seconds(self) -> float | None:
+        if not self.bytes_total or not self.measured_bytes or not self.elapsed_seconds:
+            return None
+        remaining = max(self.bytes_total - self.bytes_read, 0)
+        return remaining / (self.measured_bytes / self.elapsed_seconds)
+
+
+class ProgressReporter(Protocol):
+    # Recebe o progresso a cada chunk gravado; implementações devem ser
+    # baratas e decidir sozinhas quando publicar (ver ingestion_job_service).
+    async def on_chunk(self, progress: IngestionProgress) -> None: ...
+
+    def record_error(self, message: str) -> None: ...
+
+
+# Instância no nível do módulo para que o cache sobreviva entre arquivos e
+# entre instâncias de IngestionService.
+text_normalizer = TextNormalizer(max_size=settings.INGESTION_NORMALIZATION_CACHE_SIZE)
+
+# O SQL do upsert é montado uma única vez a partir de Infraction.__table__.
+upsert_writer = UpsertWriter()
+
+
+# Colunas de data convertidas na transformação, com o formato esperado de cada
+# uma; o formato efetivo é detectado no primeiro chunk de cada arquivo.
+DATE_COLUMNS = {COLUMN_MAPPING[col]: fmt for col, fmt in DATE_FORMATS.items()}
+
+# Colunas sem as quais a linha é descartada.
+REQUIRED_COLUMNS = [
+    "infraction_number",
+    "source_id",
+    "status",
+    "infraction_datetime",
+    "offender_name",
+    "offender_document",
+    "state",
+]
+
+# Colunas de data obrigatórias: um valor presente mas inválido descarta a linha.
+REQUIRED_DATE_COLUMNS = [col for col in DATE_COLUMNS if col in REQUIRED_COLUMNS]
+
+DECIMAL_COLUMNS = ["fine_value", "longitude", "latitude"]
+
+TEXT_COLUMNS_TO_CLEAN = [
+    "offender_name",
+    "description",
+    "infraction_type_description",
+    "municipality",
+    "location_description",
+    "affected_biomes",
+]
+
+
+def merge_counts(target: dict[str, int], counts: dict[str, int]) -> None:
+    for key, value in counts.items():
+        target[key] = target.get(key, 0) + value
+
+
+# Os chunks trafegam entre processos como um dicionário coluna -> array,
+# evitando serializar uma lista de dicionários (uma chave por célula). Colunas
+# category e Int64 seguem como arrays do pandas, sem expandir para object.
+def frame_to_payload(df: pd.DataFrame) -> dict[str, Any]:
+    return {col: df[col].array for col in df.columns}
+
+
+def payload_to_frame(payload: dict[str, Any]) -> pd.DataFrame:
+    return pd.DataFrame(payload, copy=False)
+
+
+def parse_decimal(series: pd.Series) -> pd.Series:
+    # Com decimal="," o read_csv já entrega float64 quando o chunk está limpo;
+    # caso contrário (ou no leitor PyArrow) a coluna chega como texto. Os dois
+    # caminhos devolvem float64: o to_numeric sobre "string" daria Float64
+    # (NA em vez de NaN), o que mudaria o row_hash da mesma linha.
+    if is_numeric_dtype(series):
+        return series.astype("float64")
+    return pd.to_numeric(
+        series.astype("string").str.replace(",", ".", regex=False), errors="coerce"
+    ).astype("float64")
+
+
+# Marca os valores nulos no texto canônico do row_hash, distinta de "".
+_HASH_NULL = "\x00"
+
+
+def canonical_hash_column(col: str, series: pd.Series) -> np.ndarray:
+    # O row_hash deve depender só dos dados: o mesmo valor chega com dtypes
+    # diferentes conforme o leitor (object com NaN no pandas, None no PyArrow,
+    # category, Int64) e hash_pandas_object leva o dtype em conta. Datas viram
+    # nanossegundos, números float64 e o resto texto, com um marcador de nulo.
+    if col in DATE_COLUMNS:
+        return series.astype("datetime64[ns]").to_numpy().view(np.int64)
+    if col in DECIMAL_COLUMNS or is_numeric_dtype(series):
+        return series.astype("float64").to_numpy()
+    return series.astype("string").fillna(_HASH_NULL).to_numpy(dtype=object)
+
+
+def compute_row_hash(chunk_df: pd.DataFrame) -> np.ndarray:
+    canonical = pd.DataFrame(
+        {col: canonical_hash_column(col, chunk_df[col]) for col in HASHED_COLUMNS},
+        copy=False,
+    )
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+def validation_rules(
+    chunk_df: pd.DataFrame, parsed_dates: dict[str, pd.Series]
+) -> dict[str, pd.Series]:
+    # Máscara das linhas que violam cada regra, sobre as colunas já renomeadas.
+    rules = {f"missing:{col}": chunk_df[col].isna() for col in REQUIRED_COLUMNS}
+    for col in REQUIRED_DATE_COLUMNS:
+        rules[f"invalid_date:{col}"] = parsed_dates[col].isna() & chunk_df[col].notna()
+    return rules
+
+
+def detect_file_date_formats(chunk_df: pd.DataFrame) -> dict[str, str]:
+    # Recebe o primeiro chunk, ainda com os nomes de coluna da fonte.
+    detected = detect_date_formats(chunk_df, DATE_FORMATS)
+    return {COLUMN_MAPPING[col]: fmt for col, fmt in detected.items()}
+
+
+# Colunas da fonte lidas pela pré-varredura de chaves, além da própria chave:
+# as obrigatórias e as de data (para detectar os formatos do arquivo).
+SCAN_SOURCE_COLUMNS = [
+    source
+    for source, col in COLUMN_MAPPING.items()
+    if col in REQUIRED_COLUMNS or col in DATE_COLUMNS
+]
+
+
+class ScanValidator:
+    # Aplica na pré-varredura de chaves as regras de validação da
+    # transformação: uma ocorrência inválida não pode sobrescrever versões
+    # válidas anteriores do mesmo auto. Os formatos de data são detectados no
+    # primeiro chunk da varredura e repassados ao pipeline, para que as duas
+    # etapas julguem as datas da mesma forma.
+    def __init__(self):
+        self.date_formats: dict[str, str] | None = None
+
+    def __call__(self, chunk_df: pd.DataFrame) -> np.ndarray:
+        if self.date_formats is None:
+            self.date_formats = detect_file_date_formats(chunk_df)
+        chunk_df = chunk_df.rename(columns=COLUMN_MAPPING)
+        parsed_dates = {
+            col: parse_dates(chunk_df[col], self.date_formats[col])
+            for col in REQUIRED_DATE_COLUMNS
+        }
+        rules = validation_rules(chunk_df, parsed_dates)
+        return ~np.logical_or.reduce([mask.to_numpy() for mask in rules.values()])
+
+
+def chunk_memory_bytes(chunk_df: pd.DataFrame) -> int:
+    # deep=True inclui o texto das colunas object, que domina o tamanho
+    # quando há descrições longas.
+    return int(chunk_df.memory_usage(deep=True, index=False).sum())
+
+
+def prepare_frame(
+    chunk_df: pd.DataFrame,
+    engine: IngestionEngine,
+    writer: UpsertWriter = upsert_writer,
+) -> RowBatch | str | None:
+    # Deixa o chunk no formato consumido pelo engine de escrita: linhas para o
+    # INSERT de múltiplos VALUES (nas colunas da tabela do writer) ou um TSV
+    # para o LOAD DATA.
+    if engine == IngestionEngine.LOAD_DATA:
+        return bulk_load_service.write_tsv(chunk_df)
+    return writer.frame_to_batch(chunk_df)
+
+
+def transform_payload(
+    payload: dict[str, Any],
+    engine: IngestionEngine,
+    delta: bool = False,
+    date_formats: dict[str, str] | None = None,
+) -> PreparedChunk:
+    # Ponto de entrada executado nos processos do ProcessPoolExecutor; cada
+    # processo mantém o seu próprio cache de normalização.
+    stats = ChunkStats()
+    chunk_df = IngestionService().transform_chunk(
+        payload_to_frame(payload), COLUMN_MAPPING, stats, date_formats
+    )
+    if engine == IngestionEngine.LOAD_DATA and not delta:
+        return PreparedChunk(bulk_load_service.write_tsv(chunk_df), stats)
+    return PreparedChunk(frame_to_payload(chunk_df), stats)
 
 
 class IngestionService:
-    def process_chunk(self, chunk_df: pd.DataFrame, column_mapping: dict) -> list[dict]:
-        logger.info(
-            f"Iniciando o processamento do chunk com {len(chunk_df)} linhas em uma thread."
+    def __init__(
+        self,
+        normalizer: TextNormalizer | None = None,
+        workers: int | None = None,
+        engine: IngestionEngine | str | None = None,
+        delta: bool | None = None,
+        reader: CsvReaderEngine | str | None = None,
+        max_connections: int | None = None,
+        dedup: bool | None = None,
+        table: Table | None = None,
+    ):
+        self.normalizer = normalizer if normalizer is not None else text_normalizer
+        self.workers = workers or settings.INGESTION_WORKERS
+        self.engine = IngestionEngine(engine or settings.INGESTION_ENGINE)
+        self.delta = settings.INGESTION_DELTA if delta is None else delta
+        self.reader = CsvReaderEngine(reader or settings.INGESTION_CSV_READER)
+        self.dedup = settings.INGESTION_FILE_DEDUP if dedup is None else dedup
+        # Tabela de destino. Outra tabela que não a de infrações (a cópia de
+        # uma recarga completa, ver table_swap_service) não usa checkpoints:
+        # uma recarga interrompida recomeça do zero em uma cópia nova.
+        self.table = table if table is not None else Infraction.__table__
+        self.use_checkpoints = self.table is Infraction.__table__
+        self.upsert_writer = (
+            upsert_writer if self.use_checkpoints else UpsertWriter(self.table)
+        )
+        # Cada arquivo em ingestão mantém uma sessão (e uma conexão) aberta do
+        # início ao fim; o semáforo limita quantas existem ao mesmo tempo
+        # quando vários arquivos são ingeridos em paralelo pelo mesmo serviço.
+        self.max_connections = max_connections or settings.INGESTION_MAX_DB_CONNECTIONS
+        self._connection_slots = asyncio.Semaphore(self.max_connections)
+        # Pool de processos da transformação (workers > 1), criado no primeiro
+        # arquivo e compartilhado pelos demais: com vários arquivos em paralelo
+        # o total de processos continua sendo workers. Encerrado em shutdown().
+        self._process_pool: ProcessPoolExecutor | None = None
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            logger.info(
+                f"Transformação dos chunks distribuída em {self.workers} processos."
+            )
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=mp.get_context("spawn")
+            )
+        return self._process_pool
+
+    def shutdown(self) -> None:
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True, cancel_futures=True)
+            self._process_pool = None
+
+    def process_chunk(self, chunk_df: pd.DataFrame, column_mapping: dict) -> RowBatch:
+        processed_chunk = self.transform_chunk(chunk_df, column_mapping)
+        return self.upsert_writer.frame_to_batch(processed_chunk)
+
+    def prepare_chunk(
+        self, chunk_df: pd.DataFrame, date_formats: dict[str, str] | None = None
+    ) -> PreparedChunk:
+        stats = ChunkStats()
+        processed_chunk = self.transform_chunk(
+            chunk_df, COLUMN_MAPPING, stats, date_formats
         )
+        # No modo delta o chunk só é preparado depois de filtrado no estágio de
+        # escrita, que consulta os hashes gravados no banco.
+        if self.delta:
+            return PreparedChunk(processed_chunk, stats)
+        return PreparedChunk(
+            prepare_frame(processed_chunk, self.engine, self.upsert_writer), stats
+        )
+
+    def transform_chunk(
+        self,
+        chunk_df: pd.DataFrame,
+        column_mapping: dict,
+        stats: ChunkStats | None = None,
+        date_formats: dict[str, str] | None = None,
+    ) -> pd.DataFrame:
+        logger.info(f"Iniciando o processamento do chunk com {len(chunk_df)} linhas.")
 
         chunk_df.rename(columns=column_mapping, inplace=True)
+        if stats is None:
+            stats = ChunkStats()
+
+        # Todas as regras são avaliadas de uma vez, como máscaras booleanas
+        # sobre o chunk inteiro; as linhas inválidas saem num único drop.
+        date_formats = date_formats or DATE_COLUMNS
+        parsed_dates = {
+            col: parse_dates(chunk_df[col], date_formats[col]) for col in DATE_COLUMNS
+        }
+        rules = validation_rules(chunk_df, parsed_dates)
+
+        reasons = np.select(
+            [mask.to_numpy() for mask in rules.values()], list(rules), default=""
+        )
+        # Entre as linhas válidas, vale a última ocorrência de cada auto.
+        duplicated = (reasons == "") & chunk_df["infraction_number"].where(
+            reasons == ""
+        ).duplicated(keep="last").to_numpy()
+        reasons[duplicated] = "duplicate:infraction_number"
 
-        required_columns = [
-            "infraction_number",
-            "source_id",
-            "status",
-            "infraction_datetime",
-            "offender_name",
-            "offender_document",
-            "state",
-        ]
-        chunk_df.dropna(subset=required_columns, inplace=True)
+        counts = {name: int(mask.sum()) for name, mask in rules.items()}
+        counts["duplicate:infraction_number"] = int(duplicated.sum())
+        merge_counts(stats.rejects, {k: v for k, v in counts.items() if v})
+
+        rejected = reasons != ""
+        if rejected.any():
+            rejected_rows = chunk_df[rejected].copy()
+            rejected_rows[REASON_COLUMN] = reasons[rejected]
+            stats.rejected_rows = rejected_rows
+            stats.rows_rejected += len(rejected_rows)
+            chunk_df.drop(index=chunk_df.index[rejected], inplace=True)
 
         if chunk_df.empty:
             logger.info("Nenhuma nova infração para inserir neste lote.")
-            return []
+            return chunk_df
+
+        coerced = {}
+        for col, parsed in parsed_dates.items():
+            values = parsed.loc[chunk_df.index]
+            coerced[col] = int((values.isna() & chunk_df[col].notna()).sum())
+            chunk_df[col] = values
+        for col in DECIMAL_COLUMNS:
+            values = parse_decimal(chunk_df[col])
+            coerced[col] = int((values.isna() & chunk_df[col].notna()).sum())
+            chunk_df[col] = values
+        chunk_df["fine_value"] = chunk_df["fine_value"].fillna(0.0)
+        merge_counts(stats.coerced, {k: v for k, v in coerced.items() if v})
+
+        logger.info(
+            f"Normalizando {len(TEXT_COLUMNS_TO_CLEAN)} colunas de texto com unidecode..."
+        )
+        for col in TEXT_COLUMNS_TO_CLEAN:
+            if col in chunk_df.columns:
+                chunk_df[col] = self.normalizer.normalize_series(chunk_df[col])
+        # Colunas de busca (FULLTEXT): o texto já sem acentos, em minúsculas.
+        for col, search_col in SEARCH_COLUMNS.items():
+            chunk_df[search_col] = chunk_df[col].str.lower()
+        chunk_df["biome_mask"] = series_mask(chunk_df["affected_biomes"])
 
-        chunk_df["fine_value"] = pd.to_numeric(
-            chunk_df["fine_value"].str.replace(",", ".", regex=False), errors="coerce"
-        ).fillna(0.0)
+        chunk_df["row_hash"] = compute_row_hash(chunk_df)
 
-        chunk_df["infraction_datetime"] = pd.to_datetime(
-            chunk_df["infraction_datetime"], errors="coerce"
+        logger.info(
+            f"Chunk processado com {len(chunk_df)} linhas válidas para inserção/atualização. "
+            f"Cache de normalização: {len(self.normalizer)} valores, "
+            f"{self.normalizer.hits} acertos, {self.normalizer.misses} falhas."
         )
-        chunk_df["last_updated_date"] = pd.to_datetime(
-            chunk_df["last_updated_date"], errors="coerce"
+        return chunk_df
+
+    async def _parse_stage(
+        self,
+        reader_iterator: TextFileReader | ArrowChunkReader,
+        executor: ThreadPoolExecutor,
+        parsed_queue: asyncio.Queue,
+        progress: IngestionProgress,
+        counter: CountingStream,
+        sizer: ChunkSizer,
+        superseded: np.ndarray | None = None,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        chunk_index = progress.chunk_index
+        row_offset = progress.row_offset
+        while True:
+            chunk_df = await loop.run_in_executor(
+                executor, get_next_chunk, reader_iterator, sizer.size
+            )
+            if chunk_df is None:
+                break
+            chunk_index += 1
+            first_row = row_offset
+            rows = len(chunk_df)
+            row_offset += rows
+            if sizer.adaptive:
+                memory_bytes = await loop.run_in_executor(
+                    executor, chunk_memory_bytes, chunk_df
+                )
+                sizer.record_memory(rows, memory_bytes)
+            if superseded is not None:
+                progress.rows_superseded += key_dedup.drop_superseded(
+                    chunk_df, superseded, first_row
+                )
+            # put() bloqueia enquanto a fila estiver cheia (backpressure).
+            await parsed_queue.put(
+                ChunkBatch(chunk_index, row_offset, chunk_df, counter.bytes_read, rows)
+            )
+        await parsed_queue.put(_END_OF_STREAM)
+
+    async def _transform_stage(
+        self,
+        executor: Executor,
+        parsed_queue: asyncio.Queue,
+        transformed_queue: asyncio.Queue,
+        date_formats: dict[str, str] | None = None,
+    ) -> None:
+        # Sem formatos detectados pela pré-varredura, a detecção usa o
+        # primeiro chunk lido.
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await parsed_queue.get()
+            if batch is _END_OF_STREAM:
+                break
+            if date_formats is None:
+                date_formats = await asyncio.to_thread(
+                    detect_file_date_formats, batch.data
+                )
+                logger.info(f"Formatos de data detectados: {date_formats}")
+            # A fila recebe o future (e não o resultado) na ordem de leitura:
+            # vários chunks são transformados em paralelo e o estágio de upsert
+            # os consome na mesma ordem em que foram lidos.
+            if isinstance(executor, ProcessPoolExecutor):
+                batch.data = loop.run_in_executor(
+                    executor,
+                    transform_payload,
+                    frame_to_payload(batch.data),
+                    self.engine,
+                    self.delta,
+                    date_formats,
+                )
+            else:
+                batch.data = loop.run_in_executor(
+                    executor, self.prepare_chunk, batch.data, date_formats
+                )
+            await transformed_queue.put(batch)
+        await transformed_queue.put(_END_OF_STREAM)
+
+    async def _commit_progress(
+        self,
+        db_session: AsyncSession,
+        progress: IngestionProgress,
+        staging: StagingTable | None = None,
+        is_completed: bool = False,
+    ) -> None:
+        if staging is not None:
+            # Um único INSERT ... SELECT leva o conteúdo do staging para a tabela
+            # final antes de confirmar o checkpoint na mesma transação.
+            merged = await staging.merge(db_session)
+            self._count_written(progress, staging.pending_rows, merged)
+            logger.info(
+                f"Merge do staging concluído. Total de linhas afetadas até agora: {progress.rows_affected}"
+            )
+
+        if self.use_checkpoints:
+            await checkpoint_service.save_checkpoint(
+                db_session,
+                file_hash=progress.file_hash,
+                file_name=progress.file_name,
+                chunk_index=progress.chunk_index,
+                row_offset=progress.row_offset,
+                rows_affected=progress.rows_affected,
+                is_completed=is_completed,
+            )
+        await db_session.commit()
+        if self.use_checkpoints:
+            # Invalida os caches de consultas; na recarga completa os dados só
+            # ficam visíveis após a troca de tabelas, que incrementa a versão.
+            await bump_dataset_version()
+
+        if staging is not None:
+            await staging.truncate(db_session)
+
+    async def _upsert_stage(
+        self,
+        db_session: AsyncSession,
+        transformed_queue: asyncio.Queue,
+        progress: IngestionProgress,
+        commit_every: int,
+        staging: StagingTable | None = None,
+        reporter: ProgressReporter | None = None,
+        reject_sink: RejectSink | None = None,
+        sizer: ChunkSizer | None = None,
+    ) -> None:
+        while True:
+            batch = await transformed_queue.get()
+            if batch is _END_OF_STREAM:
+                break
+
+            prepared_chunk = await batch.data
+            stats = prepared_chunk.stats
+            progress.rows_rejected += stats.rows_rejected
+            merge_counts(progress.rejects, stats.rejects)
+            merge_counts(progress.coerced, stats.coerced)
+            if reject_sink is not None and stats.rejected_rows is not None:
+                await asyncio.to_thread(reject_sink.write, stats.rejected_rows)
+                progress.rejects_path = reject_sink.path
+            prepared = prepared_chunk.data
+            if isinstance(prepared, dict):
+                prepared = payload_to_frame(prepared)
+            if isinstance(prepared, pd.DataFrame):
+                if self.delta:
+                    prepared = await self._filter_unchanged(
+                        db_session, prepared, progress
+                    )
+                prepared = await asyncio.to_thread(
+                    prepare_frame, prepared, self.engine, self.upsert_writer
+                )
+
+            write_started = time.perf_counter()
+            if staging is not None:
+                if prepared:
+                    try:
+                        loaded = await staging.load(db_session, prepared, batch.index)
+                        logger.info(
+                            f"Chunk {batch.index}: {loaded} linhas carregadas no staging."
+                        )
+                    finally:
+                        await asyncio.to_thread(bulk_load_service.remove_tsv, prepared)
+            else:
+                if prepared:
+                    await self._upsert_records(db_session, prepared, progress)
+            if sizer is not None and prepared:
+                sizer.record_write(batch.rows, time.perf_counter() - write_started)
+
+            progress.chunk_index = batch.index
+            progress.row_offset = batch.row_offset
+            if progress.chunk_index % commit_every == 0:
+                await self._commit_progress(db_session, progress, staging)
+                logger.info(
+                    f"Commit parcial: chunk {progress.chunk_index}, "
+                    f"{progress.row_offset} linhas do arquivo consumidas."
+                )
+
+            progress.update_metrics(batch.byte_offset)
+            if reporter is not None:
+                await reporter.on_chunk(progress)
+
+    async def _filter_unchanged(
+        self,
+        db_session: AsyncSession,
+        chunk_df: pd.DataFrame,
+        progress: IngestionProgress,
+    ) -> pd.DataFrame:
+        if chunk_df.empty:
+            return chunk_df
+
+        columns = self.table.c
+        stmt = select(columns.infraction_number, columns.row_hash).where(
+            columns.infraction_number.in_(chunk_df["infraction_number"].tolist())
         )
+        stored = (await db_session.execute(stmt)).all()
 
-        text_columns_to_clean = [
-            "offender_name",
-            "description",
-            "infraction_type_description",
-            "municipality",
-            "location_description",
-            "affected_biomes",
-        ]
+        stored_keys = pd.Index([row[0] for row in stored])
+        # Linhas gravadas antes da existência do row_hash (NULL) contam como alteradas.
+        stored_hashes = np.array(
+            [row[1] if row[1] is not None else 0 for row in stored], dtype=np.uint64
+        )
 
-        def safe_unidecode(text: str | None) -> str | None:
-            if pd.isna(text):
-                return None
-            return unidecode(str(text), errors="ignore")
+        positions = stored_keys.get_indexer(chunk_df["infraction_number"])
+        is_new = positions == -1
+        is_changed = np.zeros(len(chunk_df), dtype=bool)
+        if len(stored_hashes):
+            is_changed = ~is_new & (
+                stored_hashes[np.where(is_new, 0, positions)]
+                != chunk_df["row_hash"].to_numpy(dtype=np.uint64)
+            )
 
+        inserted = int(is_new.sum())
+        updated = int(is_changed.sum())
+        unchanged = len(chunk_df) - inserted - updated
+        progress.rows_inserted += inserted
+        progress.rows_updated += updated
+        progress.rows_unchanged += unchanged
         logger.info(
-            f"Normalizando {len(text_columns_to_clean)} colunas de texto com unidecode..."
+            f"Delta: {inserted} novas, {updated} alteradas, {unchanged} inalteradas neste lote."
         )
-        for col in text_columns_to_clean:
-            if col in chunk_df.columns:
-                chunk_df[col] = chunk_df[col].apply(safe_unidecode)
+        return chunk_df[is_new | is_changed]
 
-        chunk_df.drop_duplicates(
-            subset=["infraction_number"], keep="last", inplace=True
+    async def _discard_pending(self, transformed_queue: asyncio.Queue) -> None:
+        # Remove os TSVs de chunks já preparados que não chegaram a ser carregados.
+        while not transformed_queue.empty():
+            batch = transformed_queue.get_nowait()
+            if batch is _END_OF_STREAM or not batch.data.done():
+                continue
+            if batch.data.cancelled() or batch.data.exception() is not None:
+                continue
+            if isinstance(batch.data.result().data, str):
+                await asyncio.to_thread(
+                    bulk_load_service.remove_tsv, batch.data.result().data
+                )
+
+    async def _upsert_records(
+        self,
+        db_session: AsyncSession,
+        batch: RowBatch,
+        progress: IngestionProgress,
+    ) -> None:
+        rows_affected = await self.upsert_writer.write(db_session, batch)
+        self._count_written(progress, len(batch), rows_affected)
+        logger.info(
+            f"Lote processado. Total de linhas afetadas (inseridas/atualizadas) até agora: {progress.rows_affected}"
         )
-        processed_chunk = chunk_df.replace({np.nan: None, pd.NaT: None})
 
+    def _count_written(
+        self, progress: IngestionProgress, rows_sent: int, rows_affected: int
+    ) -> None:
+        progress.rows_affected += rows_affected
+        if self.delta:
+            # O modo delta já separou novas, alteradas e inalteradas.
+            return
+        # A conexão usa CLIENT_FOUND_ROWS: no ON DUPLICATE KEY UPDATE cada linha
+        # inserida ou reenviada sem alteração conta 1 e cada linha alterada
+        # conta 2, então as alterações são o excedente sobre as enviadas.
+        updated = max(rows_affected - rows_sent, 0)
+        progress.rows_updated += updated
+        progress.rows_inserted += rows_sent - updated
+
+    def _log_throughput(self, progress: IngestionProgress) -> None:
         logger.info(
-            f"Chunk processado com {len(processed_chunk)} linhas válidas para inserção/atualização."
-        )
-        return processed_chunk.to_dict(orient="records")
-
-    async def process_csv(self, file_path: str) -> None:
-        logger.info(f"Iniciando o processamento do arquivo: {file_path}")
-
-        async with AsyncSessionLocal() as db_session:
-            column_mapping = {
-                "SEQ_AUTO_INFRACAO": "source_id",
-                "NUM_AUTO_INFRACAO": "infraction_number",
-                "NU_PROCESSO_FORMATADO": "process_number",
-                "DES_STATUS_FORMULARIO": "status",
-                "TIPO_AUTO": "sanction_type",
-                "GRAVIDADE_INFRACAO": "gravity",
-                "VAL_AUTO_INFRACAO": "fine_value",
-                "DAT_HORA_AUTO_INFRACAO": "infraction_datetime",
-                "DT_FATO_INFRACIONAL": "fact_date",
-                "DT_LANCAMENTO": "system_launch_date",
-                "DT_ULT_ALTERACAO": "last_updated_date",
-                "NOME_INFRATOR": "offender_name",
-                "CPF_CNPJ_INFRATOR": "offender_document",
-                "DES_AUTO_INFRACAO": "description",
-                "DES_INFRACAO": "infraction_type_description",
-                "MUNICIPIO": "municipality",
-                "UF": "state",
-                "DES_LOCAL_INFRACAO": "location_description",
-                "NUM_LONGITUDE_AUTO": "longitude",
-                "NUM_LATITUDE_AUTO": "latitude",
-                "DS_BIOMAS_ATINGIDOS": "affected_biomes",
-            }
-            chunk_size = 5000
-            total_rows_affected = 0
+            f"Vazão de '{progress.file_name}': {progress.rows_read} linhas em "
+            f"{progress.elapsed_seconds:.1f}s ({progress.rows_per_second:,.0f} linhas/s, "
+            f"{progress.mb_per_second:.2f} MB/s)."
+        )
 
-            try:
-                reader_iterator = await asyncio.to_thread(
-                    pd.read_csv,
-                    file_path,
-                    chunksize=chunk_size,
-                    low_memory=False,
-                    usecols=list(column_mapping.keys()),
-                    delimiter=";",
-                    encoding="latin-1",
-                )
+    def _new_chunk_sizer(self, queue_depth: int) -> ChunkSizer:
+        # Chunks que podem estar em memória ao mesmo tempo: as duas filas
+        # cheias, mais o que está sendo lido e o que está sendo gravado.
+        in_flight = queue_depth + max(queue_depth, self.workers) + 2
+        return ChunkSizer(
+            initial_size=settings.INGESTION_CHUNK_SIZE,
+            min_size=settings.INGESTION_CHUNK_SIZE_MIN,
+            max_size=settings.INGESTION_CHUNK_SIZE_MAX,
+            target_seconds=settings.INGESTION_TARGET_BATCH_SECONDS,
+            memory_ceiling_bytes=settings.INGESTION_MEMORY_CEILING_MB * 2**20,
+            in_flight=in_flight,
+            adaptive=settings.INGESTION_ADAPTIVE_CHUNKS,
+        )
 
-                while True:
-                    chunk_df = await asyncio.to_thread(get_next_chunk, reader_iterator)
+    async def _scan_superseded(
+        self, source: str | IO[bytes]
+    ) -> tuple[np.ndarray | None, dict[str, str] | None]:
+        # Devolve as linhas sobrescritas e os formatos de data detectados.
+        if not isinstance(source, str):
+            logger.info(
+                "Deduplicação entre chunks desativada: a fonte é um stream e não "
+                "pode ser relida."
+            )
+            return None, None
+        validator = ScanValidator()
+        superseded = await asyncio.to_thread(
+            key_dedup.scan_superseded_rows,
+            source,
+            columns=SCAN_SOURCE_COLUMNS,
+            is_valid=validator,
+        )
+        logger.info(
+            f"Pré-varredura de chaves: {len(superseded)} linhas serão ignoradas por "
+            "haver uma versão válida posterior do mesmo auto no arquivo."
+        )
+        return superseded, validator.date_formats
 
-                    if chunk_df is None:
-                        logger.info(f"Fim do arquivo {file_path} alcançado.")
-                        break
+    def _log_rejects(
+        self, progress: IngestionProgress, reject_sink: RejectSink | None
+    ) -> None:
+        if progress.rows_superseded:
+            logger.info(
+                f"{progress.rows_superseded} linhas de '{progress.file_name}' "
+                "ignoradas por haver uma versão posterior do mesmo auto."
+            )
+        if progress.rejects:
+            summary = ", ".join(
+                f"{reason}={count}"
+                for reason, count in sorted(progress.rejects.items())
+            )
+            logger.info(f"Descartes de '{progress.file_name}': {summary}.")
+        if progress.coerced:
+            summary = ", ".join(
+                f"{col}={count}" for col, count in sorted(progress.coerced.items())
+            )
+            logger.info(f"Valores inválidos convertidos em nulo: {summary}.")
+        if reject_sink is not None and reject_sink.rows_written:
+            logger.info(
+                f"{reject_sink.rows_written} linhas rejeitadas gravadas em "
+                f"'{reject_sink.path}'."
+            )
 
-                    data_to_insert = await asyncio.to_thread(
-                        self.process_chunk, chunk_df, column_mapping
-                    )
-                    if not data_to_insert:
-                        continue
-
-                    stmt_base = insert(Infraction.__table__)  # type: ignore
-                    stmt_upsert = stmt_base.on_duplicate_key_update(
-                        source_id=stmt_base.inserted.source_id,
-                        process_number=stmt_base.inserted.process_number,
-                        status=stmt_base.inserted.status,
-                        sanction_type=stmt_base.inserted.sanction_type,
-                        gravity=stmt_base.inserted.gravity,
-                        fine_value=stmt_base.inserted.fine_value,
-                        infraction_datetime=stmt_base.inserted.infraction_datetime,
-                        fact_date=stmt_base.inserted.fact_date,
-                        system_launch_date=stmt_base.inserted.system_launch_date,
-                        last_updated_date=stmt_base.inserted.last_updated_date,
-                        offender_name=stmt_base.inserted.offender_name,
-                        offender_document=stmt_base.inserted.offender_document,
-                        description=stmt_base.inserted.description,
-                        infraction_type_description=stmt_base.inserted.infraction_type_description,
-                        municipality=stmt_base.inserted.municipality,
-                        state=stmt_base.inserted.state,
-                        location_description=stmt_base.inserted.location_description,
-                        longitude=stmt_base.inserted.longitude,
-                        latitude=stmt_base.inserted.latitude,
-                        affected_biomes=stmt_base.inserted.affected_biomes,
+    async def process_csv(
+        self,
+        file_path: str,
+        queue_depth: int | None = None,
+        commit_every: int | None = None,
+        resume: bool = True,
+        remove_source: bool = True,
+        reporter: ProgressReporter | None = None,
+    ) -> IngestionProgress | None:
+        try:
+            return await self._ingest(
+                file_path,
+                os.path.basename(file_path),
+                None,
+                queue_depth=queue_depth,
+                commit_every=commit_every,
+                resume=resume,
+                reporter=reporter,
+            )
+        finally:
+            if remove_source and await aio_os.path.exists(file_path):
+                await aio_os.remove(file_path)
+                logger.info(f"Arquivo temporário '{file_path}' removido.")
+
+    async def process_stream(
+        self,
+        stream: IO[bytes],
+        source_name: str,
+        source_hash: str,
+        queue_depth: int | None = None,
+        commit_every: int | None = None,
+        resume: bool = True,
+        source_size: int | None = None,
+        reporter: ProgressReporter | None = None,
+    ) -> IngestionProgress | None:
+        # Lê o CSV direto de um stream (por exemplo, um membro do ZIP do IBAMA)
+        # sem extraí-lo para o disco. Como o conteúdo não pode ser relido para
+        # calcular o SHA-256, o chamador informa a identidade da fonte.
+        return await self._ingest(
+            stream,
+            source_name,
+            source_hash,
+            queue_depth=queue_depth,
+            commit_every=commit_every,
+            resume=resume,
+            source_size=source_size,
+            reporter=reporter,
+        )
+
+    async def _ingest(
+        self,
+        source: str | IO[bytes],
+        source_name: str,
+        source_hash: str | None,
+        queue_depth: int | None = None,
+        commit_every: int | None = None,
+        resume: bool = True,
+        source_size: int | None = None,
+        reporter: ProgressReporter | None = None,
+    ) -> IngestionProgress | None:
+        logger.info(f"Iniciando o processamento do arquivo: {source_name}")
+
+        if source_size is None and isinstance(source, str):
+            source_size = os.path.getsize(source)
+
+        queue_depth = queue_depth or settings.INGESTION_QUEUE_DEPTH
+        commit_every = commit_every or settings.INGESTION_COMMIT_EVERY_CHUNKS
+        sizer = self._new_chunk_sizer(queue_depth)
+        reader_iterator: TextFileReader | ArrowChunkReader | None = None
+        source_stream: IO[bytes] | None = None
+        progress: IngestionProgress | None = None
+        staging: StagingTable | None = None
+        transformed_queue: asyncio.Queue | None = None
+        reject_sink: RejectSink | None = None
+
+        # Executores dedicados permitem aguardar o trabalho em andamento antes
+        # de fechar o leitor em caso de erro. Com mais de um worker, a
+        # transformação roda no pool de processos do serviço, fora do alcance
+        # do GIL e compartilhado entre os arquivos ingeridos em paralelo.
+        parse_executor = ThreadPoolExecutor(max_workers=1)
+        transform_executor: Executor
+        if self.workers > 1:
+            transform_executor = self._get_process_pool()
+        else:
+            transform_executor = ThreadPoolExecutor(max_workers=1)
+
+        # O LOAD DATA LOCAL INFILE exige uma conexão com local_infile habilitado.
+        session_factory = (
+            BulkSessionLocal
+            if self.engine == IngestionEngine.LOAD_DATA
+            else AsyncSessionLocal
+        )
+
+        async with self._connection_slots, session_factory() as db_session:
+            try:
+                file_hash = source_hash
+                if file_hash is None:
+                    file_hash = await asyncio.to_thread(
+                        checkpoint_service.compute_file_hash, source
                     )
+                progress = IngestionProgress(
+                    file_hash=file_hash,
+                    file_name=source_name,
+                    bytes_total=source_size,
+                    started_at=time.perf_counter(),
+                )
+                reject_sink = RejectSink(source_name, file_hash)
 
-                    result = await db_session.execute(stmt_upsert, data_to_insert)
+                checkpoint = None
+                if resume and self.use_checkpoints:
+                    checkpoint = await checkpoint_service.get_checkpoint(
+                        db_session, file_hash
+                    )
+                if checkpoint is not None:
+                    if checkpoint.is_completed:
+                        logger.info(
+                            f"Arquivo já ingerido por completo (hash {file_hash[:12]}). Nada a fazer."
+                        )
+                        return progress
 
-                    total_rows_affected += result.rowcount
+                    progress.chunk_index = checkpoint.chunk_index
+                    progress.rows_affected = checkpoint.rows_affected
+                    progress.resume_from(checkpoint.row_offset)
                     logger.info(
-                        f"Lote processado. Total de linhas afetadas (inseridas/atualizadas) até agora: {total_rows_affected}"
+                        f"Retomando a partir do checkpoint: chunk {checkpoint.chunk_index}, "
+                        f"linha {checkpoint.row_offset}."
                     )
 
-                await db_session.commit()
+                if self.engine == IngestionEngine.LOAD_DATA:
+                    staging = StagingTable(file_hash, self.table)
+                    await staging.create(db_session)
+
+                superseded, date_formats = None, None
+                if self.dedup:
+                    superseded, date_formats = await self._scan_superseded(source)
+
+                source_stream, counter = open_counted(source)
+                reader_iterator = await asyncio.to_thread(
+                    open_csv_reader,
+                    source_stream,
+                    sizer.size,
+                    self.reader,
+                    progress.row_offset,
+                )
+
+                parsed_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_depth)
+                transformed_queue = asyncio.Queue(
+                    maxsize=max(queue_depth, self.workers)
+                )
+
+                stages = [
+                    asyncio.create_task(
+                        self._parse_stage(
+                            reader_iterator,
+                            parse_executor,
+                            parsed_queue,
+                            progress,
+                            counter,
+                            sizer,
+                            superseded,
+                        )
+                    ),
+                    asyncio.create_task(
+                        self._transform_stage(
+                            transform_executor,
+                            parsed_queue,
+                            transformed_queue,
+                            date_formats,
+                        )
+                    ),
+                    asyncio.create_task(
+                        self._upsert_stage(
+                            db_session,
+                            transformed_queue,
+                            progress,
+                            commit_every,
+                            staging,
+                            reporter,
+                            reject_sink,
+                            sizer,
+                        )
+                    ),
+                ]
+                try:
+                    await asyncio.gather(*stages)
+                except BaseException:
+                    for stage in stages:
+                        stage.cancel()
+                    await asyncio.gather(*stages, return_exceptions=True)
+                    raise
+
+                logger.info(f"Fim do arquivo {source_name} alcançado.")
+                progress.update_metrics(counter.bytes_read)
+                self._log_throughput(progress)
+                self._log_rejects(progress, reject_sink)
+
+                await self._commit_progress(
+                    db_session, progress, staging, is_completed=True
+                )
                 logger.info(
-                    f"Commit finalizado com sucesso para o arquivo '{os.path.basename(file_path)}'."
+                    f"Commit finalizado com sucesso para o arquivo '{source_name}'."
                 )
+                if self.delta:
+                    logger.info(
+                        f"Resumo delta: {progress.rows_inserted} inseridas, "
+                        f"{progress.rows_updated} atualizadas, "
+                        f"{progress.rows_unchanged} inalteradas."
+                    )
+                return progress
 
             except Exception as e:
                 logger.error(f"Erro durante o processamento do CSV: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    # Um processo do pool morreu; o próximo arquivo usa um novo.
+                    self._process_pool = None
+                if reporter is not None:
+                    reporter.record_error(str(e))
                 await db_session.rollback()
-                logger.info("Rollback concluído.")
+                logger.info(
+                    "Rollback concluído. Os commits parciais já feitos permanecem "
+                    "gravados e uma nova execução retomará do último checkpoint."
+                )
+                return None
             finally:
+                await asyncio.to_thread(
+                    parse_executor.shutdown, wait=True, cancel_futures=True
+                )
+                if transform_executor is not self._process_pool:
+                    await asyncio.to_thread(
+                        transform_executor.shutdown, wait=True, cancel_futures=True
+                    )
+                if transformed_queue is not None:
+                    await self._discard_pending(transformed_queue)
+
+                if staging is not None:
+                    await staging.drop(db_session)
+
                 if reader_iterator is not None:
                     reader_iterator.close()
-
-                if await aio_os.path.exists(file_path):
-                    await aio_os.remove(file_path)
-                    logger.info(f"Arquivo temporário '{file_path}' removido.")
+                if source_stream is not None:
+                    source_stream.close()
+                if reject_sink is not None:
+                    reject_sink.close()
 
                 logger.info("Processamento do arquivo finalizado.")
@@ -0,0 +1,81 @@
+import logging
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from app.services.csv_schema import CSV_DELIMITER, CSV_ENCODING
+
+logger = logging.getLogger(__name__)
+
+KEY_SOURCE_COLUMN = "NUM_AUTO_INFRACAO"
+
+# Linhas lidas por vez na pré-varredura, que carrega apenas a coluna da chave e
+# as colunas usadas na validação.
+SCAN_CHUNK_SIZE = 200_000
+
+
+def scan_superseded_rows(
+    source: str,
+    chunk_size: int = SCAN_CHUNK_SIZE,
+    columns: list[str] | None = None,
+    is_valid: Callable[[pd.DataFrame], np.ndarray] | None = None,
+) -> np.ndarray:
+    # Pré-varredura da coluna de chave do arquivo inteiro. Cada número de auto
+    # vira um hash de 64 bits (8 bytes por linha, independente do tamanho do
+    # texto) e apenas esses hashes ficam em memória: cerca de 80 MB para 10
+    # milhões de linhas. Devolve, em ordem crescente, a posição (entre as
+    # linhas de dados) de toda ocorrência que é sobrescrita por outra mais
+    # adiante no arquivo. Uma colisão de hash descartaria uma chave distinta;
+    # com 64 bits a chance é desprezível para dezenas de milhões de linhas.
+    # is_valid recebe cada chunk (com as colunas em columns) e marca as linhas
+    # que passam na validação: só elas sobrescrevem ocorrências anteriores,
+    # como na deduplicação dentro do chunk.
+    hashes: list[np.ndarray] = []
+    valid: list[np.ndarray] = []
+    reader = pd.read_csv(
+        source,
+        usecols=sorted({KEY_SOURCE_COLUMN, *(columns or [])}),
+        dtype=object,
+        delimiter=CSV_DELIMITER,
+        encoding=CSV_ENCODING,
+        chunksize=chunk_size,
+    )
+    with reader:
+        for chunk in reader:
+            keys = chunk[KEY_SOURCE_COLUMN]
+            hashes.append(pd.util.hash_pandas_object(keys, index=False).to_numpy())
+            chunk_valid = keys.notna().to_numpy()
+            if is_valid is not None:
+                chunk_valid &= is_valid(chunk)
+            valid.append(chunk_valid)
+
+    if not hashes:
+        return np.empty(0, dtype=np.int64)
+
+    all_hashes = np.concatenate(hashes)
+    del hashes
+    # Linhas inválidas são descartadas na validação; nunca sobrescrevem outras.
+    positions = np.flatnonzero(np.concatenate(valid))
+    keyed_hashes = all_hashes[positions]
+    del all_hashes
+
+    # np.unique devolve a primeira ocorrência de cada hash; sobre o array
+    # invertido, ela corresponde à última ocorrência no arquivo.
+    _, first_in_reversed = np.unique(keyed_hashes[::-1], return_index=True)
+    last_positions = positions[len(keyed_hashes) - 1 - first_in_reversed]
+
+    superseded = np.ones(len(keyed_hashes), dtype=bool)
+    superseded[np.searchsorted(positions, last_positions)] = False
+    return positions[superseded]
+
+
+def drop_superseded(
+    chunk_df: pd.DataFrame, superseded: np.ndarray, first_row: int
+) -> int:
+    # first_row: posição da primeira linha do chunk entre as linhas de dados.
+    start, end = np.searchsorted(superseded, [first_row, first_row + len(chunk_df)])
+    if start == end:
+        return 0
+    chunk_df.drop(index=chunk_df.index[superseded[start:end] - first_row], inplace=True)
+    return int(end - start)
@@ -0,0 +1,49 @@
+import gzip
+import logging
+import os
+
+import pandas as pd
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REASON_COLUMN = "reject_reason"
+
+
+class RejectSink:
+    # Grava as linhas descartadas de um arquivo em um CSV.gz ao lado da
+    # ingestão, com o motivo de cada descarte. O arquivo só é criado no
+    # primeiro descarte; numa retomada, os novos descartes são acrescentados
+    # como um novo membro gzip (o arquivo continua legível de uma vez só).
+    def __init__(self, source_name: str, file_hash: str, reject_dir: str | None = None):
+        reject_dir = reject_dir or settings.INGESTION_REJECTS_DIR
+        stem = os.path.splitext(os.path.basename(source_name))[0]
+        self.path = os.path.join(reject_dir, f"{stem}.{file_hash[:16]}.rejects.csv.gz")
+        self.rows_written = 0
+        self._file: gzip.GzipFile | None = None
+
+    def write(self, rejected_df: pd.DataFrame) -> None:
+        if rejected_df.empty:
+            return
+
+        write_header = False
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            write_header = not os.path.exists(self.path)
+            self._file = gzip.open(self.path, "ab", compresslevel=6)
+            logger.info(f"Linhas rejeitadas serão gravadas em '{self.path}'.")
+
+        rejected_df.to_csv(
+            self._file,
+            header=write_header,
+            index=False,
+            encoding="utf-8",
+            date_format="%Y-%m-%d %H:%M:%S",
+        )
+        self.rows_written += len(rejected_df)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
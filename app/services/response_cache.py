@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.services.dataset_version import get_dataset_version
+from app.services.infraction_count_service import normalize_filters
+
+logger = logging.getLogger(__name__)
+
+# Um hash por versão do dataset (campo = digest da requisição, valor = JSON da
+# resposta). Um commit da ingestão incrementa a versão e as respostas antigas
+# deixam de ser lidas; o hash inteiro expira pelo TTL.
+RESPONSE_KEY_PREFIX = "infractions:response:"
+STATS_KEY = "infractions:response:stats"
+# Versões com respostas guardadas. A ingestão incrementa a versão a cada
+# commit; a primeira resposta de uma versão nova apaga as anteriores, para que
+# o teto de bytes valha para o cache inteiro e não para cada versão.
+VERSIONS_KEY = "infractions:response:versions"
+
+
+@dataclass
+class CacheSlot:
+    version: int
+    key: str
+    field: str
+    payload: str | None = None
+
+    @property
+    def bytes_key(self) -> str:
+        return f"{self.key}:bytes"
+
+
+def version_keys(version: int) -> list[str]:
+    key = f"{RESPONSE_KEY_PREFIX}{version}"
+    return [key, f"{key}:bytes"]
+
+
+async def drop_older_versions(version: int) -> None:
+    older = [int(v) for v in await redis_client.smembers(VERSIONS_KEY)]
+    older = [v for v in older if v < version]
+    if not older:
+        return
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for old_version in older:
+            pipe.delete(*version_keys(old_version))
+        pipe.srem(VERSIONS_KEY, *older)
+        await pipe.execute()
+    logger.debug(f"Respostas das versões {older} removidas do cache.")
+
+
+def request_digest(filters: dict, params: dict) -> str:
+    canonical = {"filters": normalize_filters(filters), **params}
+    payload = json.dumps(canonical, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+async def lookup(filters: dict, params: dict) -> CacheSlot | None:
+    # None quando o cache está desligado ou o Redis está indisponível; a
+    # requisição segue direto para o banco.
+    if not settings.INFRACTIONS_RESPONSE_CACHE_ENABLED:
+        return None
+    try:
+        version = await get_dataset_version()
+        slot = CacheSlot(
+            version=version,
+            key=f"{RESPONSE_KEY_PREFIX}{version}",
+            field=request_digest(filters, params),
+        )
+        slot.payload = await redis_client.hget(slot.key, slot.field)
+        outcome = "hits" if slot.payload is not None else "misses"
+        await redis_client.hincrby(STATS_KEY, outcome, 1)
+    except RedisError as e:
+        logger.warning(f"Cache de respostas indisponível: {e}")
+        return None
+    return slot
+
+
+async def store(slot: CacheSlot, payload: str) -> bool:
+    # Só a versão atual recebe respostas, e as anteriores são apagadas na
+    # primeira gravação de uma versão nova: o total de bytes da versão atual é
+    # o do cache inteiro. Acima do teto, novas respostas não entram até a
+    # próxima versão ou a expiração do hash. O Redis é compartilhado com a fila
+    # de ingestão, então o teto não pode depender de uma política de despejo
+    # global (maxmemory-policy).
+    size = len(payload.encode())
+    ttl = settings.INFRACTIONS_RESPONSE_CACHE_TTL_SECONDS
+    try:
+        if await get_dataset_version() != slot.version:
+            # A ingestão avançou enquanto a consulta rodava.
+            return False
+        if await redis_client.sadd(VERSIONS_KEY, slot.version):
+            await drop_older_versions(slot.version)
+        used = await redis_client.incrby(slot.bytes_key, size)
+        if used > settings.INFRACTIONS_RESPONSE_CACHE_MAX_MB * 1024 * 1024:
+            await redis_client.decrby(slot.bytes_key, size)
+            await redis_client.hincrby(STATS_KEY, "rejected", 1)
+            return False
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(slot.key, slot.field, payload)
+            pipe.expire(slot.key, ttl, nx=True)
+            pipe.expire(slot.bytes_key, ttl, nx=True)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Não foi possível gravar a resposta no cache: {e}")
+        return False
+    return True
+
+
+async def get_stats() -> dict:
+    version = await get_dataset_version()
+    key = f"{RESPONSE_KEY_PREFIX}{version}"
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hgetall(STATS_KEY)
+        pipe.hlen(key)
+        pipe.get(f"{key}:bytes")
+        pipe.ttl(key)
+        counters, entries, used_bytes, ttl = await pipe.execute()
+
+    hits = int(counters.get("hits", 0))
+    misses = int(counters.get("misses", 0))
+    return {
+        "dataset_version": version,
+        "hits": hits,
+        "misses": misses,
+        "rejected": int(counters.get("rejected", 0)),
+        "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+        "entries": entries,
+        "bytes": int(used_bytes or 0),
+        "max_bytes": settings.INFRACTIONS_RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+        "ttl_seconds": max(ttl, 0),
+    }
@@ -0,0 +1,131 @@
+import logging
+import re
+
+from sqlalchemy import MetaData, Table
+
+from app.db.session import AsyncSession
+from app.models.infraction import Infraction
+from app.services.dataset_version import bump_dataset_version
+
+logger = logging.getLogger(__name__)
+
+NEXT_TABLE_SUFFIX = "_next"
+PREVIOUS_TABLE_SUFFIX = "_previous"
+
+# Índices não únicos no SHOW CREATE TABLE ("KEY", "FULLTEXT KEY", ...). As
+# chaves únicas ficam na tabela durante a carga: o upsert depende delas.
+_SECONDARY_INDEX = re.compile(r"^(?:(?:FULLTEXT|SPATIAL) )?KEY `([^`]+)` .*$")
+
+
+def secondary_indexes(create_sql: str) -> dict[str, str]:
+    # Nome -> definição de cada índice secundário de um SHOW CREATE TABLE.
+    indexes = {}
+    for line in create_sql.splitlines():
+        definition = line.strip().rstrip(",")
+        match = _SECONDARY_INDEX.match(definition)
+        if match:
+            indexes[match.group(1)] = definition
+    return indexes
+
+
+async def _execute(db: AsyncSession, sql: str) -> None:
+    connection = await db.connection()
+    await connection.exec_driver_sql(sql)
+
+
+async def table_exists(db: AsyncSession, name: str) -> bool:
+    connection = await db.connection()
+    result = await connection.exec_driver_sql("SHOW TABLES LIKE %s", (name,))
+    return result.first() is not None
+
+
+class ShadowTable:
+    # Recarga completa em azul/verde: os dados são carregados em uma cópia
+    # da tabela (infractions_next) enquanto a API continua lendo a atual. Os
+    # índices secundários só são criados ao final da carga, de uma vez, e um
+    # RENAME TABLE atômico troca as duas; a versão anterior fica guardada como
+    # infractions_previous para o rollback.
+    def __init__(self, live_table: Table | None = None):
+        self.live_table = live_table if live_table is not None else Infraction.__table__
+        self.name = f"{self.live_table.name}{NEXT_TABLE_SUFFIX}"
+        self.previous_name = f"{self.live_table.name}{PREVIOUS_TABLE_SUFFIX}"
+        self.table = self.live_table.to_metadata(MetaData(), name=self.name)
+        self.deferred_indexes: list[str] = []
+        # Depois da troca, self.name deixa de existir e não há o que descartar.
+        self.swapped = False
+
+    async def create(self, db: AsyncSession) -> None:
+        await _execute(db, f"DROP TABLE IF EXISTS `{self.name}`")
+        # CREATE TABLE ... LIKE copia a definição atual do banco, inclusive
+        # índices criados por migrações; os secundários são removidos e
+        # guardados para serem recriados depois da carga.
+        await _execute(db, f"CREATE TABLE `{self.name}` LIKE `{self.live_table.name}`")
+        connection = await db.connection()
+        result = await connection.exec_driver_sql(f"SHOW CREATE TABLE `{self.name}`")
+        create_sql = result.one()[1]
+
+        indexes = secondary_indexes(create_sql)
+        self.deferred_indexes = list(indexes.values())
+        if indexes:
+            drops = ", ".join(f"DROP INDEX `{name}`" for name in indexes)
+            await _execute(db, f"ALTER TABLE `{self.name}` {drops}")
+        logger.info(
+            f"Tabela '{self.name}' criada; {len(self.deferred_indexes)} índices "
+            "secundários serão criados após a carga."
+        )
+
+    async def build_indexes(self, db: AsyncSession) -> None:
+        if not self.deferred_indexes:
+            return
+        logger.info(f"Criando {len(self.deferred_indexes)} índices em '{self.name}'...")
+        # Um único ALTER TABLE cria os índices B-tree com uma varredura da
+        # tabela; o InnoDB só aceita um índice FULLTEXT por ALTER TABLE.
+        fulltext = [d for d in self.deferred_indexes if d.startswith("FULLTEXT ")]
+        btree = [d for d in self.deferred_indexes if d not in fulltext]
+        if btree:
+            clauses = ", ".join(f"ADD {definition}" for definition in btree)
+            await _execute(db, f"ALTER TABLE `{self.name}` {clauses}")
+        if fulltext:
+            # Igual à migração que criou os índices de busca (ver text_search).
+            await _execute(db, "SET SESSION innodb_ft_enable_stopword = OFF")
+        for definition in fulltext:
+            await _execute(db, f"ALTER TABLE `{self.name}` ADD {definition}")
+
+    async def swap(self, db: AsyncSession) -> None:
+        await _execute(db, f"DROP TABLE IF EXISTS `{self.previous_name}`")
+        await _execute(
+            db,
+            f"RENAME TABLE `{self.live_table.name}` TO `{self.previous_name}`, "
+            f"`{self.name}` TO `{self.live_table.name}`",
+        )
+        self.swapped = True
+        await bump_dataset_version()
+        logger.info(
+            f"Tabela '{self.name}' promovida a '{self.live_table.name}'; a versão "
+            f"anterior foi mantida como '{self.previous_name}'."
+        )
+
+    async def drop(self, db: AsyncSession) -> None:
+        await _execute(db, f"DROP TABLE IF EXISTS `{self.name}`")
+        logger.info(f"Tabela '{self.name}' descartada.")
+
+
+async def rollback(db: AsyncSession, live_table: Table | None = None) -> bool:
+    # Troca a tabela atual pela anterior. A atual passa a ser a anterior, então
+    # um segundo rollback desfaz o primeiro.
+    live_name = (live_table if live_table is not None else Infraction.__table__).name
+    previous_name = f"{live_name}{PREVIOUS_TABLE_SUFFIX}"
+    if not await table_exists(db, previous_name):
+        logger.error(f"Não há tabela '{previous_name}' para restaurar.")
+        return False
+
+    swap_name = f"{live_name}_swap"
+    await _execute(
+        db,
+        f"RENAME TABLE `{live_name}` TO `{swap_name}`, "
+        f"`{previous_name}` TO `{live_name}`, "
+        f"`{swap_name}` TO `{previous_name}`",
+    )
+    await bump_dataset_version()
+    logger.info(f"Rollback concluído: '{previous_name}' voltou a ser '{live_name}'.")
+    return True
@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+
+DEFAULT_MEMO_SIZE = 200_000
+
+
+def safe_unidecode(text: str | None) -> str | None:
+    if pd.isna(text):
+        return None
+    return unidecode(str(text), errors="ignore")
+
+
+# Normaliza apenas os valores distintos de cada coluna e memoriza o resultado
+# em um cache LRU limitado, compartilhado entre chunks e arquivos.
+class TextNormalizer:
+    def __init__(self, max_size: int = DEFAULT_MEMO_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._memo: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+    def _normalize_value(self, text: str) -> str:
+        cached = self._memo.get(text)
+        if cached is not None:
+            self._memo.move_to_end(text)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        normalized = unidecode(text, errors="ignore")
+        self._memo[text] = normalized
+        if len(self._memo) > self.max_size:
+            self._memo.popitem(last=False)
+        return normalized
+
+    def normalize_series(self, series: pd.Series) -> pd.Series:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+        # A posição extra (None) é selecionada pelo código -1 dos valores nulos.
+        normalized_uniques = np.empty(len(uniques) + 1, dtype=object)
+        with self._lock:
+            for i, value in enumerate(uniques):
+                normalized_uniques[i] = self._normalize_value(str(value))
+        normalized_uniques[-1] = None
+
+        return pd.Series(
+            normalized_uniques[codes],
+            index=series.index,
+            dtype=object,
+            name=series.name,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+            self.hits = 0
+            self.misses = 0
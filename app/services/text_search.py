@@ -0,0 +1,52 @@
+import re
+
+from sqlalchemy import ColumnElement, and_
+from unidecode import unidecode
+
+# Coluna de texto -> coluna de busca normalizada (sem acentos e em minúsculas),
+# preenchida na ingestão e indexada com FULLTEXT (parser ngram).
+SEARCH_COLUMNS = {
+    "offender_name": "offender_name_search",
+    "municipality": "municipality_search",
+    "affected_biomes": "affected_biomes_search",
+}
+
+# ngram_token_size do servidor MySQL (padrão 2). Termos mais curtos não geram
+# nenhum token no índice e são buscados apenas com LIKE.
+NGRAM_TOKEN_SIZE = 2
+
+_WORD_SEPARATOR = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_search_text(text: str) -> str:
+    # Mesma normalização aplicada às colunas de busca na ingestão: unidecode
+    # (TextNormalizer) seguido de minúsculas.
+    return unidecode(text, errors="ignore").lower()
+
+
+def boolean_query(term: str) -> str | None:
+    # Cada palavra vira uma frase obrigatória no modo booleano; para o parser
+    # ngram, uma frase é a sequência dos seus n-gramas. Os separadores
+    # descartam os operadores do modo booleano vindos da entrada.
+    words = [
+        word for word in _WORD_SEPARATOR.split(term) if len(word) >= NGRAM_TOKEN_SIZE
+    ]
+    if not words:
+        return None
+    return " ".join(f'+"{word}"' for word in words)
+
+
+def escape_like(term: str) -> str:
+    # "%" e "_" digitados na busca são literais, não curingas do LIKE.
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_predicate(column: ColumnElement, value: str) -> ColumnElement:
+    # O MATCH usa o índice FULLTEXT para restringir as linhas candidatas; o
+    # LIKE sobre a mesma coluna confirma a substring exata, como o ILIKE fazia.
+    term = normalize_search_text(value)
+    like = column.like(f"%{escape_like(term)}%", escape="\\")
+    query = boolean_query(term)
+    if query is None:
+        return like
+    return and_(column.match(query), like)
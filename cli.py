@@ -6,14 +6,26 @@ import sys
 from typing import Optional, List
 import aiofiles.os as aio_os
 import os
+import signal
+import time
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, script_dir)
 
 try:
+    from app.core.config import settings
     from app.core.logging_config import setup_logging
+    from app.db.session import AsyncSessionLocal
+    from app.services import checkpoint_service, table_swap_service
     from app.services.crawler_service import CrawlerService
-    from app.services.ingestion_service import IngestionService
+    from app.services.ingestion_queue import IngestionWorker
+    from app.services.csv_reader import CsvReaderEngine
+    from app.services.ingestion_service import (
+        IngestionEngine,
+        IngestionProgress,
+        IngestionService,
+    )
+    from app.services.table_swap_service import ShadowTable
 except ImportError as e:
     print(
         "Erro Crítico: Não foi possível importar os módulos da 'app'.", file=sys.stderr
@@ -27,19 +39,126 @@ logger = logging.getLogger(__name__)
 app = typer.Typer()
 
 
-async def run_etl_pipeline():
+def ingestion_options(
+    workers: Optional[int],
+    engine: Optional[IngestionEngine],
+    delta: Optional[bool],
+    reader: Optional[CsvReaderEngine],
+) -> dict:
+    # Opções omitidas na linha de comando seguem o settings.toml.
+    return dict(
+        workers=workers or settings.INGESTION_WORKERS,
+        engine=engine or IngestionEngine(settings.INGESTION_ENGINE),
+        delta=settings.INGESTION_DELTA if delta is None else delta,
+        reader=reader or CsvReaderEngine(settings.INGESTION_CSV_READER),
+    )
+
+
+def log_throughput_summary(
+    completed: List[IngestionProgress], wall_elapsed: float
+) -> None:
+    if not completed:
+        return
+
+    logger.info("Vazão por arquivo:")
+    for progress in completed:
+        logger.info(
+            f"  {progress.file_name}: {progress.rows_read} linhas em "
+            f"{progress.elapsed_seconds:.1f}s ({progress.rows_per_second:,.0f} linhas/s, "
+            f"{progress.mb_per_second:.2f} MB/s)"
+        )
+
+    total_rows = sum(progress.rows_read for progress in completed)
+    total_mb = sum(progress.measured_bytes for progress in completed) / (1024 * 1024)
+    if wall_elapsed > 0:
+        logger.info(
+            f"Vazão agregada: {total_rows} linhas e {total_mb:.1f} MB em {wall_elapsed:.1f}s "
+            f"({total_rows / wall_elapsed:,.0f} linhas/s, {total_mb / wall_elapsed:.2f} MB/s)"
+        )
+
+
+async def prepare_full_reload() -> ShadowTable:
+    shadow = ShadowTable()
+    try:
+        async with AsyncSessionLocal() as db_session:
+            await shadow.create(db_session)
+    except BaseException:
+        await discard_full_reload(shadow)
+        raise
+    return shadow
+
+
+async def discard_full_reload(shadow: Optional[ShadowTable]) -> None:
+    # Chamada ao fim de toda execução com --full-reload: se a troca não
+    # aconteceu (arquivos com falha, erro ou interrupção no meio da carga), a
+    # cópia parcialmente carregada é descartada.
+    if shadow is None or shadow.swapped:
+        return
+    try:
+        async with AsyncSessionLocal() as db_session:
+            await shadow.drop(db_session)
+    except Exception as e:
+        logger.error(f"Não foi possível descartar a tabela '{shadow.name}': {e}")
+
+
+async def finish_full_reload(
+    shadow: ShadowTable, completed: List[IngestionProgress], files_failed: int
+) -> None:
+    async with AsyncSessionLocal() as db_session:
+        if files_failed or not completed:
+            logger.error(
+                "Recarga completa abortada: nem todos os arquivos foram carregados. "
+                "A tabela atual não foi alterada."
+            )
+            return
+
+        await shadow.build_indexes(db_session)
+        await shadow.swap(db_session)
+
+        # A carga na cópia não grava checkpoints; depois da troca os arquivos
+        # ficam registrados como ingeridos para as execuções incrementais.
+        for progress in completed:
+            await checkpoint_service.save_checkpoint(
+                db_session,
+                file_hash=progress.file_hash,
+                file_name=progress.file_name,
+                chunk_index=progress.chunk_index,
+                row_offset=progress.row_offset,
+                rows_affected=progress.rows_affected,
+                is_completed=True,
+            )
+        await db_session.commit()
+    logger.info("Recarga completa concluída.")
+
+
+async def run_etl_pipeline(
+    workers: int = 1,
+    commit_every: int | None = None,
+    resume: bool = True,
+    engine: IngestionEngine = IngestionEngine.UPSERT,
+    delta: bool = False,
+    reader: CsvReaderEngine = CsvReaderEngine.PANDAS,
+    concurrency: int = 1,
+    full_reload: bool = False,
+):
     logger.info("--- INICIANDO PIPELINE DE ETL DO IBAMA ---")
 
     csv_path_list: Optional[List[str]] = None
+    ingestion_service: Optional[IngestionService] = None
+    shadow: Optional[ShadowTable] = None
 
     try:
         async with httpx.AsyncClient() as client:
             logger.info("Instanciando CrawlerService...")
-            crawler = CrawlerService(client=client)
+            crawler = CrawlerService(client=client, conditional=not full_reload)
 
             logger.info("Executando Crawler: fetch_and_extract_all_csvs()...")
             csv_path_list = await crawler.fetch_and_extract_all_csvs()
 
+        if crawler.snapshot_unchanged:
+            logger.info("Os dados do IBAMA não mudaram desde a última ingestão.")
+            return
+
         if not csv_path_list:
             logger.error("Crawler falhou ou não retornou arquivos. Encerrando.")
             return
@@ -48,36 +167,72 @@ async def run_etl_pipeline():
             f"Crawler concluído. {len(csv_path_list)} arquivos prontos para ingestão."
         )
 
-        ingestion_service = IngestionService()
+        shadow = await prepare_full_reload() if full_reload else None
+        ingestion_service = IngestionService(
+            workers=workers,
+            engine=engine,
+            delta=delta,
+            reader=reader,
+            table=shadow.table if shadow is not None else None,
+        )
+        if concurrency > ingestion_service.max_connections:
+            logger.warning(
+                f"Concorrência {concurrency} acima do limite de "
+                f"{ingestion_service.max_connections} conexões com o banco; "
+                "os arquivos excedentes aguardam uma conexão livre."
+            )
 
-        files_processed = 0
-        files_failed = 0
+        semaphore = asyncio.Semaphore(concurrency)
 
-        for csv_path in csv_path_list:
-            try:
+        async def ingest_file(csv_path: str) -> Optional[IngestionProgress]:
+            async with semaphore:
                 logger.info(f"[Ingestion] Processando arquivo: {csv_path}...")
+                try:
+                    progress = await ingestion_service.process_csv(
+                        csv_path, commit_every=commit_every, resume=resume
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"[Ingestion] FALHA ao processar o arquivo {csv_path}: {e}",
+                        exc_info=True,
+                    )
+                    return None
 
-                await ingestion_service.process_csv(csv_path)
+                if progress is not None:
+                    logger.info(
+                        f"[Ingestion] Arquivo {csv_path} processado com sucesso."
+                    )
+                return progress
 
-                logger.info(f"[Ingestion] Arquivo {csv_path} processado com sucesso.")
-                files_processed += 1
+        started_at = time.perf_counter()
+        results = await asyncio.gather(
+            *(ingest_file(csv_path) for csv_path in csv_path_list)
+        )
+        wall_elapsed = time.perf_counter() - started_at
 
-            except Exception as e:
-                logger.error(
-                    f"[Ingestion] FALHA ao processar o arquivo {csv_path}: {e}",
-                    exc_info=True,
-                )
-                files_failed += 1
+        completed = [progress for progress in results if progress is not None]
+        files_processed = len(completed)
+        files_failed = len(results) - files_processed
 
         logger.info("--- PIPELINE DE ETL CONCLUÍDO ---")
         logger.info(
             f"Resumo: {files_processed} arquivos processados, {files_failed} falharam."
         )
+        log_throughput_summary(completed, wall_elapsed)
+
+        if shadow is not None:
+            await finish_full_reload(shadow, completed, files_failed)
+
+        if completed and not files_failed:
+            crawler.commit_snapshot()
 
     except Exception as e:
         logger.error(f"Erro fatal no orquestrador do pipeline: {e}", exc_info=True)
 
     finally:
+        if ingestion_service is not None:
+            await asyncio.to_thread(ingestion_service.shutdown)
+        await discard_full_reload(shadow)
         if csv_path_list:
             logger.info("Verificando limpeza de arquivos...")
             remaining_files = []
@@ -92,10 +247,240 @@ async def run_etl_pipeline():
         logger.info("--- FIM DA EXECUÇÃO ---")
 
 
+async def run_streaming_etl_pipeline(
+    workers: int = 1,
+    commit_every: int | None = None,
+    resume: bool = True,
+    engine: IngestionEngine = IngestionEngine.UPSERT,
+    delta: bool = False,
+    reader: CsvReaderEngine = CsvReaderEngine.PANDAS,
+    full_reload: bool = False,
+):
+    logger.info("--- INICIANDO PIPELINE DE ETL DO IBAMA (STREAMING) ---")
+
+    files_processed = 0
+    files_failed = 0
+    completed: List[IngestionProgress] = []
+    started_at = time.perf_counter()
+    ingestion_service: Optional[IngestionService] = None
+    shadow: Optional[ShadowTable] = None
+
+    try:
+        shadow = await prepare_full_reload() if full_reload else None
+        ingestion_service = IngestionService(
+            workers=workers,
+            engine=engine,
+            delta=delta,
+            reader=reader,
+            table=shadow.table if shadow is not None else None,
+        )
+
+        async with httpx.AsyncClient() as client:
+            logger.info("Instanciando CrawlerService...")
+            crawler = CrawlerService(client=client, conditional=not full_reload)
+
+            logger.info("Executando Crawler: fetch_csv_streams()...")
+            async for member, csv_stream in crawler.fetch_csv_streams():
+                try:
+                    logger.info(
+                        f"[Ingestion] Processando membro do ZIP: {member.filename}..."
+                    )
+
+                    progress = await ingestion_service.process_stream(
+                        csv_stream,
+                        member.filename,
+                        checkpoint_service.compute_zip_member_hash(member),
+                        commit_every=commit_every,
+                        resume=resume,
+                        source_size=member.file_size,
+                    )
+                    if progress is None:
+                        files_failed += 1
+                        continue
+                    completed.append(progress)
+
+                    logger.info(
+                        f"[Ingestion] Arquivo {member.filename} processado com sucesso."
+                    )
+                    files_processed += 1
+
+                except Exception as e:
+                    logger.error(
+                        f"[Ingestion] FALHA ao processar o arquivo {member.filename}: {e}",
+                        exc_info=True,
+                    )
+                    files_failed += 1
+
+        if crawler.snapshot_unchanged:
+            logger.info("Os dados do IBAMA não mudaram desde a última ingestão.")
+            return
+
+        logger.info("--- PIPELINE DE ETL CONCLUÍDO ---")
+        logger.info(
+            f"Resumo: {files_processed} arquivos processados, {files_failed} falharam."
+        )
+        log_throughput_summary(completed, time.perf_counter() - started_at)
+
+        if shadow is not None:
+            await finish_full_reload(shadow, completed, files_failed)
+
+        if completed and not files_failed:
+            crawler.commit_snapshot()
+
+    except Exception as e:
+        logger.error(f"Erro fatal no orquestrador do pipeline: {e}", exc_info=True)
+
+    finally:
+        if ingestion_service is not None:
+            await asyncio.to_thread(ingestion_service.shutdown)
+        await discard_full_reload(shadow)
+        logger.info("--- FIM DA EXECUÇÃO ---")
+
+
 @app.command()
-def run():
+def run(
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        help="Processos usados na transformação dos chunks, 1 = thread única (padrão: INGESTION_WORKERS).",
+    ),
+    commit_every: Optional[int] = typer.Option(
+        None,
+        "--commit-every",
+        min=1,
+        help="Quantidade de chunks entre commits (padrão: INGESTION_COMMIT_EVERY_CHUNKS).",
+    ),
+    resume: bool = typer.Option(
+        True,
+        "--resume/--no-resume",
+        help="Retoma arquivos interrompidos a partir do último checkpoint.",
+    ),
+    engine: Optional[IngestionEngine] = typer.Option(
+        None,
+        "--engine",
+        help="Engine de escrita: upsert em lotes ou LOAD DATA em tabela de staging (padrão: INGESTION_ENGINE).",
+    ),
+    delta: Optional[bool] = typer.Option(
+        None,
+        "--delta/--no-delta",
+        help="Grava apenas linhas novas ou alteradas, comparando o row_hash (padrão: INGESTION_DELTA).",
+    ),
+    reader: Optional[CsvReaderEngine] = typer.Option(
+        None,
+        "--reader",
+        help="Leitor de CSV: pandas ou pyarrow, multithread e requer o pacote pyarrow (padrão: INGESTION_CSV_READER).",
+    ),
+    concurrency: int = typer.Option(
+        1,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Arquivos ingeridos em paralelo, cada um com a sua sessão (limitado por INGESTION_MAX_DB_CONNECTIONS).",
+    ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Lê os CSVs direto do ZIP, sem extraí-los para arquivos temporários.",
+    ),
+    full_reload: bool = typer.Option(
+        False,
+        "--full-reload",
+        help="Carrega tudo em infractions_next e troca pela tabela atual ao final (RENAME TABLE).",
+    ),
+):
     logger.info("Typer: Recebido comando 'run'. Iniciando loop asyncio...")
-    asyncio.run(run_etl_pipeline())
+    options = dict(
+        **ingestion_options(workers, engine, delta, reader),
+        commit_every=commit_every,
+        resume=resume,
+        full_reload=full_reload,
+    )
+    if stream:
+        # Os membros do ZIP são lidos em sequência a partir do mesmo arquivo.
+        if concurrency > 1:
+            logger.warning("--concurrency é ignorado no modo --stream.")
+        asyncio.run(run_streaming_etl_pipeline(**options))
+    else:
+        asyncio.run(run_etl_pipeline(**options, concurrency=concurrency))
+
+
+async def run_rollback() -> bool:
+    async with AsyncSessionLocal() as db_session:
+        return await table_swap_service.rollback(db_session)
+
+
+@app.command()
+def rollback():
+    logger.info("Typer: Recebido comando 'rollback'.")
+    if not asyncio.run(run_rollback()):
+        raise typer.Exit(code=1)
+
+
+async def run_worker(
+    concurrency: int = 1,
+    workers: int = 1,
+    engine: IngestionEngine = IngestionEngine.UPSERT,
+    delta: bool = False,
+    reader: CsvReaderEngine = CsvReaderEngine.PANDAS,
+):
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # Para de buscar jobs e termina o que está em andamento; um job
+        # interrompido à força volta para a fila quando o heartbeat expira.
+        loop.add_signal_handler(sig, stop_event.set)
+
+    ingestion_service = IngestionService(
+        workers=workers, engine=engine, delta=delta, reader=reader
+    )
+    worker = IngestionWorker(ingestion_service, concurrency=concurrency)
+    try:
+        await worker.run(stop_event)
+    finally:
+        await asyncio.to_thread(ingestion_service.shutdown)
+
+
+@app.command()
+def worker(
+    concurrency: int = typer.Option(
+        1,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Jobs processados ao mesmo tempo por este worker.",
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        help="Processos usados na transformação dos chunks, 1 = thread única (padrão: INGESTION_WORKERS).",
+    ),
+    engine: Optional[IngestionEngine] = typer.Option(
+        None,
+        "--engine",
+        help="Engine de escrita: upsert em lotes ou LOAD DATA em tabela de staging (padrão: INGESTION_ENGINE).",
+    ),
+    delta: Optional[bool] = typer.Option(
+        None,
+        "--delta/--no-delta",
+        help="Grava apenas linhas novas ou alteradas, comparando o row_hash (padrão: INGESTION_DELTA).",
+    ),
+    reader: Optional[CsvReaderEngine] = typer.Option(
+        None,
+        "--reader",
+        help="Leitor de CSV: pandas ou pyarrow, multithread e requer o pacote pyarrow (padrão: INGESTION_CSV_READER).",
+    ),
+):
+    logger.info("Typer: Recebido comando 'worker'. Consumindo a fila de ingestão...")
+    asyncio.run(
+        run_worker(
+            concurrency=concurrency,
+            **ingestion_options(workers, engine, delta, reader),
+        )
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pandas as pd
+import typer
+from sqlalchemy import delete
+
+from app.db.session import AsyncSessionLocal
+from app.models.infraction import Infraction
+from app.services.csv_reader import CsvReaderEngine, get_next_chunk, open_csv_reader
+from app.services.csv_schema import COLUMN_MAPPING
+from app.services.ingestion_service import IngestionService, upsert_writer
+from app.services.text_normalizer import TextNormalizer
+from synthetic_csv import write_synthetic_csv
+
+app = typer.Typer()
+
+STAGES = ["read", "process_chunk", "upsert"]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss vem em KB no Linux e em bytes no macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() == "Darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def cleanup(prefix: str) -> None:
+    async with AsyncSessionLocal() as db_session:
+        await db_session.execute(
+            delete(Infraction).where(Infraction.infraction_number.like(f"{prefix}%"))
+        )
+        await db_session.commit()
+
+
+async def run_stages(
+    path: str,
+    chunk_size: int,
+    reader: CsvReaderEngine,
+    upsert: bool,
+    commit_every: int,
+) -> dict:
+    # Os estágios rodam em sequência, chunk a chunk, e cada um acumula apenas
+    # o próprio tempo: o arquivo nunca fica inteiro em memória.
+    service = IngestionService(normalizer=TextNormalizer(), reader=reader)
+    seconds = dict.fromkeys(STAGES, 0.0)
+    rows = dict.fromkeys(STAGES, 0)
+    chunks = 0
+    rows_valid = 0
+
+    db_session = AsyncSessionLocal() if upsert else None
+    reader_iterator = open_csv_reader(path, chunk_size, reader)
+    try:
+        while True:
+            start = time.perf_counter()
+            chunk_df = get_next_chunk(reader_iterator)
+            seconds["read"] += time.perf_counter() - start
+            if chunk_df is None:
+                break
+            chunks += 1
+            rows["read"] += len(chunk_df)
+            rows["process_chunk"] += len(chunk_df)
+
+            start = time.perf_counter()
+            batch = service.process_chunk(chunk_df, COLUMN_MAPPING)
+            seconds["process_chunk"] += time.perf_counter() - start
+            rows_valid += len(batch)
+
+            if db_session is not None and len(batch):
+                start = time.perf_counter()
+                await upsert_writer.write(db_session, batch)
+                if chunks % commit_every == 0:
+                    await db_session.commit()
+                seconds["upsert"] += time.perf_counter() - start
+                rows["upsert"] += len(batch)
+
+        if db_session is not None:
+            start = time.perf_counter()
+            await db_session.commit()
+            seconds["upsert"] += time.perf_counter() - start
+    finally:
+        reader_iterator.close()
+        if db_session is not None:
+            await db_session.close()
+
+    stages = {}
+    for stage in STAGES:
+        if stage == "upsert" and not upsert:
+            continue
+        stages[stage] = {
+            "seconds": round(seconds[stage], 4),
+            "rows": rows[stage],
+            "rows_per_second": round(rows[stage] / seconds[stage], 1)
+            if seconds[stage]
+            else 0.0,
+        }
+    return {"chunks": chunks, "rows_valid": rows_valid, "stages": stages}
+
+
+def compare(results: dict, baseline_path: str) -> None:
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"Comparação com {baseline_path} (commit {baseline.get('commit')}):")
+    for stage, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous or not previous["rows_per_second"]:
+            continue
+        change = current["rows_per_second"] / previous["rows_per_second"] - 1
+        print(
+            f"{stage:>14}: {previous['rows_per_second']:,.0f} -> "
+            f"{current['rows_per_second']:,.0f} linhas/s ({change:+.1%})"
+        )
+    previous_rss = baseline.get("peak_rss_mb")
+    if previous_rss:
+        print(
+            f"{'pico de RSS':>14}: {previous_rss:.0f} -> {results['peak_rss_mb']:.0f} MB"
+        )
+
+
+@app.command()
+def main(
+    rows: int = typer.Option(1_000_000, help="Linhas do arquivo sintético."),
+    dup_rate: float = typer.Option(0.05, help="Fração de números de auto repetidos."),
+    null_rate: float = typer.Option(0.01, help="Chance de cada campo sair vazio."),
+    chunk_size: int = typer.Option(5000, help="Linhas por chunk."),
+    reader: CsvReaderEngine = typer.Option(
+        CsvReaderEngine.PANDAS, help="Leitor de CSV."
+    ),
+    upsert: bool = typer.Option(
+        False, help="Também mede o upsert no banco configurado."
+    ),
+    commit_every: int = typer.Option(20, help="Chunks entre commits no upsert."),
+    source: str | None = typer.Option(
+        None, help="CSV já existente; sem ele, um arquivo sintético é gerado."
+    ),
+    output: str = typer.Option(
+        "benchmark_results", help="Diretório onde o JSON do resultado é gravado."
+    ),
+    baseline: str | None = typer.Option(
+        None, help="JSON de uma execução anterior para comparar."
+    ),
+    seed: int = typer.Option(42, help="Semente do gerador aleatório."),
+):
+    prefix = f"BENCH{uuid.uuid4().hex[:6].upper()}"
+    path = source
+    if path is None:
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as temp_file:
+            path = temp_file.name
+        start = time.perf_counter()
+        write_synthetic_csv(path, rows, prefix, seed, dup_rate, null_rate)
+        print(f"Arquivo sintético gerado em {time.perf_counter() - start:.1f}s.")
+
+    try:
+        results = asyncio.run(
+            run_stages(path, chunk_size, reader, upsert, commit_every)
+        )
+    finally:
+        if source is None:
+            os.remove(path)
+        if upsert and source is None:
+            asyncio.run(cleanup(prefix))
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "params": {
+            "rows": rows if source is None else None,
+            "source": source,
+            "dup_rate": dup_rate,
+            "null_rate": null_rate,
+            "chunk_size": chunk_size,
+            "reader": reader.value,
+            "upsert": upsert,
+            "commit_every": commit_every,
+            "seed": seed,
+        },
+        **results,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+    os.makedirs(output, exist_ok=True)
+    result_path = os.path.join(
+        output,
+        f"ingestion-{datetime.now():%Y%m%d-%H%M%S}-{results['commit'] or 'local'}.json",
+    )
+    with open(result_path, "w") as result_file:
+        json.dump(results, result_file, indent=2)
+
+    for stage, stats in results["stages"].items():
+        print(
+            f"{stage:>14}: {stats['seconds']:.2f}s "
+            f"({stats['rows_per_second']:,.0f} linhas/s, {stats['rows']} linhas)"
+        )
+    print(f"{'pico de RSS':>14}: {results['peak_rss_mb']:.0f} MB")
+    print(f"Resultado gravado em {result_path}")
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    app()
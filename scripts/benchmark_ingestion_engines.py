@@ -0,0 +1,69 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+import typer
+from sqlalchemy import delete
+
+from app.db.session import AsyncSessionLocal
+from app.models.infraction import Infraction
+from app.services.ingestion_service import IngestionEngine, IngestionService
+from synthetic_csv import write_synthetic_csv
+
+app = typer.Typer()
+
+
+async def run_engine(engine: IngestionEngine, source_path: str) -> float:
+    # process_csv remove o arquivo ao final, então cada execução usa uma cópia.
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as temp_file:
+        run_path = temp_file.name
+    shutil.copyfile(source_path, run_path)
+
+    start = time.perf_counter()
+    await IngestionService(engine=engine).process_csv(run_path, resume=False)
+    return time.perf_counter() - start
+
+
+async def cleanup(prefix: str) -> None:
+    async with AsyncSessionLocal() as db_session:
+        await db_session.execute(
+            delete(Infraction).where(Infraction.infraction_number.like(f"{prefix}%"))
+        )
+        await db_session.commit()
+
+
+async def run_benchmark(rows: int) -> None:
+    results = []
+    for engine in IngestionEngine:
+        prefix = f"BENCH{uuid.uuid4().hex[:6].upper()}"
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as temp_file:
+            source_path = temp_file.name
+        try:
+            write_synthetic_csv(source_path, rows, prefix=prefix)
+            # Primeira passada insere as linhas; a segunda atualiza as mesmas chaves.
+            insert_elapsed = await run_engine(engine, source_path)
+            update_elapsed = await run_engine(engine, source_path)
+            results.append((engine.value, insert_elapsed, update_elapsed))
+        finally:
+            os.remove(source_path)
+            await cleanup(prefix)
+
+    print(f"Linhas por arquivo: {rows}")
+    for engine_name, insert_elapsed, update_elapsed in results:
+        print(
+            f"{engine_name:>10}: inserção {insert_elapsed:.2f}s "
+            f"({rows / insert_elapsed:,.0f} linhas/s), "
+            f"atualização {update_elapsed:.2f}s ({rows / update_elapsed:,.0f} linhas/s)"
+        )
+
+
+@app.command()
+def main(rows: int = typer.Option(200_000, help="Linhas do arquivo sintético.")):
+    asyncio.run(run_benchmark(rows))
+
+
+if __name__ == "__main__":
+    app()
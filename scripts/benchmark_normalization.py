@@ -0,0 +1,78 @@
+import random
+import time
+
+import pandas as pd
+import typer
+
+from app.services.text_normalizer import TextNormalizer, safe_unidecode
+
+app = typer.Typer()
+
+FIRST_NAMES = ["João", "José", "Antônio", "Conceição", "Sebastião", "Inês", "Lúcia"]
+LAST_NAMES = ["Araújo", "Gonçalves", "Patrício", "Magalhães", "Simões", "Brandão"]
+MUNICIPALITIES = ["São Félix do Xingu", "Altamira", "Porto Velho", "Lábrea", "Marabá"]
+BIOMES = ["Amazônia", "Cerrado", "Caatinga", "Mata Atlântica", "Pantanal", "Pampa"]
+
+
+def build_chunk(rows: int, distinct_names: int, rng: random.Random) -> pd.DataFrame:
+    names = [
+        f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}"
+        for i in range(distinct_names)
+    ]
+    return pd.DataFrame(
+        {
+            "offender_name": [rng.choice(names) for _ in range(rows)],
+            "municipality": [rng.choice(MUNICIPALITIES) for _ in range(rows)],
+            "affected_biomes": [
+                rng.choice(BIOMES) if rng.random() > 0.1 else None for _ in range(rows)
+            ],
+        }
+    )
+
+
+@app.command()
+def main(
+    chunks: int = typer.Option(20, help="Quantidade de chunks processados."),
+    chunk_size: int = typer.Option(5000, help="Linhas por chunk."),
+    distinct_names: int = typer.Option(2000, help="Nomes distintos por chunk."),
+    seed: int = typer.Option(42, help="Semente do gerador aleatório."),
+):
+    rng = random.Random(seed)
+    frames = [build_chunk(chunk_size, distinct_names, rng) for _ in range(chunks)]
+
+    start = time.perf_counter()
+    for frame in frames:
+        for col in frame.columns:
+            frame[col].apply(safe_unidecode)
+    apply_elapsed = time.perf_counter() - start
+
+    normalizer = TextNormalizer()
+    start = time.perf_counter()
+    for frame in frames:
+        for col in frame.columns:
+            normalizer.normalize_series(frame[col])
+    normalizer_elapsed = time.perf_counter() - start
+
+    for col in frames[0].columns:
+        expected = frames[0][col].apply(safe_unidecode)
+        assert normalizer.normalize_series(frames[0][col]).equals(expected)
+
+    total_rows = chunks * chunk_size
+    print(f"Linhas processadas: {total_rows} ({chunks} chunks de {chunk_size})")
+    print(
+        f"Series.apply(safe_unidecode): {apply_elapsed:.3f}s "
+        f"({total_rows / apply_elapsed:,.0f} linhas/s)"
+    )
+    print(
+        f"TextNormalizer:               {normalizer_elapsed:.3f}s "
+        f"({total_rows / normalizer_elapsed:,.0f} linhas/s)"
+    )
+    print(f"Speedup: {apply_elapsed / normalizer_elapsed:.1f}x")
+    print(
+        f"Cache: {len(normalizer)} valores, {normalizer.hits} acertos, "
+        f"{normalizer.misses} falhas"
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import statistics
+import time
+
+import typer
+from sqlalchemy import Select, func, select
+
+from app.db.session import AsyncSessionLocal
+from app.models.infraction import Infraction
+from app.services.infraction_count_service import explain_statement
+from app.services.text_search import SEARCH_COLUMNS, search_predicate
+
+app = typer.Typer()
+
+DEFAULT_SEARCHES = [
+    "offender_name=silva",
+    "offender_name=conceicao",
+    "municipality=altamira",
+    "municipality=são félix",
+    "affected_biomes=amazonia",
+]
+
+
+def build_queries(field: str, term: str) -> dict[str, Select]:
+    # O plano antigo (ILIKE na coluna original) contra o novo (FULLTEXT + LIKE
+    # na coluna de busca), ambos contando as linhas encontradas.
+    source = Infraction.__table__.c[field]
+    search = Infraction.__table__.c[SEARCH_COLUMNS[field]]
+    return {
+        "ilike": select(func.count()).where(source.ilike(f"%{term}%")),
+        "fulltext": select(func.count()).where(search_predicate(search, term)),
+    }
+
+
+async def explain_access(db_session, stmt: Select) -> str:
+    connection = await db_session.connection()
+    sql, params = explain_statement(stmt, connection.dialect)
+    result = await connection.exec_driver_sql(sql, params)
+    table = json.loads(result.scalar())["query_block"].get("table", {})
+    return f"{table.get('access_type', '-')}/{table.get('key', '-')}"
+
+
+async def run_benchmark(searches: list[str], repeat: int) -> None:
+    async with AsyncSessionLocal() as db_session:
+        for search in searches:
+            field, _, term = search.partition("=")
+            if field not in SEARCH_COLUMNS or not term:
+                raise typer.BadParameter(
+                    f"Busca inválida: '{search}' (use campo=termo, campo em "
+                    f"{', '.join(SEARCH_COLUMNS)})."
+                )
+
+            print(f"{field} ~ '{term}'")
+            for plan, stmt in build_queries(field, term).items():
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    rows = (await db_session.execute(stmt)).scalar()
+                    timings.append(time.perf_counter() - start)
+                access = await explain_access(db_session, stmt)
+                print(
+                    f"  {plan:>8}: {rows} linhas, mediana "
+                    f"{statistics.median(timings) * 1000:.1f} ms, "
+                    f"mínimo {min(timings) * 1000:.1f} ms ({access})"
+                )
+
+
+@app.command()
+def main(
+    search: list[str] = typer.Option(
+        DEFAULT_SEARCHES,
+        "--search",
+        help="Busca no formato campo=termo; pode ser repetida.",
+    ),
+    repeat: int = typer.Option(5, min=1, help="Execuções de cada consulta."),
+):
+    asyncio.run(run_benchmark(search, repeat))
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,101 @@
+import csv
+import random
+from datetime import datetime, timedelta
+
+import typer
+
+from app.services.csv_schema import COLUMN_MAPPING
+
+app = typer.Typer()
+
+# Colunas que identificam a linha e nunca ficam vazias no arquivo gerado.
+KEY_COLUMNS = {"SEQ_AUTO_INFRACAO", "NUM_AUTO_INFRACAO"}
+
+FIRST_NAMES = ["João", "José", "Antônio", "Conceição", "Sebastião", "Inês", "Lúcia"]
+LAST_NAMES = ["Araújo", "Gonçalves", "Patrício", "Magalhães", "Simões", "Brandão"]
+MUNICIPALITIES = [
+    ("São Félix do Xingu", "PA"),
+    ("Altamira", "PA"),
+    ("Porto Velho", "RO"),
+    ("Lábrea", "AM"),
+    ("Marabá", "PA"),
+    ("Cáceres", "MT"),
+]
+BIOMES = ["Amazônia", "Cerrado", "Caatinga", "Mata Atlântica", "Pantanal", "Pampa"]
+STATUSES = ["Lavrado", "Cancelado", "Em julgamento", "Homologado"]
+
+
+def build_row(index: int, prefix: str, rng: random.Random) -> dict[str, str]:
+    municipality, state = rng.choice(MUNICIPALITIES)
+    infraction_datetime = datetime(2005, 1, 1) + timedelta(
+        minutes=rng.randrange(20 * 365 * 24 * 60)
+    )
+    return {
+        "SEQ_AUTO_INFRACAO": str(index),
+        "NUM_AUTO_INFRACAO": f"{prefix}{index:09d}",
+        "NU_PROCESSO_FORMATADO": f"02001.{index:06d}/{infraction_datetime.year}-00",
+        "DES_STATUS_FORMULARIO": rng.choice(STATUSES),
+        "TIPO_AUTO": rng.choice(["Multa", "Advertência"]),
+        "GRAVIDADE_INFRACAO": rng.choice(["Leve", "Média", "Grave"]),
+        "VAL_AUTO_INFRACAO": f"{rng.uniform(500, 5_000_000):.2f}".replace(".", ","),
+        "DAT_HORA_AUTO_INFRACAO": infraction_datetime.strftime("%Y-%m-%d %H:%M:%S"),
+        "DT_FATO_INFRACIONAL": infraction_datetime.strftime("%Y-%m-%d"),
+        "DT_LANCAMENTO": infraction_datetime.strftime("%Y-%m-%d"),
+        "DT_ULT_ALTERACAO": infraction_datetime.strftime("%Y-%m-%d %H:%M:%S"),
+        "NOME_INFRATOR": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "CPF_CNPJ_INFRATOR": f"{rng.randrange(10**11):011d}",
+        "DES_AUTO_INFRACAO": "Desmatar floresta nativa sem autorização do órgão competente.",
+        "DES_INFRACAO": "Flora",
+        "MUNICIPIO": municipality,
+        "UF": state,
+        "DES_LOCAL_INFRACAO": f"Fazenda Boa Vista, lote {rng.randrange(1000)}",
+        "NUM_LONGITUDE_AUTO": f"{rng.uniform(-73, -35):.6f}".replace(".", ","),
+        "NUM_LATITUDE_AUTO": f"{rng.uniform(-33, 5):.6f}".replace(".", ","),
+        "DS_BIOMAS_ATINGIDOS": rng.choice(BIOMES),
+    }
+
+
+def write_synthetic_csv(
+    path: str,
+    rows: int,
+    prefix: str = "SYN",
+    seed: int = 42,
+    dup_rate: float = 0.0,
+    null_rate: float = 0.0,
+) -> None:
+    # dup_rate: fração das linhas que repetem o número de um auto anterior
+    # (viram atualizações no upsert). null_rate: chance de cada campo, exceto
+    # os identificadores, sair vazio; campos obrigatórios vazios geram descartes.
+    rng = random.Random(seed)
+    nullable_columns = [col for col in COLUMN_MAPPING if col not in KEY_COLUMNS]
+    with open(path, "w", encoding="latin-1", newline="") as csv_file:
+        writer = csv.DictWriter(
+            csv_file, fieldnames=list(COLUMN_MAPPING.keys()), delimiter=";"
+        )
+        writer.writeheader()
+        for index in range(rows):
+            row = build_row(index, prefix, rng)
+            if index and dup_rate and rng.random() < dup_rate:
+                row["NUM_AUTO_INFRACAO"] = f"{prefix}{rng.randrange(index):09d}"
+            if null_rate:
+                for col in nullable_columns:
+                    if rng.random() < null_rate:
+                        row[col] = ""
+            writer.writerow(row)
+
+
+@app.command()
+def main(
+    path: str = typer.Argument(..., help="Arquivo CSV a ser gerado."),
+    rows: int = typer.Option(1_000_000, help="Quantidade de linhas."),
+    dup_rate: float = typer.Option(0.0, help="Fração de números de auto repetidos."),
+    null_rate: float = typer.Option(0.0, help="Chance de cada campo sair vazio."),
+    prefix: str = typer.Option("SYN", help="Prefixo dos números de auto."),
+    seed: int = typer.Option(42, help="Semente do gerador aleatório."),
+):
+    write_synthetic_csv(path, rows, prefix, seed, dup_rate, null_rate)
+    print(f"{rows} linhas gravadas em {path}")
+
+
+if __name__ == "__main__":
+    app()
@@ -10,7 +10,9 @@ from sqlalchemy.ext.asyncio import (
 from app.api import deps
 from app.main import app
 from app.models.base import Base
+from app.models.biome import Biome  # noqa: F401
 from app.models.infraction import Infraction  # noqa: F401
+from app.models.ingestion_checkpoint import IngestionCheckpoint  # noqa: F401
 from app.models.user import User  # noqa: F401
 
 
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from app.services.batch_writer import UpsertWriter
+
+
+def test_frame_to_batch_orders_columns_and_nulls():
+    writer = UpsertWriter()
+    chunk_df = pd.DataFrame(
+        {
+            "infraction_number": ["A1", "A2"],
+            "state": pd.Categorical(["PA", None]),
+            "fine_value": [10.5, np.nan],
+            "infraction_datetime": pd.to_datetime(["2021-03-04 10:00:00", None]),
+        }
+    )
+
+    batch = writer.frame_to_batch(chunk_df)
+
+    assert len(batch) == 2
+    assert all(len(row) == len(writer.columns) for row in batch.rows)
+    first = dict(zip(writer.columns, batch.rows[0]))
+    second = dict(zip(writer.columns, batch.rows[1]))
+    assert first["infraction_number"] == "A1"
+    assert first["state"] == "PA"
+    assert first["fine_value"] == 10.5
+    assert second["state"] is None
+    assert second["fine_value"] is None
+    assert second["infraction_datetime"] is None
+    assert second["process_number"] is None
+
+
+def test_split_respects_statement_budget():
+    writer = UpsertWriter()
+    row_sizes = np.array([40, 40, 40, 100, 10])
+
+    bounds = writer._split(row_sizes, budget=90)
+
+    assert bounds == [(0, 2), (2, 3), (3, 4), (4, 5)]
+
+
+def test_upsert_sql_is_built_from_table_columns():
+    writer = UpsertWriter()
+
+    assert "id" not in writer.columns
+    assert "`row_hash` = new.`row_hash`" in writer._upsert_suffix
+    assert "`infraction_number` = new" not in writer._upsert_suffix
+    assert writer._row_placeholder.count("%s") == len(writer.columns)
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from app.services.biome_mask import (
+    BIOME_BITS,
+    masks_containing,
+    parse_biome_filter,
+    series_mask,
+    text_mask,
+)
+
+
+def test_text_mask_recognizes_every_biome():
+    mask = text_mask("Amazônia, Cerrado; MATA ATLÂNTICA / Pantanal")
+
+    assert mask == (
+        BIOME_BITS["amazonia"]
+        | BIOME_BITS["cerrado"]
+        | BIOME_BITS["mata_atlantica"]
+        | BIOME_BITS["pantanal"]
+    )
+    assert text_mask("Zona costeira") == 0
+
+
+def test_series_mask_handles_nulls_and_repeated_values():
+    series = pd.Series(["Caatinga", None, "Pampa,Caatinga", "Caatinga"])
+
+    assert series_mask(series).tolist() == [
+        BIOME_BITS["caatinga"],
+        0,
+        BIOME_BITS["pampa"] | BIOME_BITS["caatinga"],
+        BIOME_BITS["caatinga"],
+    ]
+
+
+def test_parse_biome_filter_requires_known_biomes():
+    assert parse_biome_filter("Amazonia, cerrado") == (
+        BIOME_BITS["amazonia"] | BIOME_BITS["cerrado"]
+    )
+    assert parse_biome_filter("Amazonia, Marinho") is None
+    assert parse_biome_filter(" , ") is None
+
+
+def test_masks_containing_lists_every_superset():
+    required = BIOME_BITS["amazonia"] | BIOME_BITS["pampa"]
+
+    masks = masks_containing(required)
+
+    assert len(masks) == 16
+    assert all(mask & required == required for mask in masks)
+    assert len(masks_containing(BIOME_BITS["cerrado"])) == 32
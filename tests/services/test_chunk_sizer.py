@@ -0,0 +1,64 @@
+from app.services.chunk_sizer import ChunkSizer
+
+
+def build_sizer(**overrides) -> ChunkSizer:
+    options = dict(
+        initial_size=5000,
+        min_size=1000,
+        max_size=50000,
+        target_seconds=1.0,
+        memory_ceiling_bytes=512 * 2**20,
+        in_flight=6,
+    )
+    options.update(overrides)
+    return ChunkSizer(**options)
+
+
+def test_fast_writes_grow_the_chunk_at_most_twofold():
+    sizer = build_sizer()
+    sizer.record_write(5000, 0.1)
+    assert sizer.size == 10000
+    sizer.record_write(10000, 0.2)
+    assert sizer.size == 20000
+
+
+def test_slow_writes_shrink_the_chunk_down_to_the_minimum():
+    sizer = build_sizer()
+    for _ in range(5):
+        sizer.record_write(sizer.size, 20.0)
+    assert sizer.size == 1000
+
+
+def test_memory_ceiling_wins_over_latency():
+    sizer = build_sizer(memory_ceiling_bytes=60 * 2**20)
+    # 2 KB por linha e 6 chunks em trânsito: cabem ~5100 linhas por chunk.
+    sizer.record_memory(5000, 5000 * 2048)
+    sizer.record_write(5000, 0.1)
+    assert sizer.size == 5000
+
+    sizer.record_memory(5000, 5000 * 8192)
+    sizer.record_write(5000, 0.1)
+    assert 1000 < sizer.size < 5000
+
+
+def test_small_changes_are_ignored():
+    sizer = build_sizer()
+    sizer.record_write(5000, 1.05)
+    assert sizer.size == 5000
+
+
+def test_fixed_size_when_not_adaptive():
+    sizer = build_sizer(adaptive=False)
+    sizer.record_write(5000, 0.01)
+    assert sizer.size == 5000
+
+
+def test_every_decision_is_logged_at_info(caplog):
+    sizer = build_sizer()
+    with caplog.at_level("INFO", logger="app.services.chunk_sizer"):
+        sizer.record_write(5000, 1.0)
+        sizer.record_write(5000, 0.1)
+
+    messages = [r.getMessage() for r in caplog.records if r.levelname == "INFO"]
+    assert "mantido em 5000" in messages[0]
+    assert f"5000 -> {sizer.size}" in messages[1]
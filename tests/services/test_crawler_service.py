@@ -0,0 +1,274 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.services import crawler_service
+from app.services.crawler_service import CrawlerService, SnapshotState
+
+BODY = bytes(range(256)) * 64
+LAST_MODIFIED = "Tue, 01 Oct 2024 10:00:00 GMT"
+
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    # Imita o servidor de dados abertos: ETag, Last-Modified, 304 e Range.
+    server: "SnapshotServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        etag = f'"{hashlib.md5(server.body).hexdigest()}"'
+        if server.weak_etag:
+            etag = f"W/{etag}"
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        size = len(server.body)
+        start, end = 0, size - 1
+        range_header = self.headers.get("Range")
+        # If-Range só aceita validadores fortes: um ETag fraco nunca confere.
+        if_range = self.headers.get("If-Range")
+        ranged = bool(
+            server.accept_ranges
+            and range_header
+            and if_range in (LAST_MODIFIED, None if server.weak_etag else etag)
+        )
+        if ranged:
+            first, _, last = range_header.removeprefix("bytes=").partition("-")
+            start, end = int(first), min(int(last or end), end)
+            if start >= size:
+                self.send_response(416)
+                self.end_headers()
+                return
+
+        payload = server.body[start : end + 1]
+        self.send_response(206 if ranged else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        if server.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(payload)))
+        if ranged:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+
+        with server.lock:
+            cut = server.cut_after
+            if cut is not None and (ranged or not server.cut_ranged_only):
+                server.cut_after = None
+                server.cuts_left -= 1
+                if server.cuts_left > 0:
+                    server.cut_after = cut
+            else:
+                cut = None
+        if cut is not None:
+            # Derruba a conexão no meio do corpo.
+            self.wfile.write(payload[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(payload)
+
+
+class SnapshotServer(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SnapshotHandler)
+        self.body = BODY
+        self.accept_ranges = True
+        self.weak_etag = False
+        self.lock = threading.Lock()
+        # Respostas derrubadas depois de cut_after bytes (cuts_left vezes).
+        self.cut_after: int | None = None
+        self.cuts_left = 1
+        self.cut_ranged_only = False
+        self.requests: list[dict] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/auto_infracao_csv.zip"
+
+
+@pytest.fixture
+def snapshot_server():
+    server = SnapshotServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def download(server: SnapshotServer, download_dir, **kwargs) -> CrawlerService:
+    kwargs.setdefault("segments", 1)
+    async with httpx.AsyncClient() as client:
+        crawler = CrawlerService(
+            client, url=server.url, download_dir=str(download_dir), **kwargs
+        )
+        try:
+            await crawler.download_zip()
+        except httpx.TransportError:
+            pass
+    return crawler
+
+
+@pytest.mark.anyio
+async def test_unchanged_snapshot_gets_304(snapshot_server, tmp_path):
+    crawler = await download(snapshot_server, tmp_path)
+    assert not crawler.snapshot_unchanged
+    assert open(crawler.zip_path, "rb").read() == BODY
+    crawler.commit_snapshot()
+
+    state = SnapshotState.load(crawler.state_path)
+    assert state.sha256 == hashlib.sha256(BODY).hexdigest()
+    assert state.content_length == len(BODY)
+    assert state.last_modified == LAST_MODIFIED
+
+    crawler = await download(snapshot_server, tmp_path)
+    assert crawler.snapshot_unchanged
+    assert snapshot_server.requests[-1]["If-None-Match"] == state.etag
+    assert snapshot_server.requests[-1]["If-Modified-Since"] == LAST_MODIFIED
+
+
+@pytest.mark.anyio
+async def test_uncommitted_snapshot_is_downloaded_again(snapshot_server, tmp_path):
+    await download(snapshot_server, tmp_path)
+
+    crawler = await download(snapshot_server, tmp_path)
+
+    assert not crawler.snapshot_unchanged
+    assert "If-None-Match" not in snapshot_server.requests[-1]
+
+
+@pytest.mark.anyio
+async def test_same_hash_with_new_validators_is_unchanged(snapshot_server, tmp_path):
+    crawler = await download(snapshot_server, tmp_path)
+    crawler.commit_snapshot()
+    state = SnapshotState.load(crawler.state_path)
+    state.etag = '"etag-antigo"'
+    state.save(crawler.state_path)
+
+    crawler = await download(snapshot_server, tmp_path)
+
+    assert crawler.snapshot_unchanged
+    assert SnapshotState.load(crawler.state_path).etag != '"etag-antigo"'
+
+
+@pytest.mark.anyio
+async def test_interrupted_download_resumes_with_range(snapshot_server, tmp_path):
+    snapshot_server.cut_after = 5000
+
+    crawler = await download(snapshot_server, tmp_path)
+    assert crawler.pending_snapshot is None
+
+    crawler = await download(snapshot_server, tmp_path)
+
+    assert snapshot_server.requests[-1]["Range"] == "bytes=5000-"
+    assert open(crawler.zip_path, "rb").read() == BODY
+    assert crawler.pending_snapshot.sha256 == hashlib.sha256(BODY).hexdigest()
+
+
+@pytest.mark.anyio
+async def test_partial_of_an_older_file_restarts(snapshot_server, tmp_path):
+    snapshot_server.cut_after = 5000
+    await download(snapshot_server, tmp_path)
+    snapshot_server.body = BODY[::-1]
+
+    crawler = await download(snapshot_server, tmp_path)
+
+    assert open(crawler.zip_path, "rb").read() == BODY[::-1]
+
+
+@pytest.mark.anyio
+async def test_full_reload_ignores_the_saved_state(snapshot_server, tmp_path):
+    crawler = await download(snapshot_server, tmp_path)
+    crawler.commit_snapshot()
+
+    crawler = await download(snapshot_server, tmp_path, conditional=False)
+
+    assert not crawler.snapshot_unchanged
+    assert crawler.pending_snapshot is not None
+
+
+@pytest.mark.anyio
+async def test_parallel_download_fetches_every_segment(snapshot_server, tmp_path):
+    crawler = await download(snapshot_server, tmp_path, segments=4)
+
+    ranges = sorted(r["Range"] for r in snapshot_server.requests if "Range" in r)
+    assert ranges == [
+        "bytes=0-4095",
+        "bytes=12288-16383",
+        "bytes=4096-8191",
+        "bytes=8192-12287",
+    ]
+    assert open(crawler.zip_path, "rb").read() == BODY
+    assert not os.path.exists(crawler.segments_path)
+
+
+@pytest.mark.anyio
+async def test_failed_segment_is_retried_from_where_it_stopped(
+    snapshot_server, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(crawler_service, "SEGMENT_RETRY_DELAY", 0)
+    snapshot_server.cut_after = 1000
+    snapshot_server.cuts_left = 2
+    snapshot_server.cut_ranged_only = True
+
+    crawler = await download(snapshot_server, tmp_path, segments=4)
+
+    assert open(crawler.zip_path, "rb").read() == BODY
+    ranges = [r["Range"] for r in snapshot_server.requests if "Range" in r]
+    assert len(ranges) == 6
+    # Cada segmento interrompido é pedido de novo a partir do byte 1000.
+    resumed = {"bytes=1000-4095", "bytes=5096-8191", "bytes=9192-12287"}
+    resumed.add("bytes=13288-16383")
+    assert len(resumed & set(ranges)) == 2
+
+
+@pytest.mark.anyio
+async def test_missing_segments_are_resumed_on_the_next_run(
+    snapshot_server, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(crawler_service, "SEGMENT_RETRY_DELAY", 0)
+    snapshot_server.cut_after = 1000
+    snapshot_server.cut_ranged_only = True
+
+    crawler = await download(snapshot_server, tmp_path, segments=4, segment_retries=0)
+    assert os.path.exists(crawler.segments_path)
+    first_run = len(snapshot_server.requests)
+
+    crawler = await download(snapshot_server, tmp_path, segments=4)
+
+    assert open(crawler.zip_path, "rb").read() == BODY
+    assert 1 <= len(snapshot_server.requests) - first_run < 4
+
+
+@pytest.mark.anyio
+async def test_server_without_accept_ranges_uses_one_stream(snapshot_server, tmp_path):
+    snapshot_server.accept_ranges = False
+
+    crawler = await download(snapshot_server, tmp_path, segments=4)
+
+    assert len(snapshot_server.requests) == 1
+    assert open(crawler.zip_path, "rb").read() == BODY
+
+
+@pytest.mark.anyio
+async def test_weak_etag_falls_back_to_last_modified_for_if_range(
+    snapshot_server, tmp_path
+):
+    snapshot_server.weak_etag = True
+
+    crawler = await download(snapshot_server, tmp_path, segments=4)
+
+    assert open(crawler.zip_path, "rb").read() == BODY
+    if_ranges = {r["If-Range"] for r in snapshot_server.requests if "Range" in r}
+    assert if_ranges == {LAST_MODIFIED}
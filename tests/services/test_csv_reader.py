@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from app.services.csv_reader import CsvReaderEngine, open_csv_reader
+from app.services.csv_schema import COLUMN_MAPPING
+
+HEADER = ";".join(COLUMN_MAPPING.keys())
+
+
+def build_line(seq: int, value: str) -> str:
+    row = {column: "" for column in COLUMN_MAPPING}
+    row.update(
+        {
+            "SEQ_AUTO_INFRACAO": str(seq),
+            "NUM_AUTO_INFRACAO": f"AUTO{seq}",
+            "DES_STATUS_FORMULARIO": "Lavrado",
+            "UF": "PA",
+            "VAL_AUTO_INFRACAO": value,
+            "NOME_INFRATOR": "João",
+        }
+    )
+    return ";".join(row.values())
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "autos.csv"
+    lines = [HEADER] + [build_line(i, f"{i},50") for i in range(1, 8)]
+    path.write_bytes("\n".join(lines).encode("latin-1"))
+    return str(path)
+
+
+@pytest.mark.parametrize("engine", list(CsvReaderEngine))
+def test_reader_yields_typed_chunks(csv_path, engine):
+    if engine == CsvReaderEngine.PYARROW:
+        pytest.importorskip("pyarrow")
+
+    reader = open_csv_reader(csv_path, chunk_size=3, engine=engine)
+    chunks = list(reader)
+    reader.close()
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    first = chunks[0]
+    assert list(first.columns) == list(COLUMN_MAPPING.keys())
+    assert first["UF"].dtype == "category"
+    assert first["SEQ_AUTO_INFRACAO"].dtype == "Int64"
+    assert first["NOME_INFRATOR"].iloc[0] == "João"
+
+
+@pytest.mark.parametrize("engine", list(CsvReaderEngine))
+def test_reader_skips_committed_rows(csv_path, engine):
+    if engine == CsvReaderEngine.PYARROW:
+        pytest.importorskip("pyarrow")
+
+    reader = open_csv_reader(csv_path, chunk_size=10, engine=engine, rows_to_skip=5)
+    chunk = pd.concat(list(reader))
+    reader.close()
+
+    assert chunk["SEQ_AUTO_INFRACAO"].tolist() == [6, 7]
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from app.services.date_parser import (
+    detect_date_format,
+    detect_date_formats,
+    parse_dates,
+)
+
+
+def test_detect_keeps_expected_format_when_it_parses_everything():
+    series = pd.Series(["2021-03-04", None, "2021-03-05"])
+    assert detect_date_format(series, "%Y-%m-%d") == "%Y-%m-%d"
+
+
+def test_detect_falls_back_to_the_best_candidate():
+    series = pd.Series(["04/03/2021 10:00:00", "25/12/2020 08:30:00", "lixo"])
+    assert detect_date_format(series, "%Y-%m-%d %H:%M:%S") == "%d/%m/%Y %H:%M:%S"
+
+
+def test_detect_formats_ignores_missing_columns():
+    chunk_df = pd.DataFrame({"DT_FATO_INFRACIONAL": [None, None]})
+    assert detect_date_formats(
+        chunk_df, {"DT_FATO_INFRACIONAL": "%Y-%m-%d", "DT_LANCAMENTO": "%Y-%m-%d"}
+    ) == {"DT_FATO_INFRACIONAL": "%Y-%m-%d"}
+
+
+def test_parse_dates_uses_explicit_format():
+    series = pd.Series(
+        ["2021-03-04", "2021-03-04", None, "31/02/2021"], index=[5, 6, 7, 8]
+    )
+
+    parsed = parse_dates(series, "%Y-%m-%d")
+    assert parsed.index.tolist() == [5, 6, 7, 8]
+    assert parsed.iloc[0] == pd.Timestamp("2021-03-04")
+    assert parsed.iloc[1] == pd.Timestamp("2021-03-04")
+    assert parsed.iloc[2:].isna().all()
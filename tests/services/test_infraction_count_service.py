@@ -0,0 +1,116 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import asyncmy
+
+from app.models.infraction import Infraction
+from app.schemas.infraction import TotalMode
+from app.services import infraction_count_service
+from app.services.biome_mask import masks_containing, parse_biome_filter
+from app.services.infraction_count_service import (
+    count_infractions,
+    count_key,
+    estimate_from_plan,
+    normalize_filters,
+)
+
+
+def test_normalize_filters_drops_empty_values_and_ignores_case():
+    assert normalize_filters(
+        {
+            "state": "PA",
+            "offender_name": "Silva",
+            "municipality": None,
+            "source_id": 0,
+            "start_date": date(2021, 1, 1),
+            "min_fine_value": Decimal("1000.00"),
+        }
+    ) == {
+        "min_fine_value": "1000",
+        "offender_name": "silva",
+        "start_date": "2021-01-01",
+        "state": "PA",
+    }
+
+
+def test_count_key_depends_on_filters_and_version():
+    filters = {"offender_name": "SILVA", "state": "PA", "municipality": None}
+    same = {"state": "PA", "offender_name": "silva"}
+
+    assert count_key(3, filters) == count_key(3, same)
+    assert count_key(3, filters) != count_key(4, filters)
+    assert count_key(3, filters) != count_key(3, {"state": "AM"})
+
+
+def test_search_filters_ignore_accents_in_the_key():
+    accented = {"municipality": "São Félix do Xingu", "offender_name": "JOÃO"}
+    plain = {"municipality": "sao felix do xingu", "offender_name": "joao"}
+
+    assert count_key(1, accented) == count_key(1, plain)
+    assert normalize_filters(accented) == plain
+
+
+def test_estimate_from_plan():
+    plan = {
+        "query_block": {"table": {"rows_examined_per_scan": 20000, "filtered": "12.50"}}
+    }
+    assert estimate_from_plan(plan) == 2500
+    assert estimate_from_plan({"query_block": {"message": "Impossible WHERE"}}) == 0
+
+
+class FakeResult:
+    def scalar(self):
+        plan = {"query_block": {"table": {"rows_examined_per_scan": 80}}}
+        return json.dumps(plan)
+
+
+class FakeConnection:
+    dialect = asyncmy.dialect()
+
+    def __init__(self):
+        self.executed = []
+
+    async def exec_driver_sql(self, sql, params):
+        self.executed.append((sql, params))
+        return FakeResult()
+
+
+class FakeSession:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    async def connection(self):
+        return self.conn
+
+
+class FakeRedis:
+    async def get(self, key):
+        return None
+
+
+@pytest.mark.anyio
+async def test_estimate_with_biome_filter_expands_the_in_list(monkeypatch):
+    async def dataset_version():
+        return 1
+
+    monkeypatch.setattr(infraction_count_service, "redis_client", FakeRedis())
+    monkeypatch.setattr(
+        infraction_count_service, "get_dataset_version", dataset_version
+    )
+    masks = masks_containing(parse_biome_filter("Amazônia"))
+    stmt = select(Infraction).where(Infraction.biome_mask.in_(masks))
+    db = FakeSession()
+
+    total, estimated = await count_infractions(
+        db, stmt, {"affected_biomes": "Amazônia"}, TotalMode.ESTIMATE
+    )
+
+    assert (total, estimated) == (80, True)
+    [(sql, params)] = db.conn.executed
+    assert sql.startswith("EXPLAIN FORMAT=JSON SELECT")
+    assert "POSTCOMPILE" not in sql
+    assert sql.count("%s") == len(params) == len(masks)
+    assert sorted(params) == sorted(masks)
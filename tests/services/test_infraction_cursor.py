@@ -0,0 +1,23 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.infraction import Infraction
+from app.services.infraction_service import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    infraction = Infraction(id=42, infraction_datetime=datetime(2021, 3, 4, 10, 5))
+
+    cursor = encode_cursor(infraction)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (datetime(2021, 3, 4, 10, 5), 42)
+
+
+@pytest.mark.parametrize(
+    "cursor", ["", "lixo", "WyJ4IiwxXQ", "WyIyMDIxLTAzLTA0IiwieCJd"]
+)
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
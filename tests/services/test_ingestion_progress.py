@@ -0,0 +1,41 @@
+from app.services import ingestion_service
+from app.services.ingestion_service import IngestionProgress
+
+MB = 1024 * 1024
+
+
+def test_resumed_run_measures_throughput_after_the_skipped_rows(monkeypatch):
+    clock = iter([10.0, 12.0])
+    monkeypatch.setattr(ingestion_service.time, "perf_counter", lambda: next(clock))
+    progress = IngestionProgress(
+        file_hash="h", file_name="autos.csv", bytes_total=100 * MB, started_at=0.0
+    )
+    progress.resume_from(80_000)
+
+    # O primeiro chunk chega depois de o leitor percorrer 80 MB já gravados.
+    progress.row_offset = 90_000
+    progress.update_metrics(90 * MB)
+    assert progress.mb_per_second == 0.0
+    assert progress.eta_seconds is None
+
+    progress.row_offset = 95_000
+    progress.update_metrics(95 * MB)
+
+    assert progress.rows_read == 15_000
+    assert progress.rows_per_second == 2_500
+    assert progress.mb_per_second == 2.5
+    assert progress.eta_seconds == 2.0
+
+
+def test_fresh_run_measures_from_the_start(monkeypatch):
+    monkeypatch.setattr(ingestion_service.time, "perf_counter", lambda: 4.0)
+    progress = IngestionProgress(
+        file_hash="h", file_name="autos.csv", bytes_total=10 * MB, started_at=0.0
+    )
+
+    progress.row_offset = 1_000
+    progress.update_metrics(2 * MB)
+
+    assert progress.mb_per_second == 0.5
+    assert progress.rows_per_second == 250
+    assert progress.eta_seconds == 16.0
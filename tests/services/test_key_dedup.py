@@ -0,0 +1,71 @@
+import pandas as pd
+
+from app.services.csv_schema import COLUMN_MAPPING
+from app.services.ingestion_service import SCAN_SOURCE_COLUMNS, ScanValidator
+from app.services.key_dedup import drop_superseded, scan_superseded_rows
+
+HEADER = ";".join(COLUMN_MAPPING.keys())
+
+
+def build_line(number: str) -> str:
+    row = {column: "" for column in COLUMN_MAPPING}
+    row["NUM_AUTO_INFRACAO"] = number
+    return ";".join(row.values())
+
+
+def test_scan_marks_every_occurrence_but_the_last(tmp_path):
+    path = tmp_path / "autos.csv"
+    numbers = ["A", "B", "A", "", "C", "B", "A", ""]
+    path.write_bytes("\n".join([HEADER] + [build_line(n) for n in numbers]).encode())
+
+    superseded = scan_superseded_rows(str(path), chunk_size=3)
+
+    assert superseded.tolist() == [0, 1, 2]
+
+
+def build_valid_line(number: str, **overrides) -> str:
+    row = {column: "" for column in COLUMN_MAPPING}
+    row.update(
+        {
+            "SEQ_AUTO_INFRACAO": "1",
+            "NUM_AUTO_INFRACAO": number,
+            "DES_STATUS_FORMULARIO": "Lavrado",
+            "DAT_HORA_AUTO_INFRACAO": "2021-03-04 10:00:00",
+            "NOME_INFRATOR": "João",
+            "CPF_CNPJ_INFRATOR": "123",
+            "UF": "PA",
+        }
+    )
+    row.update(overrides)
+    return ";".join(row.values())
+
+
+def test_invalid_later_occurrence_does_not_supersede_a_valid_one(tmp_path):
+    path = tmp_path / "autos.csv"
+    lines = [
+        build_valid_line("A"),
+        build_valid_line("B"),
+        build_valid_line("A", DES_STATUS_FORMULARIO=""),
+        build_valid_line("B"),
+        build_valid_line("A", DAT_HORA_AUTO_INFRACAO="ontem"),
+    ]
+    path.write_bytes("\n".join([HEADER] + lines).encode("latin-1"))
+    validator = ScanValidator()
+
+    superseded = scan_superseded_rows(
+        str(path), chunk_size=2, columns=SCAN_SOURCE_COLUMNS, is_valid=validator
+    )
+
+    # O primeiro "A" continua sendo a versão válida; só o primeiro "B" sai.
+    assert superseded.tolist() == [1]
+    assert validator.date_formats["infraction_datetime"] == "%Y-%m-%d %H:%M:%S"
+
+
+def test_drop_superseded_uses_file_positions():
+    chunk_df = pd.DataFrame({"NUM_AUTO_INFRACAO": ["A", "B", "C"]}, index=[0, 1, 2])
+    superseded = pd.Series([1, 4, 5, 9]).to_numpy()
+
+    dropped = drop_superseded(chunk_df, superseded, first_row=4)
+
+    assert dropped == 2
+    assert chunk_df["NUM_AUTO_INFRACAO"].tolist() == ["C"]
@@ -0,0 +1,78 @@
+import gzip
+
+import pandas as pd
+
+from app.services.csv_schema import COLUMN_MAPPING
+from app.services.ingestion_service import ChunkStats, IngestionService
+from app.services.reject_sink import REASON_COLUMN, RejectSink
+from app.services.text_normalizer import TextNormalizer
+
+
+def build_row(number: str, **overrides) -> dict:
+    row = {column: None for column in COLUMN_MAPPING}
+    row.update(
+        {
+            "SEQ_AUTO_INFRACAO": "1",
+            "NUM_AUTO_INFRACAO": number,
+            "DES_STATUS_FORMULARIO": "Lavrado",
+            "DAT_HORA_AUTO_INFRACAO": "2021-03-04 10:00:00",
+            "NOME_INFRATOR": "João",
+            "CPF_CNPJ_INFRATOR": "123",
+            "UF": "PA",
+            "VAL_AUTO_INFRACAO": "10,50",
+        }
+    )
+    row.update(overrides)
+    return row
+
+
+def test_transform_chunk_rejects_rows_by_rule():
+    chunk_df = pd.DataFrame(
+        [
+            build_row("A1"),
+            build_row("A2", UF=None),
+            build_row("A3", DAT_HORA_AUTO_INFRACAO="ontem"),
+            build_row("A4", VAL_AUTO_INFRACAO="abc"),
+            build_row("A1", NOME_INFRATOR="Maria"),
+        ]
+    )
+    stats = ChunkStats()
+
+    result = IngestionService(normalizer=TextNormalizer()).transform_chunk(
+        chunk_df, COLUMN_MAPPING, stats
+    )
+
+    assert result["infraction_number"].tolist() == ["A4", "A1"]
+    assert result["offender_name"].tolist() == ["Joao", "Maria"]
+    assert result["fine_value"].tolist() == [0.0, 10.5]
+    assert stats.rows_rejected == 3
+    assert stats.rejects == {
+        "missing:state": 1,
+        "invalid_date:infraction_datetime": 1,
+        "duplicate:infraction_number": 1,
+    }
+    assert stats.coerced == {"fine_value": 1}
+    assert stats.rejected_rows[REASON_COLUMN].tolist() == [
+        "duplicate:infraction_number",
+        "missing:state",
+        "invalid_date:infraction_datetime",
+    ]
+
+
+def test_reject_sink_appends_gzip_members(tmp_path):
+    rejected = pd.DataFrame(
+        {"infraction_number": ["A1"], REASON_COLUMN: ["missing:state"]}
+    )
+
+    for _ in range(2):
+        sink = RejectSink("autos.csv", "f" * 64, reject_dir=str(tmp_path))
+        sink.write(rejected)
+        sink.close()
+
+    with gzip.open(sink.path, "rt", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines == [
+        f"infraction_number,{REASON_COLUMN}",
+        "A1,missing:state",
+        "A1,missing:state",
+    ]
@@ -0,0 +1,133 @@
+import pytest
+
+from app.core.config import settings
+from app.services import response_cache
+from app.services.response_cache import CacheSlot, request_digest
+
+PAGE = {"page": 1, "size": 50, "cursor": None, "total": "exact"}
+
+
+def test_digest_ignores_empty_filters_and_search_case():
+    assert request_digest(
+        {"municipality": "Altamira", "state": "PA", "source_id": None}, PAGE
+    ) == request_digest({"state": "PA", "municipality": "ALTAMIRA"}, PAGE)
+
+
+def test_digest_depends_on_page_and_total_mode():
+    filters = {"state": "PA"}
+
+    assert request_digest(filters, PAGE) != request_digest(filters, {**PAGE, "page": 2})
+    assert request_digest(filters, PAGE) != request_digest(
+        filters, {**PAGE, "total": "none"}
+    )
+
+
+@pytest.mark.anyio
+async def test_lookup_is_skipped_when_cache_is_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "INFRACTIONS_RESPONSE_CACHE_ENABLED", False)
+
+    assert await response_cache.lookup({"state": "PA"}, PAGE) is None
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        return [
+            await getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.calls
+        ]
+
+
+class FakeRedis:
+    # Apenas os comandos usados por response_cache.store, em memória.
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def incrby(self, key, amount):
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    async def decrby(self, key, amount):
+        return await self.incrby(key, -amount)
+
+    async def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = value
+
+    async def hincrby(self, key, field, amount):
+        hash_ = self.data.setdefault(key, {})
+        hash_[field] = int(hash_.get(field, 0)) + amount
+
+    async def expire(self, key, ttl, nx=False):
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def sadd(self, key, *members):
+        members = {str(m) for m in members} - self.data.setdefault(key, set())
+        self.data[key] |= members
+        return len(members)
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    async def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(str(m) for m in members)
+
+
+@pytest.mark.anyio
+async def test_byte_cap_covers_every_dataset_version(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(response_cache, "redis_client", redis)
+    monkeypatch.setattr(settings, "INFRACTIONS_RESPONSE_CACHE_MAX_MB", 1)
+    version = {"current": 1}
+
+    async def dataset_version():
+        return version["current"]
+
+    monkeypatch.setattr(response_cache, "get_dataset_version", dataset_version)
+    payload = "x" * (400 * 1024)
+
+    async def fill(v: int) -> None:
+        for i in range(3):
+            slot = CacheSlot(v, f"{response_cache.RESPONSE_KEY_PREFIX}{v}", str(i))
+            await response_cache.store(slot, payload)
+
+    await fill(1)
+    version["current"] = 2
+    # Uma consulta iniciada antes do commit não grava na versão antiga.
+    stale = CacheSlot(1, f"{response_cache.RESPONSE_KEY_PREFIX}1", "late")
+    assert not await response_cache.store(stale, payload)
+    await fill(2)
+
+    stored = sum(
+        len(value)
+        for key, hash_ in redis.data.items()
+        if isinstance(hash_, dict) and key != response_cache.STATS_KEY
+        for value in hash_.values()
+    )
+    assert stored <= 1024 * 1024
+    assert f"{response_cache.RESPONSE_KEY_PREFIX}1" not in redis.data
+    assert len(redis.data[f"{response_cache.RESPONSE_KEY_PREFIX}2"]) == 2
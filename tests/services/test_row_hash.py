@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+
+from app.services.csv_reader import CsvReaderEngine, open_csv_reader
+from app.services.csv_schema import COLUMN_MAPPING
+from app.services.ingestion_service import (
+    HASHED_COLUMNS,
+    IngestionService,
+    compute_row_hash,
+    parse_decimal,
+)
+from app.services.text_normalizer import TextNormalizer
+
+
+def build_row(number: str, value) -> dict:
+    row = {column: None for column in COLUMN_MAPPING}
+    row.update(
+        {
+            "SEQ_AUTO_INFRACAO": 1,
+            "NUM_AUTO_INFRACAO": number,
+            "DES_STATUS_FORMULARIO": "Lavrado",
+            "DAT_HORA_AUTO_INFRACAO": "2021-03-04 10:00:00",
+            "NOME_INFRATOR": "João",
+            "CPF_CNPJ_INFRATOR": "123",
+            "UF": "PA",
+            "VAL_AUTO_INFRACAO": value,
+            "NUM_LATITUDE_AUTO": value,
+        }
+    )
+    return row
+
+
+def row_hashes(chunk_df: pd.DataFrame) -> dict[str, int]:
+    result = IngestionService(normalizer=TextNormalizer()).transform_chunk(
+        chunk_df, COLUMN_MAPPING
+    )
+    return dict(zip(result["infraction_number"], result["row_hash"]))
+
+
+def test_parse_decimal_returns_float64_on_both_paths():
+    numeric = parse_decimal(pd.Series([10.5, None]))
+    text = parse_decimal(pd.Series(["10,50", "abc"], dtype=object))
+
+    assert numeric.dtype == text.dtype == "float64"
+    assert text.tolist()[0] == 10.5
+
+
+def test_row_hash_does_not_depend_on_the_decimal_dtype_path():
+    # Um chunk limpo chega como float64; um valor malformado em outra linha
+    # força o caminho do texto para a coluna inteira.
+    clean = pd.DataFrame([build_row("A1", 10.5), build_row("A2", None)])
+    dirty = pd.DataFrame(
+        [build_row("A1", "10,50"), build_row("A2", None), build_row("A3", "abc")]
+    )
+
+    clean_hashes = row_hashes(clean)
+    dirty_hashes = row_hashes(dirty)
+
+    assert clean_hashes["A1"] == dirty_hashes["A1"]
+    assert clean_hashes["A2"] == dirty_hashes["A2"]
+
+
+def test_row_hash_is_the_same_for_both_readers(tmp_path):
+    pytest.importorskip("pyarrow")
+    rows = [
+        build_row("A1", "10,50"),
+        build_row("A2", None),
+        build_row("A3", "abc"),
+    ]
+    lines = [";".join(COLUMN_MAPPING)] + [
+        ";".join("" if v is None else str(v) for v in row.values()) for row in rows
+    ]
+    path = tmp_path / "autos.csv"
+    path.write_bytes("\n".join(lines).encode("latin-1"))
+
+    hashes = []
+    for engine in CsvReaderEngine:
+        reader = open_csv_reader(str(path), chunk_size=10, engine=engine)
+        hashes.append(row_hashes(next(reader)))
+        reader.close()
+
+    assert hashes[0] == hashes[1]
+    assert len(hashes[0]) == 3
+
+
+def test_row_hash_depends_only_on_the_values():
+    frame = pd.DataFrame({col: [None, None] for col in HASHED_COLUMNS})
+    frame["source_id"] = [1, 2]
+    frame["infraction_number"] = ["A1", "A2"]
+    frame["state"] = ["PA", None]
+    frame["fine_value"] = [10.5, None]
+    frame["infraction_datetime"] = pd.to_datetime(["2021-03-04 10:00:00", None])
+
+    retyped = frame.copy()
+    retyped["source_id"] = retyped["source_id"].astype("Int64")
+    retyped["infraction_number"] = retyped["infraction_number"].astype("string")
+    retyped["state"] = retyped["state"].astype("category")
+    retyped["fine_value"] = retyped["fine_value"].astype("Float64")
+    retyped["infraction_datetime"] = retyped["infraction_datetime"].astype(
+        "datetime64[us]"
+    )
+
+    assert compute_row_hash(frame).tolist() == compute_row_hash(retyped).tolist()
+    assert compute_row_hash(frame)[0] != compute_row_hash(frame)[1]
@@ -0,0 +1,36 @@
+from app.services.table_swap_service import ShadowTable, secondary_indexes
+
+CREATE_SQL = """CREATE TABLE `infractions_next` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `infraction_number` varchar(255) NOT NULL,
+  `source_id` bigint NOT NULL,
+  `search_text` text,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `infraction_number` (`infraction_number`),
+  KEY `ix_infractions_source_id` (`source_id`),
+  KEY `ix_infractions_latitude_longitude` (`latitude`,`longitude`),
+  FULLTEXT KEY `ix_infractions_search_text` (`search_text`) /*!50100 WITH PARSER `ngram` */ 
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"""
+
+
+def test_secondary_indexes_keeps_unique_and_primary_keys():
+    assert secondary_indexes(CREATE_SQL) == {
+        "ix_infractions_source_id": "KEY `ix_infractions_source_id` (`source_id`)",
+        "ix_infractions_latitude_longitude": (
+            "KEY `ix_infractions_latitude_longitude` (`latitude`,`longitude`)"
+        ),
+        "ix_infractions_search_text": (
+            "FULLTEXT KEY `ix_infractions_search_text` (`search_text`) "
+            "/*!50100 WITH PARSER `ngram` */"
+        ),
+    }
+
+
+def test_shadow_table_mirrors_the_live_columns():
+    shadow = ShadowTable()
+
+    assert shadow.name == "infractions_next"
+    assert shadow.previous_name == "infractions_previous"
+    assert [c.name for c in shadow.table.columns] == [
+        c.name for c in shadow.live_table.columns
+    ]
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from app.services.text_normalizer import TextNormalizer, safe_unidecode
+
+
+def test_normalize_series_matches_apply_path():
+    series = pd.Series(["São Félix", None, "Conceição", "São Félix", float("nan")])
+
+    result = TextNormalizer().normalize_series(series)
+
+    assert result.tolist() == series.apply(safe_unidecode).tolist()
+    assert result.tolist() == ["Sao Felix", None, "Conceicao", "Sao Felix", None]
+
+
+def test_normalize_series_reuses_memo_across_calls():
+    normalizer = TextNormalizer()
+
+    normalizer.normalize_series(pd.Series(["Amazônia", "Cerrado", "Amazônia"]))
+    normalizer.normalize_series(pd.Series(["Amazônia", "Pantanal"]))
+
+    assert normalizer.misses == 3
+    assert normalizer.hits == 1
+
+
+def test_memo_is_bounded_and_evicts_least_recently_used():
+    normalizer = TextNormalizer(max_size=2)
+
+    normalizer.normalize_series(pd.Series(["Acará", "Óbidos"]))
+    normalizer.normalize_series(pd.Series(["Acará"]))
+    normalizer.normalize_series(pd.Series(["Itaituba"]))
+
+    assert len(normalizer) == 2
+    assert "Óbidos" not in normalizer._memo
+    assert "Acará" in normalizer._memo
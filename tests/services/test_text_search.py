@@ -0,0 +1,67 @@
+import pandas as pd
+from sqlalchemy.dialects import mysql
+
+from app.models.infraction import Infraction
+from app.services.csv_schema import COLUMN_MAPPING
+from app.services.ingestion_service import IngestionService
+from app.services.text_normalizer import TextNormalizer
+from app.services.text_search import (
+    boolean_query,
+    normalize_search_text,
+    search_predicate,
+)
+
+
+def test_normalize_search_text_drops_accents_and_case():
+    assert normalize_search_text("São FÉLIX do Xingu") == "sao felix do xingu"
+
+
+def test_boolean_query_strips_operators_and_short_words():
+    assert boolean_query('joao "da" silva* -x') == '+"joao" +"da" +"silva"'
+    assert boolean_query("a") is None
+
+
+def test_search_predicate_combines_match_and_like():
+    predicate = search_predicate(Infraction.municipality_search, "Altamira")
+    compiled = predicate.compile(dialect=mysql.dialect())
+
+    assert "MATCH (infractions.municipality_search) AGAINST" in str(compiled)
+    assert "infractions.municipality_search LIKE" in str(compiled)
+    assert sorted(compiled.params.values()) == ["%altamira%", '+"altamira"']
+
+
+def test_short_search_uses_only_like():
+    predicate = search_predicate(Infraction.municipality_search, "É")
+
+    assert "MATCH" not in str(predicate.compile(dialect=mysql.dialect()))
+
+
+def test_transform_chunk_fills_search_columns():
+    row = {column: None for column in COLUMN_MAPPING}
+    row.update(
+        {
+            "SEQ_AUTO_INFRACAO": "1",
+            "NUM_AUTO_INFRACAO": "A1",
+            "DES_STATUS_FORMULARIO": "Lavrado",
+            "DAT_HORA_AUTO_INFRACAO": "2021-03-04 10:00:00",
+            "NOME_INFRATOR": "João Conceição",
+            "CPF_CNPJ_INFRATOR": "123",
+            "UF": "PA",
+            "MUNICIPIO": "SÃO FÉLIX DO XINGU",
+        }
+    )
+    service = IngestionService(normalizer=TextNormalizer())
+
+    result = service.transform_chunk(pd.DataFrame([row]), COLUMN_MAPPING)
+
+    assert result["offender_name_search"].tolist() == ["joao conceicao"]
+    assert result["municipality_search"].tolist() == ["sao felix do xingu"]
+    assert result["affected_biomes_search"].isna().all()
+
+
+def test_search_predicate_escapes_like_wildcards():
+    predicate = search_predicate(Infraction.offender_name_search, "a_b")
+    compiled = predicate.compile(dialect=mysql.dialect())
+
+    assert "ESCAPE" in str(compiled)
+    assert list(compiled.params.values()) == ["%a\\_b%"]